@@ -0,0 +1,43 @@
+"""Compare ingesting a dataset uploaded as CSV and as an Arrow IPC stream.
+
+The CSV path writes the upload to disk and parses a sample of it (what /summarize does before
+summarizing), the Arrow path reads the sample from the request body (what /summarize/arrow does).
+
+Usage: python benchmarks/bench_arrow.py
+"""
+import io
+import os
+import tempfile
+
+import polars as pl
+
+from bench_profiler import timeit
+from bench_streaming import write_csv
+from lida.utils import read_arrow, read_dataframe, write_stream
+
+
+def main():
+    print(f"{'rows':>12}{'csv (MB)':>10}{'arrow (MB)':>12}{'csv (s)':>10}{'arrow (s)':>11}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in [10_000, 100_000, 1_000_000, 5_000_000]:
+            source = os.path.join(tmp, "source.csv")
+            write_csv(source, n_rows)
+            with open(source, "rb") as f:
+                csv_body = f.read()
+            stream = io.BytesIO()
+            pl.read_csv(source).write_ipc_stream(stream)
+            arrow_body = stream.getvalue()
+
+            def ingest_csv():
+                path = os.path.join(tmp, "upload.csv")
+                write_stream([csv_body], path)
+                return read_dataframe(path, seed=0)
+
+            csv = timeit(ingest_csv)
+            arrow = timeit(lambda: read_arrow(arrow_body, seed=0))
+            print(f"{n_rows:>12}{len(csv_body) / 1024 ** 2:>10.0f}{len(arrow_body) / 1024 ** 2:>12.0f}"
+                  f"{csv:>10.3f}{arrow:>11.3f}{csv / arrow:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare sampled date format inference with parsing whole string columns.
+
+The full parse baseline tries every format of DATE_FORMATS on every value of every string
+column, in one query, which is what detecting several formats costs without a sampled prefilter.
+
+Usage: python benchmarks/bench_dates.py
+"""
+import numpy as np
+import polars as pl
+
+from bench_profiler import timeit
+from lida.components.profiler import DATE_FORMATS, EPOCH_RANGES, ColumnProfiler, infer_date_formats, parse_dates
+
+
+def make_frame(n_rows: int, n_cols: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = pl.Series(rng.integers(0, 10_000, n_rows)).cast(pl.Date)
+    columns = {}
+    for i in range(n_cols):
+        if i % 10 == 0:
+            columns[f"iso_{i}"] = days.dt.strftime("%Y-%m-%d")
+        elif i % 10 == 1:
+            columns[f"us_{i}"] = days.dt.strftime("%m/%d/%Y")
+        else:
+            columns[f"str_{i}"] = rng.choice([f"value {k}" for k in range(1_000)], size=n_rows)
+    return pl.DataFrame(columns)
+
+
+def full_parse(df: pl.DataFrame) -> dict:
+    formats = [date_format for date_format in DATE_FORMATS if date_format not in EPOCH_RANGES]
+    exprs = [(parse_dates(pl.col(column), date_format).null_count() == pl.col(column).null_count()).alias(
+        f"{column}:{date_format}") for column in df.columns for date_format in formats]
+    return df.select(exprs).row(0, named=True)
+
+
+def main():
+    profiler = ColumnProfiler()
+    print(f"{'rows':>10}{'cols':>6}{'full parse (s)':>16}{'sampled (s)':>13}{'profile (s)':>13}{'dates':>7}")
+    for n_rows, n_cols in [(100_000, 50), (1_000_000, 20)]:
+        df = make_frame(n_rows, n_cols)
+        full = timeit(lambda: full_parse(df), repeat=1)
+        sampled = timeit(lambda: infer_date_formats(df))
+        profile = timeit(lambda: profiler.profile(df))
+        n_dates = sum(x["properties"]["dtype"] == "date" for x in profiler.profile(df))
+        print(f"{n_rows:>10}{n_cols:>6}{full:>16.3f}{sampled:>13.3f}{profile:>13.3f}{n_dates:>7}")
+
+
+if __name__ == "__main__":
+    main()
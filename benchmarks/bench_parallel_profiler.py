@@ -0,0 +1,31 @@
+"""Scaling of ParallelColumnProfiler with the number of worker processes on a very wide frame.
+
+Worker pools are started and warmed up before timing, as they are reused across calls.
+
+Usage: python benchmarks/bench_parallel_profiler.py [n_columns]
+"""
+import os
+import sys
+
+from lida.components.profiler import ColumnProfiler, ParallelColumnProfiler
+
+from bench_profiler import make_frame, timeit
+
+
+def main():
+    n_columns = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    df = make_frame(4_500, n_columns)
+    serial = timeit(lambda: ColumnProfiler().profile(df))
+    print(f"{n_columns} columns, in process: {serial:.3f}s")
+    print(f"{'workers':>8}{'time (s)':>10}{'speedup':>10}")
+    n_workers = 1
+    while n_workers <= (os.cpu_count() or 1):
+        profiler = ParallelColumnProfiler(n_workers=n_workers, min_columns=0)
+        profiler.profile(df.head(10))
+        elapsed = timeit(lambda: profiler.profile(df))
+        print(f"{n_workers:>8}{elapsed:>10.3f}{serial / elapsed:>9.1f}x")
+        n_workers *= 2
+
+
+if __name__ == "__main__":
+    main()
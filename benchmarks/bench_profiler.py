@@ -0,0 +1,80 @@
+"""Compare the single pass ColumnProfiler with the previous per column loop.
+
+Usage: python benchmarks/bench_profiler.py
+"""
+import time
+import warnings
+
+import numpy as np
+import polars as pl
+
+from lida.components.profiler import ColumnProfiler, check_type
+
+
+def loop_column_properties(df: pl.DataFrame, n_samples: int = 3) -> list:
+    """The per column loop previously used by Summarizer.get_column_properties"""
+    properties_list = []
+    for column in df.columns:
+        dtype = df[column].dtype
+        properties = {}
+        if dtype.is_numeric():
+            properties["dtype"] = "number"
+            properties["std"] = check_type(dtype, df[column].std())
+            properties["min"] = check_type(dtype, df[column].min())
+            properties["max"] = check_type(dtype, df[column].max())
+        elif dtype == pl.String:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    df.with_columns(pl.col(column).str.to_datetime("%d %B %Y"))
+                    properties["dtype"] = "date"
+            except Exception:
+                if df[column].n_unique() / len(df[column]) < 0.5:
+                    properties["dtype"] = "category"
+                else:
+                    properties["dtype"] = "string"
+        else:
+            properties["dtype"] = str(dtype)
+        non_null_values = df.select(pl.col(column).filter(pl.col(column).is_not_null())).unique()
+        n = min(n_samples, len(non_null_values))
+        properties["samples"] = pl.Series(non_null_values).sample(n).to_list()
+        properties["num_unique_values"] = df[column].n_unique()
+        properties_list.append({"column": column, "properties": properties})
+    return properties_list
+
+
+def make_frame(n_rows: int, n_cols: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for i in range(n_cols):
+        if i % 3 == 0:
+            columns[f"num_{i}"] = rng.normal(size=n_rows)
+        elif i % 3 == 1:
+            columns[f"int_{i}"] = rng.integers(0, 1000, size=n_rows)
+        else:
+            columns[f"str_{i}"] = rng.choice([f"value_{k}" for k in range(50)], size=n_rows)
+    return pl.DataFrame(columns)
+
+
+def timeit(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    shapes = {"wide": (4_500, 300), "tall": (1_000_000, 10)}
+    profiler = ColumnProfiler()
+    print(f"{'shape':<8}{'rows':>10}{'cols':>6}{'loop (s)':>12}{'profiler (s)':>14}{'speedup':>10}")
+    for name, (n_rows, n_cols) in shapes.items():
+        df = make_frame(n_rows, n_cols)
+        loop = timeit(lambda: loop_column_properties(df))
+        single = timeit(lambda: profiler.profile(df))
+        print(f"{name:<8}{n_rows:>10}{n_cols:>6}{loop:>12.3f}{single:>14.3f}{loop / single:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
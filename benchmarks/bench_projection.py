@@ -0,0 +1,82 @@
+"""Compare executing a chart on the whole dataset and on the columns its code references.
+
+The dataset has 250 columns and the chart reads two of them. Each run happens in a fresh
+subprocess and reports its time and the peak anonymous RSS added by the execution.
+
+Usage: python benchmarks/bench_projection.py
+"""
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import polars as pl
+
+from bench_streaming import anon_rss_mb
+
+CODE = """
+import matplotlib.pyplot as plt
+import polars as pl
+def plot(data: pl.DataFrame):
+    df = data.to_pandas()
+    df = df.pivot_table(index="kind_0", values="value_0").reset_index().sort_values("value_0")
+    plt.bar(df["kind_0"], df["value_0"])
+    return plt, df, {"value_0": False}
+chart = plot(data)"""
+
+
+def make_data(n_rows: int, n_columns: int = 250) -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    columns = {}
+    for i in range(n_columns // 2):
+        columns[f"value_{i}"] = rng.normal(size=n_rows)
+        columns[f"kind_{i}"] = rng.choice([f"kind_{k}" for k in range(20)], size=n_rows)
+    return pl.DataFrame(columns)
+
+
+def run(n_rows: int, project_columns: bool) -> None:
+    from lida.components.executor import ChartExecutor
+    from lida.datamodel import Summary
+    data = make_data(n_rows)
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=data.columns)
+    executor = ChartExecutor(project_columns=project_columns)
+    # import matplotlib and pandas before measuring
+    executor.execute([CODE], data.head(10), summary, library="matplotlib")
+
+    baseline = anon_rss_mb()
+    peak = [baseline]
+    done = threading.Event()
+
+    def monitor():
+        while not done.is_set():
+            peak[0] = max(peak[0], anon_rss_mb())
+            time.sleep(0.005)
+
+    thread = threading.Thread(target=monitor)
+    thread.start()
+    try:
+        start = time.perf_counter()
+        assert executor.execute([CODE], data, summary, library="matplotlib")[0].status
+        elapsed = time.perf_counter() - start
+    finally:
+        done.set()
+        thread.join()
+    print(f"{elapsed:.2f} {peak[0] - baseline:.0f}")
+
+
+def main():
+    print(f"{'rows':>10}{'columns':>12}{'time (s)':>10}{'peak added RSS (MB)':>22}")
+    for n_rows in [10_000, 100_000, 500_000]:
+        for project_columns in [False, True]:
+            output = subprocess.run([sys.executable, __file__, str(n_rows), str(int(project_columns))],
+                                    capture_output=True, text=True, check=True).stdout.split()
+            label = "referenced" if project_columns else "all"
+            print(f"{n_rows:>10}{label:>12}{float(output[0]):>10.2f}{output[1]:>22}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(int(sys.argv[1]), bool(int(sys.argv[2])))
+    else:
+        main()
@@ -0,0 +1,61 @@
+"""Compare load-then-sample with sample-at-read in read_dataframe for growing CSV files.
+
+Each run happens in a fresh subprocess and reports its time and peak anonymous RSS.
+
+Usage: python benchmarks/bench_read.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import polars as pl
+
+from bench_streaming import anon_rss_mb, write_csv
+
+
+def run(path: str, mode: str) -> None:
+    from lida.utils import MAX_SAMPLE_ROWS, clean_column_names, read_dataframe
+    peak = [anon_rss_mb()]
+    done = threading.Event()
+
+    def monitor():
+        while not done.is_set():
+            peak[0] = max(peak[0], anon_rss_mb())
+            time.sleep(0.005)
+
+    thread = threading.Thread(target=monitor)
+    thread.start()
+    start = time.perf_counter()
+    if mode == "load":
+        # the previous read_dataframe: read everything, clean names on a copy, then sample
+        clean_column_names(pl.read_csv(path)).sample(MAX_SAMPLE_ROWS)
+    else:
+        read_dataframe(path, seed=0)
+    elapsed = time.perf_counter() - start
+    done.set()
+    thread.join()
+    print(f"{elapsed:.2f} {peak[0]:.0f}")
+
+
+def main():
+    print(f"{'rows':>12}{'size (MB)':>12}{'mode':>18}{'time (s)':>10}{'peak anon RSS (MB)':>20}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in [1_000_000, 5_000_000, 20_000_000]:
+            path = os.path.join(tmp, f"data_{n_rows}.csv")
+            write_csv(path, n_rows)
+            size_mb = os.path.getsize(path) / 1024 ** 2
+            for mode in ["load", "sample"]:
+                output = subprocess.run([sys.executable, __file__, path, mode],
+                                        capture_output=True, text=True, check=True).stdout.split()
+                label = "load then sample" if mode == "load" else "sample at read"
+                print(f"{n_rows:>12}{size_mb:>12.0f}{label:>18}{float(output[0]):>10.2f}{output[1]:>20}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(sys.argv[1], sys.argv[2])
+    else:
+        main()
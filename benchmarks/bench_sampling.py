@@ -0,0 +1,62 @@
+"""Compare the sampling strategies of lida.sampling for speed and representativeness.
+
+The data has a rare category, a heavy tailed value and a time column whose rows are mostly in
+the last tenth of its range. Each sample of 4500 rows is compared with the full data:
+- rare: rows of the rare category (0.02% of the rows) in the sample
+- ks: Kolmogorov-Smirnov distance between the value distributions
+- p99.9/max: the 99.9th percentile and maximum of value in the sample over the full data
+- early: share of the sample in the first 90% of the time range (5% of the rows)
+
+Usage: python benchmarks/bench_sampling.py
+"""
+import numpy as np
+import polars as pl
+
+from bench_profiler import timeit
+from lida.sampling import get_sampler
+
+
+def make_data(n_rows: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    n_early = n_rows // 20
+    return pl.DataFrame({
+        "kind": rng.choice(["a", "b", "c", "rare"], p=[0.6, 0.3, 0.0998, 0.0002], size=n_rows),
+        "value": rng.pareto(2.0, size=n_rows),
+        "time": np.sort(np.concatenate([rng.uniform(0, 90, n_early), rng.uniform(90, 100, n_rows - n_early)])),
+    })
+
+
+def ks_distance(sample: np.ndarray, full: np.ndarray) -> float:
+    full = np.sort(full)
+    sample = np.sort(sample)
+    grid = np.quantile(full, np.linspace(0, 1, 1001))
+    cdf_full = np.searchsorted(full, grid, side="right") / len(full)
+    cdf_sample = np.searchsorted(sample, grid, side="right") / len(sample)
+    return float(np.abs(cdf_full - cdf_sample).max())
+
+
+def main():
+    strategies = {
+        "uniform": {},
+        "stratified": {"column": "kind"},
+        "time": {"column": "time"},
+        "tail": {"columns": ["value"]},
+    }
+    print(f"{'rows':>10}{'strategy':>12}{'time (s)':>10}{'rare':>8}{'ks':>8}{'p99.9':>8}{'max':>8}{'early':>8}")
+    for n_rows in [100_000, 1_000_000, 10_000_000]:
+        df = make_data(n_rows)
+        lf = df.lazy()
+        p999, top = df["value"].quantile(0.999), df["value"].max()
+        for strategy, kwargs in strategies.items():
+            sampler = get_sampler(strategy, seed=1, **kwargs)
+            elapsed = timeit(lambda: sampler.sample(lf), repeat=3)
+            sample = sampler.sample(lf)
+            kept_rare = sample.filter(pl.col("kind") == "rare").height
+            ks = ks_distance(sample["value"].to_numpy(), df["value"].to_numpy())
+            early = sample.filter(pl.col("time") < 90).height / len(sample)
+            print(f"{n_rows:>10}{strategy:>12}{elapsed:>10.3f}{kept_rare:>8}{ks:>8.3f}"
+                  f"{sample['value'].quantile(0.999) / p999:>8.2f}{sample['value'].max() / top:>8.2f}{early:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare the prompt tokens of summaries embedded as a dict repr and with serialize_summary.
+
+Summaries are built for a few typical schemas: a small mixed table, a wide numeric table and an
+approximate summary with quantiles and frequent values. Tokens are counted with tiktoken, as in
+SummaryCompactor. Serialization time is reported for a first call and for a memoized call.
+
+Usage: python benchmarks/bench_serializer.py
+"""
+import time
+
+import numpy as np
+import polars as pl
+
+from lida.components.compactor import count_message_tokens
+from lida.components.serializer import _serialize, serialize_summary
+from lida.components.summarizer import Summarizer
+
+
+def make_frames(n_rows: int = 5_000, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    cars = pl.DataFrame({
+        "Name": [f"Model {i} 4dr" for i in range(n_rows)],
+        "Type": rng.choice(["SUV", "Sedan", "Wagon", "Sports Car", "Minivan"], n_rows),
+        "AWD": rng.integers(0, 2, n_rows),
+        "Retail_Price": rng.lognormal(10, 0.4, n_rows),
+        "Horsepower_HP_": rng.integers(70, 500, n_rows),
+        "City_Miles_Per_Gallon": rng.normal(20, 5, n_rows),
+        "Released": pl.Series(rng.integers(10_000, 20_000, n_rows)).cast(pl.Date).dt.strftime("%Y-%m-%d"),
+    })
+    wide = pl.DataFrame({f"sensor_{i}": rng.normal(i, 1, n_rows) for i in range(100)})
+    return {"cars": cars, "wide": wide}
+
+
+def main():
+    summarizer = Summarizer()
+    summaries = {name: summarizer.summarize(df, text_gen=None, file_name=f"{name}.csv")
+                 for name, df in make_frames().items()}
+    summaries["cars (approximate)"] = summarizer.summarize(
+        make_frames()["cars"], text_gen=None, file_name="cars.csv", approximate=True)
+
+    print(f"{'schema':<20}{'repr tokens':>13}{'serialized':>12}{'reduction':>11}{'first (ms)':>12}{'memoized (ms)':>15}")
+    for name, summary in summaries.items():
+        repr_tokens = count_message_tokens(str(summary))
+        start = time.perf_counter()
+        _serialize(summary)
+        first = (time.perf_counter() - start) * 1000
+        text = serialize_summary(summary)
+        start = time.perf_counter()
+        serialize_summary(summary)
+        memoized = (time.perf_counter() - start) * 1000
+        tokens = count_message_tokens(text)
+        print(f"{name:<20}{repr_tokens:>13}{tokens:>12}{1 - tokens / repr_tokens:>10.0%}{first:>12.2f}{memoized:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare approximate (SketchProfiler) and exact (ColumnProfiler) column statistics.
+
+Reports the run time of both profilers and, for the approximate path, the observed error of
+distinct counts, quantiles and top values next to the error bounds reported in the summary.
+
+Usage: python benchmarks/bench_sketches.py
+"""
+import time
+
+import numpy as np
+import polars as pl
+
+from lida.components.profiler import ColumnProfiler
+from lida.components.sketches import SketchProfiler
+
+
+def make_frame(n_rows: int, seed: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pl.DataFrame({
+        "user_id": pl.Series(rng.integers(0, n_rows // 2, n_rows)).cast(pl.String),
+        "url": pl.Series(rng.integers(0, n_rows, n_rows)).cast(pl.String).str.replace(r"^", "https://x.io/"),
+        "country": rng.choice([f"c{i}" for i in range(200)], n_rows, p=np.r_[[0.3], np.full(199, 0.7 / 199)]),
+        "price": rng.lognormal(3, 1, n_rows),
+        "qty": rng.integers(0, 100, n_rows),
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'rows':>10}{'exact (s)':>11}{'approx (s)':>12}")
+    for n_rows in [100_000, 1_000_000, 5_000_000]:
+        df = make_frame(n_rows)
+        exact, exact_time = timed(lambda: ColumnProfiler().profile(df))
+        approx, approx_time = timed(lambda: SketchProfiler().profile(df))
+        print(f"{n_rows:>10}{exact_time:>11.2f}{approx_time:>12.2f}")
+
+        for e, a in zip(exact, approx):
+            column, exact_props, props = e["column"], e["properties"], a["properties"]
+            bounds = props["error_bounds"]
+            n_unique_error = abs(props["num_unique_values"] - exact_props["num_unique_values"]) / \
+                exact_props["num_unique_values"]
+            line = f"    {column:<10} distinct err {n_unique_error:.4f} (std err {bounds['num_unique_values']})"
+            if "quantiles" in props:
+                values = df[column].to_numpy()
+                rank_error = max(abs(np.mean(values <= v) - float(q)) for q, v in props["quantiles"].items())
+                line += f" | quantile rank err {rank_error:.4f} (bound {bounds['quantiles']})"
+            if props.get("top_values"):
+                exact_counts = dict(df[column].value_counts().iter_rows())
+                count_error = max(exact_counts[x["value"]] - x["count"] for x in props["top_values"])
+                line += f" | top count err {count_error} (bound {bounds['top_values']})"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Compare loading an uploaded CSV for chart execution by parsing it and from the DatasetStore.
+
+Usage: python benchmarks/bench_store.py
+"""
+import os
+import tempfile
+
+from bench_profiler import timeit
+from bench_streaming import write_csv
+from lida.components.store import DatasetStore
+from lida.utils import read_dataframe
+
+
+def main():
+    print(f"{'rows':>12}{'size (MB)':>12}{'parse (s)':>12}{'ingest (s)':>12}{'store (ms)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DatasetStore(os.path.join(tmp, "store"))
+        for n_rows in [100_000, 1_000_000, 5_000_000]:
+            path = os.path.join(tmp, f"data_{n_rows}.csv")
+            write_csv(path, n_rows)
+            size_mb = os.path.getsize(path) / 1024 ** 2
+            parse = timeit(lambda: read_dataframe(path, seed=0))
+            ingest = timeit(lambda: store.put_file(path), repeat=1)
+            dataset_id = store.put_file(path)
+            load = timeit(lambda: store.get(dataset_id))
+            print(f"{n_rows:>12}{size_mb:>12.0f}{parse:>12.3f}{ingest:>12.3f}{load * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measure peak memory of eager vs streaming summarization for growing CSV files.
+
+Each run happens in a fresh subprocess so that peak RSS is not shared between runs.
+Peak anonymous RSS is reported (Linux only): polars memory maps the files it reads, so
+the file backed part of RSS is reclaimable page cache that grows with the file size.
+
+Usage: python benchmarks/bench_streaming.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import polars as pl
+
+
+def write_csv(path: str, n_rows: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    chunk = 1_000_000
+    with open(path, "wb") as f:
+        for start in range(0, n_rows, chunk):
+            size = min(chunk, n_rows - start)
+            pl.DataFrame({
+                "id": np.arange(start, start + size),
+                "price": rng.normal(100, 20, size=size),
+                "qty": rng.integers(0, 50, size=size),
+                "kind": rng.choice(["a", "b", "c", "d"], size=size),
+                "name": rng.choice([f"name_{k}" for k in range(100_000)], size=size),
+            }).write_csv(f, include_header=start == 0)
+
+
+def anon_rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run(path: str, streaming: bool) -> None:
+    from lida.components.summarizer import Summarizer
+    peak = [anon_rss_mb()]
+    done = threading.Event()
+
+    def monitor():
+        while not done.is_set():
+            peak[0] = max(peak[0], anon_rss_mb())
+            time.sleep(0.005)
+
+    thread = threading.Thread(target=monitor)
+    thread.start()
+    start = time.perf_counter()
+    Summarizer().summarize(path, text_gen=None, streaming=streaming)
+    elapsed = time.perf_counter() - start
+    done.set()
+    thread.join()
+    print(f"{elapsed:.2f} {peak[0]:.0f}")
+
+
+def main():
+    print(f"{'rows':>12}{'size (MB)':>12}{'mode':>12}{'time (s)':>10}{'peak anon RSS (MB)':>20}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in [1_000_000, 5_000_000, 20_000_000]:
+            path = os.path.join(tmp, f"data_{n_rows}.csv")
+            write_csv(path, n_rows)
+            size_mb = os.path.getsize(path) / 1024 ** 2
+            for streaming in [False, True]:
+                output = subprocess.run(
+                    [sys.executable, __file__, path, str(streaming)],
+                    capture_output=True, text=True, check=True).stdout.split()
+                mode = "streaming" if streaming else "eager"
+                print(f"{n_rows:>12}{size_mb:>12.0f}{mode:>12}{float(output[0]):>10.2f}{output[1]:>20}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(sys.argv[1], sys.argv[2] == "True")
+    else:
+        main()
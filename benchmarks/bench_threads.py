@@ -0,0 +1,79 @@
+"""Render seaborn charts from several threads with global pyplot state and with figure scopes.
+
+With global pyplot state (how charts were rendered before figure scopes), threads draw on and
+save each other's current figure. Charts are compared to the same charts rendered one after the
+other to count wrong images. Figure-scoped rendering (ChartExecutor n_threads) gives the same
+images as sequential rendering.
+
+Usage: python benchmarks/bench_threads.py
+"""
+import base64
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.pyplot as plt
+import polars as pl
+
+from lida.components.executor import ChartExecutor, get_globals_dict, preprocess_code
+from lida.datamodel import Summary
+
+CODE = """
+import matplotlib.pyplot as plt
+import seaborn as sns
+def plot(data: pl.DataFrame):
+    df = data.to_pandas()
+    sns.barplot(data=df, x="kind", y="value", errorbar=None)
+    plt.title("chart {index}")
+    plt.xticks(rotation={index})
+    return plt, None, {{}}
+chart = plot(data)"""
+
+
+def global_pyplot(code: str, data: pl.DataFrame) -> str:
+    """Render a chart on the global current figure, as the executor did before figure scopes"""
+    try:
+        ex_locals = get_globals_dict(code, data)
+        exec(code, ex_locals)
+        buf = io.BytesIO()
+        plt.box(False)
+        plt.grid(color="lightgray", linestyle="dashed", zorder=-10)
+        plt.savefig(buf, format="png", dpi=100, pad_inches=0.2)
+        plt.close()
+        return base64.b64encode(buf.getvalue()).decode("ascii")
+    except Exception:
+        return None
+
+
+def main():
+    logging.disable(logging.INFO)
+    data = pl.DataFrame({"kind": ["a", "b", "c", "d"] * 250, "value": range(1000)})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=["kind", "value"])
+    code_specs = [CODE.format(index=index % 90) for index in range(32)]
+
+    start = time.perf_counter()
+    expected = [chart.raster for chart in ChartExecutor().execute(code_specs, data, summary, library="seaborn")]
+    sequential = time.perf_counter() - start
+
+    print(f"{'rendering':<22}{'threads':>8}{'time (s)':>10}{'wrong charts':>14}")
+    print(f"{'sequential':<22}{1:>8}{sequential:>10.2f}{0:>14}")
+    for n_threads in [2, 4, 8]:
+        with ThreadPoolExecutor(max_workers=n_threads) as threads:
+            start = time.perf_counter()
+            rasters = list(threads.map(lambda code: global_pyplot(preprocess_code(code), data), code_specs))
+            elapsed = time.perf_counter() - start
+        plt.close("all")
+        wrong = sum(raster != reference for raster, reference in zip(rasters, expected))
+        print(f"{'global pyplot':<22}{n_threads:>8}{elapsed:>10.2f}{wrong:>14}")
+
+        executor = ChartExecutor(n_threads=n_threads)
+        start = time.perf_counter()
+        charts = executor.execute(code_specs, data, summary, library="seaborn")
+        elapsed = time.perf_counter() - start
+        wrong = sum(chart.raster != reference for chart, reference in zip(charts, expected)) + len(code_specs) - len(charts)
+        print(f"{'figure scopes':<22}{n_threads:>8}{elapsed:>10.2f}{wrong:>14}")
+
+
+if __name__ == "__main__":
+    main()
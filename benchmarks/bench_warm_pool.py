@@ -0,0 +1,58 @@
+"""Compare the latency of the first charts executed by cold and warm executor workers.
+
+Cold workers import the plotting libraries when they execute their first chart, warm workers
+import them when the pool starts (see ExecutorPool preload and warm). Each mode runs in a fresh
+process, so that the libraries are not already imported by the forkserver.
+
+Usage: python benchmarks/bench_warm_pool.py
+"""
+import subprocess
+import sys
+import time
+
+import polars as pl
+
+from lida.components.pool import ExecutorPool
+from lida.datamodel import Summary
+
+CODE = """
+import seaborn as sns
+import matplotlib.pyplot as plt
+import statsmodels.api as sm
+import polars as pl
+def plot(data: pl.DataFrame):
+    df = data.to_pandas()
+    sns.scatterplot(data=df, x="x", y="y")
+    plt.title("y by x")
+    return plt, None, {}
+chart = plot(data)"""
+
+
+def run(mode: str) -> None:
+    data = pl.DataFrame({"x": range(1000), "y": [i % 17 for i in range(1000)]})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=["x", "y"])
+    start = time.perf_counter()
+    pool = ExecutorPool(n_workers=1, preload=None if mode == "warm" else [], warm=mode == "warm")
+    pool.start()
+    ready = time.perf_counter() - start
+    latencies = []
+    for _ in range(3):
+        start = time.perf_counter()
+        chart = pool.execute([CODE], data, summary, library="seaborn", return_error=True)[0]
+        assert chart.status, chart.error
+        latencies.append(time.perf_counter() - start)
+    pool.close()
+    print(f"{mode:<8}{ready:>12.3f}{latencies[0]:>14.3f}{latencies[1]:>15.3f}{latencies[2]:>14.3f}")
+
+
+def main():
+    print(f"{'mode':<8}{'start (s)':>12}{'1st chart (s)':>14}{'2nd chart (s)':>15}{'3rd chart (s)':>14}")
+    for mode in ["cold", "warm"]:
+        subprocess.run([sys.executable, __file__, mode], check=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+    else:
+        main()
@@ -1,8 +1,9 @@
+import json
 import typer
 import uvicorn
 import os
 from typing_extensions import Annotated
-from llmx import providers
+from llmx import llm, providers
 
 # from lida.web.backend.app import launch
 
@@ -39,6 +40,42 @@ def models():
             alog.info(f"  - {model['name']}")
 
 
+@app.command()
+def summarize(source: Annotated[str, typer.Argument(help="A directory, a glob pattern or a file")],
+              workers: int = 4,
+              output: Annotated[str, typer.Option(help="File to write the results to, as JSON lines")] = None,
+              n_samples: int = 3,
+              summary_method: str = "default",
+              streaming: bool = False,
+              approximate: bool = False):
+    """
+    Summarize every dataset in a directory or matching a glob pattern. Directories of parquet partitions are summarized as one dataset.
+    """
+    from lida.components.batch import BatchSummarizer
+    from lida.datamodel import TextGenerationConfig
+
+    text_gen = llm() if summary_method == "llm" else None
+    report = BatchSummarizer(n_workers=workers).summarize(
+        source, text_gen=text_gen, n_samples=n_samples, summary_method=summary_method,
+        textgen_config=TextGenerationConfig(n=1, temperature=0), streaming=streaming,
+        approximate=approximate)
+
+    lines = [json.dumps(result, default=str) for result in report["results"]]
+    if output:
+        with open(output, "w", encoding="utf-8") as file_object:
+            file_object.write("".join(line + "\n" for line in lines))
+    else:
+        for line in lines:
+            typer.echo(line)
+    for result in report["results"]:
+        if not result["status"]:
+            typer.echo(f"Failed: {result['path']}: {result['message']}", err=True)
+    typer.echo(
+        f"Summarized {report['n_datasets'] - report['n_failed']}/{report['n_datasets']} datasets "
+        f"({report['n_files']} files, {report['bytes'] / 1024 ** 2:.1f} MB) in {report['seconds']:.2f}s: "
+        f"{report['files_per_second']:.1f} files/s, {report['mb_per_second']:.1f} MB/s", err=True)
+
+
 def run():
     app()
 
@@ -0,0 +1,199 @@
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
+
+from llmx import TextGenerator
+
+from lida.components.cache import SummaryCache
+from lida.components.summarizer import Summarizer
+from lida.datamodel.__init__ import TextGenerationConfig
+
+logger = logging.getLogger("lida")
+
+# extensions of the files summarized as datasets
+DATASET_EXTENSIONS = {"csv", "tsv", "json", "jsonl", "ndjson", "parquet", "xls", "xlsx", "arrow", "ipc", "feather",
+                      "gz", "zst", "bz2"}
+
+# files written next to partitions by spark and other writers of partitioned datasets
+PARTITION_MARKERS = {"_SUCCESS", "_metadata", "_common_metadata"}
+
+
+def _extension(path: str) -> str:
+    return path.rsplit(".", 1)[-1].lower() if "." in os.path.basename(path) else ""
+
+
+def is_partitioned_dataset(path: str) -> bool:
+    """Whether a directory is a single table split in parquet files
+
+    A directory is a partitioned dataset if it has hive style partition directories (key=value)
+    or a partition marker file such as _SUCCESS, and contains parquet files.
+    """
+    entries = os.listdir(path)
+    marked = any(entry in PARTITION_MARKERS or
+                 ("=" in entry and os.path.isdir(os.path.join(path, entry))) for entry in entries)
+    return marked and _contains_only_parquet(path)
+
+
+def _contains_only_parquet(path: str) -> bool:
+    extensions = {_extension(name) for _, _, names in os.walk(path) for name in names
+                  if _extension(name) in DATASET_EXTENSIONS}
+    return extensions == {"parquet"}
+
+
+def partitioned_dataset_root(path: str) -> Optional[str]:
+    """The partitioned dataset a parquet file belongs to, or None if it is a dataset on its own
+
+    The file is a partition if its directory, or the directory above its hive style partition
+    directories (key=value), is a partitioned dataset (see is_partitioned_dataset).
+    """
+    if _extension(path) != "parquet":
+        return None
+    directory = os.path.dirname(path)
+    while "=" in os.path.basename(directory):
+        directory = os.path.dirname(directory)
+    if directory == os.path.dirname(path) and \
+            not any(os.path.exists(os.path.join(directory, marker)) for marker in PARTITION_MARKERS):
+        return None
+    return directory if os.path.isdir(directory) and is_partitioned_dataset(directory) else None
+
+
+def find_datasets(source: Union[str, List[str]]) -> List[str]:
+    """Find the datasets to summarize in a directory, a glob pattern or a list of paths
+
+    Files with a supported extension are datasets on their own, unless they are partitions of a
+    partitioned dataset (see is_partitioned_dataset): the partitioned directory is then a single
+    dataset, whether it is found by searching a directory or its files match a glob pattern or
+    are listed. Other directories are searched recursively.
+
+    Args:
+        source (Union[str, List[str]]): A directory, a glob pattern (``**`` matches nested
+            directories) or a list of paths.
+
+    Returns:
+        List[str]: Paths of the files and partitioned directories found, sorted.
+    """
+    def expand(path: str) -> List[str]:
+        if os.path.isfile(path):
+            if _extension(path) not in DATASET_EXTENSIONS:
+                return []
+            return [partitioned_dataset_root(path) or path]
+        if not os.path.isdir(path):
+            return []
+        if is_partitioned_dataset(path):
+            return [path]
+        return [dataset for entry in sorted(os.listdir(path)) if entry not in PARTITION_MARKERS
+                for dataset in expand(os.path.join(path, entry))]
+
+    if isinstance(source, str):
+        paths = [source] if os.path.exists(source) else glob.glob(source, recursive=True)
+    else:
+        paths = source
+    datasets = {dataset for path in paths for dataset in expand(os.path.normpath(path))}
+    return sorted(datasets)
+
+
+def get_size(path: str) -> int:
+    """Size in bytes of a file or of all the files in a directory"""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path)
+
+
+def _count_files(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(1 for _, _, names in os.walk(path) for name in names if _extension(name) == "parquet")
+    return 1
+
+
+class BatchSummarizer:
+    """Summarize many datasets concurrently with a bounded pool of worker threads.
+
+    Profiling runs in polars, which releases the GIL, and LLM enrichment waits on the network, so
+    datasets are summarized in threads sharing one Summarizer. A dataset that fails to be read or
+    summarized is reported with its error without stopping the other datasets.
+
+    Args:
+        summarizer (Summarizer, optional): The summarizer used for every dataset. Defaults to Summarizer().
+        summary_cache (SummaryCache, optional): Cache of summaries keyed by dataset content. Defaults to None.
+        n_workers (int, optional): Number of datasets summarized at the same time. Defaults to 4.
+    """
+
+    def __init__(self, summarizer: Optional[Summarizer] = None,
+                 summary_cache: Optional[SummaryCache] = None, n_workers: int = 4) -> None:
+        self.summarizer = summarizer or Summarizer()
+        self.summary_cache = summary_cache
+        self.n_workers = n_workers
+
+    def summarize_dataset(self, path: str, text_gen: Optional[TextGenerator] = None, **summary_params) -> dict:
+        """Summarize a single dataset, returning its summary or the error that occurred"""
+        name = os.path.basename(os.path.normpath(path))
+        start = time.perf_counter()
+        try:
+            size = get_size(path)
+            cache_params = None
+            summary = None
+            if self.summary_cache is not None:
+                cache_params = self.summary_cache.get_params(
+                    path, incremental=False, typed=False, **summary_params)
+                if summary_params["textgen_config"].use_cache:
+                    summary = self.summary_cache.get(cache_params)
+            if summary is None:
+                summary = self.summarizer.summarize(data=path, text_gen=text_gen, file_name=name,
+                                                    **summary_params)
+                if cache_params:
+                    self.summary_cache.set(cache_params, summary)
+        except Exception as exception_error:
+            logger.error(f"Failed to summarize {path}: {exception_error}")
+            return {"path": path, "name": name, "status": False, "message": str(exception_error),
+                    "seconds": time.perf_counter() - start}
+        return {"path": path, "name": name, "status": True, "summary": summary, "bytes": size,
+                "files": _count_files(path), "seconds": time.perf_counter() - start}
+
+    def summarize(
+            self, source: Union[str, List[str]], text_gen: Optional[TextGenerator] = None,
+            n_samples: int = 3, summary_method: str = "default",
+            textgen_config: TextGenerationConfig = TextGenerationConfig(n=1, temperature=0),
+            streaming: bool = False, approximate: bool = False) -> dict:
+        """Summarize every dataset found in source
+
+        Args:
+            source (Union[str, List[str]]): A directory, a glob pattern or a list of paths, see find_datasets.
+            text_gen (TextGenerator, optional): Text generator, only needed if summary_method is "llm".
+            n_samples, summary_method, textgen_config, streaming, approximate: See Summarizer.summarize.
+
+        Returns:
+            dict: The result of every dataset ("results", in the order of find_datasets) and the
+                throughput of the batch: "files_per_second" (counting every partition of a
+                partitioned dataset) and "mb_per_second".
+        """
+        datasets = find_datasets(source)
+        summary_params = {"n_samples": n_samples, "summary_method": summary_method,
+                          "textgen_config": textgen_config, "streaming": streaming,
+                          "approximate": approximate}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, self.n_workers)) as executor:
+            results = list(executor.map(
+                lambda path: self.summarize_dataset(path, text_gen=text_gen, **summary_params), datasets))
+        seconds = time.perf_counter() - start
+
+        succeeded = [result for result in results if result["status"]]
+        n_files = sum(result["files"] for result in succeeded)
+        n_bytes = sum(result["bytes"] for result in succeeded)
+        report = {
+            "results": results,
+            "n_datasets": len(datasets),
+            "n_failed": len(results) - len(succeeded),
+            "n_files": n_files,
+            "bytes": n_bytes,
+            "seconds": seconds,
+            "files_per_second": n_files / seconds if seconds else 0.0,
+            "mb_per_second": n_bytes / 1024 ** 2 / seconds if seconds else 0.0,
+        }
+        logger.info("Summarized %d datasets (%d failed) in %.2fs: %.1f files/s, %.1f MB/s",
+                    len(datasets), report["n_failed"], seconds, report["files_per_second"],
+                    report["mb_per_second"])
+        return report
@@ -0,0 +1,163 @@
+import copy
+import dataclasses
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+import polars as pl
+from diskcache import Cache
+from llmx.utils import get_user_cache_dir
+
+from lida.datamodel.__init__ import ChartExecutorResponse, TextGenerationConfig
+from lida.utils import cache_request, fingerprint_dataframe, fingerprint_file, get_cache_key
+
+logger = logging.getLogger("lida")
+
+
+class SummaryCache:
+    """Cache dataset summaries by dataset content and summarization parameters.
+
+    Summaries are kept in two tiers: an in-process LRU dictionary of the most recently used
+    summaries, and a size bounded diskcache store shared by processes using the same directory,
+    which evicts the least recently used summaries once size_limit bytes are exceeded.
+
+    Args:
+        cache_dir (str, optional): Directory of the disk cache. Defaults to a lida/summaries folder
+            in the user cache directory.
+        size_limit (int, optional): Maximum size of the disk cache in bytes. Defaults to 1GB.
+        hot_size (int, optional): Number of summaries kept in memory. Defaults to 64.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, size_limit: int = 2 ** 30,
+                 hot_size: int = 64) -> None:
+        self.cache_dir = cache_dir or os.path.join(get_user_cache_dir("lida"), "summaries")
+        self.disk = Cache(self.cache_dir, size_limit=size_limit,
+                          eviction_policy="least-recently-used")
+        self.hot_size = hot_size
+        self.hot: "OrderedDict[str, dict]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_params(
+            self, data: Union[pl.DataFrame, pl.LazyFrame, str],
+            textgen_config: TextGenerationConfig, fingerprint: Optional[str] = None,
+            **summary_params) -> Optional[Dict[str, Any]]:
+        """Parameters identifying a summary, or None if the data cannot be fingerprinted
+
+        Args:
+            data: The data to summarize, a DataFrame or a file path.
+            textgen_config: The text generation configuration used to enrich the summary.
+            fingerprint: Precomputed content fingerprint of data, computed if not given.
+            summary_params: Other arguments changing the summary e.g. n_samples or summary_method.
+        """
+        if fingerprint is None:
+            if isinstance(data, str):
+                fingerprint = fingerprint_file(data)
+            elif isinstance(data, pl.DataFrame):
+                fingerprint = fingerprint_dataframe(data)
+            else:
+                return None
+        # use_cache only controls whether cached results are returned, not what they contain
+        config = {key: value for key, value in dataclasses.asdict(textgen_config).items()
+                  if key != "use_cache"}
+        return {"fingerprint": fingerprint, "textgen_config": config, **summary_params}
+
+    def get(self, params: Dict[str, Any]) -> Optional[dict]:
+        """Return a copy of the cached summary for params, or None"""
+        key = get_cache_key(params)
+        with self.lock:
+            summary = self.hot.get(key)
+            if summary is not None:
+                self.hot.move_to_end(key)
+        if summary is None:
+            summary = cache_request(self.disk, params)
+            if summary is not None:
+                self._set_hot(key, summary)
+        with self.lock:
+            if summary is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(summary)
+
+    def set(self, params: Dict[str, Any], summary: dict) -> None:
+        """Store a copy of summary for params in both tiers"""
+        summary = copy.deepcopy(summary)
+        cache_request(self.disk, params, values=summary)
+        self._set_hot(get_cache_key(params), summary)
+
+    def _set_hot(self, key: str, summary: dict) -> None:
+        with self.lock:
+            self.hot[key] = summary
+            self.hot.move_to_end(key)
+            while len(self.hot) > self.hot_size:
+                self.hot.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all summaries from both tiers"""
+        with self.lock:
+            self.hot.clear()
+        self.disk.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Cache usage statistics"""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "hot_entries": len(self.hot),
+                    "disk_entries": len(self.disk), "disk_bytes": self.disk.volume()}
+
+
+class ChartCache:
+    """Cache rendered charts by code, data, library and render options.
+
+    Successful ChartExecutorResponse objects (raster or spec, with the returned df and cols) are
+    kept in a size bounded diskcache store shared by processes using the same directory, which
+    evicts the least recently used charts once size_limit bytes are exceeded. A cached chart is
+    returned without executing its code again.
+
+    Args:
+        cache_dir (str, optional): Directory of the cache. Defaults to a lida/charts folder in the
+            user cache directory.
+        size_limit (int, optional): Maximum size of the cache in bytes. Defaults to 512MB.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, size_limit: int = 512 * 2 ** 20) -> None:
+        self.cache_dir = cache_dir or os.path.join(get_user_cache_dir("lida"), "charts")
+        self.disk = Cache(self.cache_dir, size_limit=size_limit,
+                          eviction_policy="least-recently-used")
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, code_hash: str, fingerprint: str, library: str, options: Dict[str, Any]) -> str:
+        """Key of a chart from the hash of its normalized code, the data fingerprint, library and render options"""
+        return get_cache_key({"code": code_hash, "fingerprint": fingerprint, "library": library,
+                              "options": options})
+
+    def get(self, key: str) -> Optional[ChartExecutorResponse]:
+        """The cached chart for key, or None"""
+        chart = self.disk.get(key)
+        with self.lock:
+            if chart is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return chart
+
+    def set(self, key: str, chart: ChartExecutorResponse) -> None:
+        """Cache a chart, failed executions are not cached"""
+        if chart.status:
+            self.disk.set(key, chart)
+
+    def clear(self) -> None:
+        """Remove all charts"""
+        self.disk.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Cache usage statistics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.disk),
+                    "bytes": self.disk.volume(), "hit_rate": self.hits / lookups if lookups else 0.0}
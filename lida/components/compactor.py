@@ -0,0 +1,158 @@
+import copy
+import dataclasses
+import logging
+import re
+import threading
+from typing import Any, Callable, List, Optional, Union
+
+import tiktoken
+
+from lida.components.serializer import serialize_field, serialize_summary
+from lida.datamodel.summary import Summary
+
+logger = logging.getLogger("lida")
+
+# base relevance of a field by dtype, columns that can be plotted directly rank higher
+DTYPE_SCORES = {"date": 1.0, "category": 1.0, "number": 0.8, "boolean": 0.5, "string": 0.2}
+
+# properties dropped from every field once the summary does not fit in the budget
+LOW_VALUE_PROPERTIES = ["error_bounds", "quantiles", "top_values"]
+
+
+# tokens of the role and delimiters of a system message, as counted by lida.utils.num_tokens_from_messages
+MESSAGE_OVERHEAD_TOKENS = 7
+# characters per token of english text and JSON, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+_encoding: Any = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def get_encoding() -> Any:
+    """The tiktoken encoding of the chat models, loaded once per process, or None if it cannot be loaded
+
+    tiktoken downloads encodings on first use, so loading fails without network access.
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    _encoding = tiktoken.encoding_for_model("gpt-3.5-turbo-0301")
+                except Exception as exception_error:
+                    logger.warning("Estimating token counts from text length, tiktoken failed: %s",
+                                   exception_error)
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_message_tokens(text: str) -> int:
+    """Number of tokens of text sent as the content of a chat message, estimated from its length
+    if the tokenizer is not available"""
+    encoding = get_encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN) + MESSAGE_OVERHEAD_TOKENS
+    return len(encoding.encode(text)) + MESSAGE_OVERHEAD_TOKENS
+
+
+class SummaryCompactor:
+    """Fit a dataset summary into a token budget before it is embedded in a prompt.
+
+    Every summary is stripped of what does not help the model: the incremental statistics state,
+    empty semantic types and descriptions, and sample values longer than max_value_length. When
+    the summary is still over budget, low value properties (error bounds, quantiles, top values)
+    are dropped, then the fields least relevant to the query are dropped until it fits. The names
+    of all columns stay in field_names. Tokens are counted on the serialized summary (see
+    serialize_summary), which is how summaries are embedded in prompts.
+
+    Args:
+        max_tokens (int, optional): Token budget of the summary. Defaults to 2000.
+        max_value_length (int, optional): Sample values are truncated to this many characters. Defaults to 50.
+        count_tokens (Callable[[str], int], optional): Function counting the tokens of a text.
+            Defaults to count_message_tokens.
+    """
+
+    def __init__(self, max_tokens: int = 2000, max_value_length: int = 50,
+                 count_tokens: Optional[Callable[[str], int]] = None) -> None:
+        self.max_tokens = max_tokens
+        self.max_value_length = max_value_length
+        self.count_tokens = count_tokens or count_message_tokens
+
+    def rank_fields(self, fields: List[dict], query: str = "") -> List[int]:
+        """Indices of fields from most to least relevant to the query
+
+        Fields named in the query come first, then fields sharing words with the query through
+        their name, semantic type or description, with ties broken by dtype and column order.
+        """
+        query = query.lower()
+        query_words = set(re.findall(r"[a-z0-9]+", query))
+
+        def score(index: int) -> float:
+            field = fields[index]
+            properties = field.get("properties", {})
+            column = str(field.get("column", "")).lower()
+            value = DTYPE_SCORES.get(properties.get("dtype"), 0.0)
+            if column and re.search(rf"(?<!\w){re.escape(column)}(?!\w)", query):
+                value += 10
+            text = " ".join([column, str(properties.get("semantic_type", "")),
+                             str(properties.get("description", ""))]).lower()
+            words = set(re.findall(r"[a-z0-9]+", text))
+            if words:
+                value += 2 * len(words & query_words) / len(words)
+            return value
+
+        return sorted(range(len(fields)), key=lambda index: -score(index))
+
+    def _truncate(self, value):
+        if isinstance(value, str) and len(value) > self.max_value_length:
+            return value[:self.max_value_length] + "..."
+        return value
+
+    def compact_field(self, field: dict, drop_properties: List[str] = ()) -> dict:
+        """Copy of a field with truncated sample values and without empty or dropped properties"""
+        properties = {}
+        for key, value in field.get("properties", {}).items():
+            if key in drop_properties or (key in ("semantic_type", "description") and not value):
+                continue
+            if key == "samples":
+                value = [self._truncate(x) for x in value]
+            properties[key] = value
+        return {**field, "properties": properties}
+
+    def compact(self, summary: Union[dict, Summary], query: str = "") -> dict:
+        """Return a copy of summary fitting in max_tokens, keeping the fields most relevant to query
+
+        Args:
+            summary (Union[dict, Summary]): The summary to compact.
+            query (str, optional): Text the summary is used for, e.g. a goal, instructions or code.
+        """
+        if dataclasses.is_dataclass(summary):
+            summary = dataclasses.asdict(summary)
+        summary = {key: copy.deepcopy(value) for key, value in summary.items() if key != "state"}
+        fields = summary.get("fields") or []
+
+        compacted = [self.compact_field(field) for field in fields]
+        summary["fields"] = compacted
+        if self.count_tokens(serialize_summary(summary)) <= self.max_tokens:
+            return summary
+
+        compacted = [self.compact_field(field, LOW_VALUE_PROPERTIES) for field in fields]
+        summary["fields"] = compacted
+        if self.count_tokens(serialize_summary(summary)) <= self.max_tokens:
+            return summary
+
+        # keep the most relevant fields that fit next to the rest of the summary
+        summary["fields"] = []
+        budget = self.max_tokens - self.count_tokens(serialize_summary(summary))
+        kept = []
+        for index in self.rank_fields(compacted, query):
+            # one line per field
+            cost = self.count_tokens(serialize_field(compacted[index])) + 1
+            if cost <= budget:
+                kept.append(index)
+                budget -= cost
+        summary["fields"] = [compacted[index] for index in sorted(kept)]
+        logger.info("Summary compacted to %d of %d fields to fit in %d tokens",
+                    len(kept), len(fields), self.max_tokens)
+        return summary
@@ -1,18 +1,29 @@
 from lida.datamodel.__init__ import ChartExecutorResponse
 from lida.datamodel import Summary
-from typing import Any, List
+from lida.utils import fingerprint_dataframe
+from lida.components.rendering import figure_scope, render_figure
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import alog
 import ast
 import base64
+import hashlib
 import importlib
 import io
+import logging
 import matplotlib.pyplot as plt
 import plotly.io as pio
 import polars as pl
 import re
 import sys
+import threading
+import tokenize
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import CodeType
+
+logger = logging.getLogger("lida")
 
 
 def preprocess_code(code: str) -> str:
@@ -63,42 +74,470 @@ def preprocess_code(code: str) -> str:
     return code
 
 
-def get_globals_dict(code_string, data):
-    # Parse the code string into an AST
-    tree = ast.parse(code_string)
-    # Extract the names of the imported modules and their aliases
-    imported_modules = []
+SUPPORTED_LIBRARIES = ["altair", "matplotlib", "seaborn", "ggplot", "plotly"]
+
+# attributes and polars functions that read columns which are not named in the code
+ALL_COLUMNS_ATTRIBUTES = {
+    "columns", "dtypes", "schema", "iloc", "iter_columns", "get_columns", "to_numpy", "to_dict",
+    "select_dtypes", "describe", "corr", "cov", "transpose", "T", "pairplot", "unpivot", "melt", "drop",
+}
+ALL_COLUMNS_FUNCTIONS = {"all", "exclude", "nth", "first", "last", "selectors"}
+# methods returning the rows of a frame with all its columns, e.g. df.filter(...) or df.sort_values(...)
+FRAME_METHODS = {
+    "filter", "where", "query", "sort", "sort_values", "sort_index", "head", "tail", "limit", "slice",
+    "sample", "nlargest", "nsmallest", "top_k", "bottom_k", "reverse", "unique", "drop_duplicates",
+    "drop_nulls", "dropna", "fill_null", "fill_nan", "fillna", "with_columns", "with_row_index", "assign",
+    "rename", "cast", "astype", "reset_index", "set_index", "to_pandas", "lazy", "collect", "clone", "copy",
+    "group_by", "groupby",
+}
+# calls whose result only has the columns named in their arguments
+COLUMN_SELECTIONS = {"col", "select", "get_column", "column"}
+# calls on a grouped frame returning the group keys only
+GROUP_SIZES = {"size", "len"}
+# attributes of a frame that do not read its values
+FRAME_ATTRIBUTES = {"shape", "height", "width", "empty", "is_empty", "index"}
+# functions given a whole frame that only read the columns named in their arguments or encodings
+FRAME_FUNCTIONS = {"len", "print", "isinstance", "Chart", "ggplot"}
+# altair encodings of a field with a type and an aggregate, e.g. "price:Q" or "mean(price):Q"
+ALTAIR_SHORTHAND = re.compile(r"^(?:\w+\()?(.+?)\)?:[QONTG]$")
+# keyword arguments naming the columns a plotting function reads, e.g. sns.barplot(data=df, x="a", y="b")
+COLUMN_KEYWORDS = {"x", "y"}
+
+
+def _is_column_subscript(index: ast.AST) -> bool:
+    """Whether a subscript selects columns by name, df["a"], df[["a", "b"]] or df.loc[rows, "a"]"""
+    if isinstance(index, ast.Tuple) and index.elts:
+        index = index.elts[-1]
+    if isinstance(index, (ast.List, ast.Tuple)) and index.elts:
+        return all(isinstance(item, ast.Constant) and isinstance(item.value, str) for item in index.elts)
+    return isinstance(index, ast.Constant) and isinstance(index.value, str)
+
+
+def _call_name(call: ast.Call) -> Optional[str]:
+    if isinstance(call.func, ast.Attribute):
+        return call.func.attr
+    return call.func.id if isinstance(call.func, ast.Name) else None
+
+
+class _FrameUses:
+    """Follows the whole frames of chart code, from data through the names they are assigned to.
+
+    Every use of a frame must be one of: a selection of named columns (df["a"], df.a, df.select("a"),
+    df.group_by("a").agg(pl.col("b").sum()), df.pivot_table(..., values="b")), an operation keeping
+    its rows and columns (see FRAME_METHODS) whose result is used the same way, an assignment to a
+    name, a return value, or an argument of a function defined in the code, of FRAME_FUNCTIONS or of
+    a plotting function given its columns with x= or y=. Any other use may read every column.
+    """
+
+    def __init__(self, tree: ast.AST, fields: set) -> None:
+        self.fields = fields
+        self.parents = {child: node for node in ast.walk(tree) for child in ast.iter_child_nodes(node)}
+        self.functions = {node.name: node for node in ast.walk(tree)
+                          if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+        self.frames = {"data"}
+        self.names = [node for node in ast.walk(tree) if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)]
+
+    def only_named_columns(self) -> bool:
+        """Whether every use of a frame only reads the columns named in the code"""
+        checked = set()
+        while True:
+            uses = [name for name in self.names if name.id in self.frames and name not in checked]
+            if not uses:
+                return True
+            for name in uses:
+                checked.add(name)
+                if not self.follow(name):
+                    return False
+
+    def follow(self, node: ast.AST) -> bool:
+        """Follow a frame through the operations applied to it, marking the names it is assigned to"""
+        while True:
+            parent = self.parents.get(node)
+            if isinstance(parent, ast.Attribute) and parent.value is node:
+                call = self.parents.get(parent)
+                if not (isinstance(call, ast.Call) and call.func is parent):
+                    if parent.attr == "loc":
+                        node = parent
+                        continue
+                    return parent.attr in self.fields or parent.attr in FRAME_ATTRIBUTES
+                if parent.attr in FRAME_METHODS:
+                    node = call
+                    continue
+                if parent.attr == "agg":
+                    # df.agg("mean") or df.groupby("a").agg("sum") reduce every column
+                    return not any(isinstance(arg, ast.Constant) for arg in call.args)
+                if parent.attr in ("pivot", "pivot_table"):
+                    return any(keyword.arg == "values" for keyword in call.keywords)
+                return parent.attr in COLUMN_SELECTIONS or parent.attr in GROUP_SIZES
+            if isinstance(parent, ast.Subscript) and parent.value is node:
+                if _is_column_subscript(parent.slice):
+                    return True
+                # rows filtered by a mask or sliced, with all the columns
+                node = parent
+                continue
+            if isinstance(parent, ast.Assign) and parent.value is node:
+                if not all(isinstance(target, ast.Name) for target in parent.targets):
+                    return False
+                self.frames.update(target.id for target in parent.targets)
+                return True
+            if isinstance(parent, (ast.Tuple, ast.List)) and isinstance(self.parents.get(parent), ast.Return):
+                return True
+            if isinstance(parent, (ast.Return, ast.Expr)):
+                return True
+            if isinstance(parent, ast.keyword):
+                return self.passed_to(self.parents[parent], keyword=parent.arg)
+            if isinstance(parent, ast.Call) and node in parent.args:
+                return self.passed_to(parent, position=parent.args.index(node))
+            return False
+
+    def passed_to(self, call: ast.Call, position: Optional[int] = None, keyword: Optional[str] = None) -> bool:
+        """Whether a call given a whole frame only reads named columns of it"""
+        name = _call_name(call)
+        function = self.functions.get(name) if isinstance(call.func, ast.Name) else None
+        if function is not None:
+            # the parameter of a function of the code is a frame, followed in its body
+            parameters = [arg.arg for arg in function.args.posonlyargs + function.args.args]
+            if keyword is not None:
+                self.frames.add(keyword)
+            elif position < len(parameters):
+                self.frames.add(parameters[position])
+            return True
+        return name in FRAME_FUNCTIONS or any(item.arg in COLUMN_KEYWORDS for item in call.keywords)
+
+
+def referenced_columns(code: Union[str, ast.AST], field_names: List[str]) -> Optional[List[str]]:
+    """Columns of the dataset read by chart code, or None if they cannot be determined statically.
+
+    A field is referenced when its name is a string literal or an attribute in the code. Columns
+    are only known if every use of the data, and of the frames derived from it, selects columns by
+    name (see _FrameUses): charts plotting a whole frame (sns.boxplot(data=df), df.plot(...),
+    sns.heatmap(df)), reading its values (df.values) or reducing it (df.mean()) are inconclusive.
+    So are charts selecting columns by position, dtype, pattern or range (pl.col("*"),
+    df.loc[:, "a":"c"]) or building column names at runtime.
+    code is the source of the chart or its parsed syntax tree.
+    """
+    if isinstance(code, ast.AST):
+        tree = code
+    else:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return None
+    fields = set(field_names)
+    referenced = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            shorthand = ALTAIR_SHORTHAND.match(node.value)
+            if node.value in fields:
+                referenced.add(node.value)
+            elif shorthand and shorthand.group(1) in fields:
+                referenced.add(shorthand.group(1))
+            elif node.value.startswith("^") and node.value.endswith("$"):
+                # polars regex column selection
+                return None
+        elif isinstance(node, ast.Attribute):
+            if node.attr in fields:
+                referenced.add(node.attr)
+            elif node.attr in ALL_COLUMNS_ATTRIBUTES:
+                return None
+            elif node.attr in ALL_COLUMNS_FUNCTIONS and isinstance(node.value, ast.Name) \
+                    and node.value.id in ("pl", "polars"):
+                return None
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            # column selectors by dtype or name pattern (import polars.selectors as cs)
+            names = [f"{getattr(node, 'module', None) or ''}.{alias.name}" for alias in node.names]
+            if any("selectors" in name for name in names):
+                return None
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            # pl.col(pl.Float64) selects by dtype, pl.col(f"...") by a computed name
+            if node.func.attr == "col" and any(
+                    not isinstance(arg, (ast.Constant, ast.Name, ast.List, ast.Starred))
+                    or (isinstance(arg, ast.Constant) and arg.value == "*") for arg in node.args):
+                return None
+        elif isinstance(node, ast.Subscript):
+            index = node.slice.elts if isinstance(node.slice, ast.Tuple) else [node.slice]
+            # positional column indexing (data[:, 0]) or a computed column name
+            if isinstance(node.slice, ast.Tuple) and any(
+                    isinstance(item, ast.Constant) and isinstance(item.value, int) for item in index):
+                return None
+            if any(isinstance(item, (ast.JoinedStr, ast.BinOp)) for item in index):
+                return None
+            # a range of columns by name, df.loc[:, "a":"c"]
+            if any(isinstance(item, ast.Slice) and any(
+                    isinstance(bound, ast.Constant) and isinstance(bound.value, str)
+                    for bound in (item.lower, item.upper)) for item in index):
+                return None
+    if not referenced or not _FrameUses(tree, fields).only_named_columns():
+        return None
+    return [name for name in field_names if name in referenced]
+
+
+def project_data(data: Any, code: Union[str, ast.AST], summary: Summary) -> Any:
+    """Only keep the columns of the data referenced by the code, or all of them if unsure"""
+    if not isinstance(data, pl.DataFrame):
+        return data
+    columns = referenced_columns(code, [name for name in summary.field_names or data.columns
+                                        if name in data.schema])
+    if columns is None or len(columns) == data.width:
+        return data
+    # selecting columns does not copy them, and to_pandas() then only converts these
+    return data.select(columns)
+
+
+# libraries imported when executor workers start, so that no chart pays for importing them
+DEFAULT_PRELOAD = [
+    "numpy", "pandas", "matplotlib.pyplot", "seaborn", "altair", "plotly.express", "plotly.graph_objects",
+    "plotnine", "statsmodels.api", "geopandas",
+]
+# modules and imported names resolved in this process, by (module, name)
+_resolved_imports: Dict[Tuple[str, Optional[str]], Any] = {}
+# names every chart is executed with, whether modules were preloaded or not: code using other
+# modules imports them, in workers as in this process
+_template_globals: Dict[str, Any] = {"pl": pl, "plt": plt}
+
+
+def resolve_import(module_name: str, name: Optional[str] = None) -> Any:
+    """A module, or a name imported from it, imported once per process"""
+    key = (module_name, name)
+    obj = _resolved_imports.get(key)
+    if obj is None:
+        module = importlib.import_module(module_name)
+        obj = _resolved_imports[key] = getattr(module, name) if name is not None else module
+    return obj
+
+
+def preload_modules(modules: List[str]) -> List[str]:
+    """Import modules ahead of the first chart, so that the imports of charts find them loaded
+
+    Preloading does not change the names charts are executed with. Modules that are not installed
+    or fail to import (e.g. a broken native library) are skipped, the names of the imported
+    modules are returned.
+    """
+    loaded = []
+    for module_name in modules:
+        try:
+            resolve_import(module_name)
+        except Exception as exception_error:
+            logger.info("Not preloading %s: %s", module_name, exception_error)
+            continue
+        loaded.append(module_name)
+    return loaded
+
+
+def import_bindings(tree: ast.Module) -> Dict[str, Any]:
+    """Names bound by the top level imports of chart code, resolved with resolve_import"""
+    bindings = {}
     for node in tree.body:
         if isinstance(node, ast.Import):
             for alias in node.names:
-                module = importlib.import_module(alias.name)
-                imported_modules.append((alias.name, alias.asname, module))
+                module = resolve_import(alias.name)
+                bindings[alias.asname or alias.name.split(".")[-1]] = module
         elif isinstance(node, ast.ImportFrom):
-            module = importlib.import_module(node.module)
             for alias in node.names:
-                obj = getattr(module, alias.name)
-                imported_modules.append(
-                    (f"{node.module}.{alias.name}", alias.asname, obj)
-                )
+                obj = resolve_import(node.module, alias.name)
+                bindings[alias.asname or alias.name] = obj
+    return bindings
 
-    # Import the required modules into a dictionary
-    globals_dict = {}
-    for module_name, alias, obj in imported_modules:
-        if alias:
-            globals_dict[alias] = obj
-        else:
-            globals_dict[module_name.split(".")[-1]] = obj
+
+def get_globals_dict(code_string, data):
+    # Parse the code string into an AST
+    tree = ast.parse(code_string)
+    # the default names, then the modules imported by the code
+    globals_dict = dict(_template_globals)
+    globals_dict.update(import_bindings(tree))
 
     ex_dicts = {"pl": pl, "data": data, "plt": plt}
     globals_dict.update(ex_dicts)
     return globals_dict
 
 
+def normalize_code(code: str) -> str:
+    """Code without the leading and trailing blank lines and trailing spaces that do not change what it does.
+
+    Trailing spaces are kept on the lines of multi-line strings, where they are part of the value.
+    Code that cannot be tokenized is only stripped.
+    """
+    code = code.strip()
+    lines = code.splitlines()
+    in_strings = set()
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            (start, _), (end, _) = token.start, token.end
+            in_strings.update(range(start - 1, end - 1))
+    except (tokenize.TokenError, SyntaxError):
+        return code
+    return "\n".join(line if index in in_strings else line.rstrip() for index, line in enumerate(lines))
+
+
+def code_hash(code: str) -> str:
+    """Hash of the normalized code"""
+    return hashlib.blake2b(normalize_code(code).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CompiledChart:
+    """A code spec preprocessed once, and parsed, compiled and with its imports resolved on first use"""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._tree: Optional[ast.Module] = None
+        self._code: Optional[CodeType] = None
+        self._bindings: Optional[Dict[str, Any]] = None
+
+    def _compile(self) -> None:
+        # SyntaxError and ImportError are raised again on every use, nothing is kept
+        tree = ast.parse(self.source)
+        bindings = import_bindings(tree)
+        self._code = compile(tree, "<string>", "exec")
+        self._tree, self._bindings = tree, bindings
+
+    @property
+    def tree(self) -> ast.Module:
+        if self._tree is None:
+            self._compile()
+        return self._tree
+
+    @property
+    def code(self) -> CodeType:
+        if self._code is None:
+            self._compile()
+        return self._code
+
+    def globals(self, data: Any) -> Dict[str, Any]:
+        """A fresh namespace to execute the chart in, equal to get_globals_dict(source, data)"""
+        if self._bindings is None:
+            self._compile()
+        globals_dict = dict(_template_globals)
+        globals_dict.update(self._bindings)
+        globals_dict.update({"pl": pl, "data": data, "plt": plt})
+        return globals_dict
+
+
+class CodeCache:
+    """Thread safe LRU cache of compiled code specs, keyed by a hash of their normalized code.
+
+    Edit, repair and recommend loops execute the same specs again: cached specs are not
+    preprocessed, parsed or compiled again, and their imports are not resolved again.
+
+    Args:
+        max_entries (int, optional): Number of specs kept. Defaults to 256.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CompiledChart]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, code: str) -> CompiledChart:
+        """The compiled chart of a code spec, created if it is not cached"""
+        key = code_hash(code)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = CompiledChart(preprocess_code(code))
+        with self.lock:
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Cache usage statistics"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self.entries), "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
 class ChartExecutor:
     """Execute code and return chart object"""
 
-    def __init__(self) -> None:
-        pass
+    def __init__(self, project_columns: bool = True, pool: Any = None, code_cache_size: int = 256,
+                 chart_cache: Any = None, n_threads: int = 1) -> None:
+        # run each chart on the columns its code references rather than the whole dataset
+        self.project_columns = project_columns
+        # ExecutorPool running charts in parallel worker processes, charts run in this process if None
+        self.pool = pool
+        self.code_cache = CodeCache(max_entries=code_cache_size)
+        # ChartCache of rendered charts, charts are always executed if None
+        self.chart_cache = chart_cache
+        # matplotlib and seaborn charts executed at the same time in this process
+        self.n_threads = n_threads
+
+    def chart_data(self, data: Any, code: Union[str, ast.AST], summary: Summary) -> Any:
+        """The data a chart is executed on"""
+        return project_data(data, code, summary) if self.project_columns else data
+
+    def chart_globals(self, chart: CompiledChart, data: Any, summary: Summary) -> Dict[str, Any]:
+        """The namespace a chart is executed in"""
+        return chart.globals(self.chart_data(data, chart.tree, summary))
+
+    def render_options(self, library: str, summary: Summary) -> Dict[str, Any]:
+        """Settings other than the code and data that change the rendered chart"""
+        options = {"project_columns": self.project_columns}
+        if library == "altair":
+            # the spec points to the data file
+            options["file_name"] = summary.file_name
+        return options
+
+    def _execute_pyplot(self, code: str, compiled_chart: CompiledChart, data: Any, summary: Summary,
+                        library: str, return_error: bool) -> Optional[ChartExecutorResponse]:
+        """Execute a matplotlib or seaborn chart and render the figure it drew on"""
+        try:
+            # the chart draws on pyplot figures of this thread only, closed once rendered
+            with figure_scope() as scope:
+                ex_locals = self.chart_globals(compiled_chart, data, summary)
+                exec(compiled_chart.code, ex_locals)
+
+                chart, df, cols = ex_locals["chart"]
+                plot_data = render_figure(scope.figure(chart))
+            return ChartExecutorResponse(
+                df=df,
+                cols=cols,
+                spec=None,
+                status=True,
+                raster=plot_data,
+                code=code,
+                library=library,
+            )
+        except Exception as exception_error:
+            # alog.info(exception_error)
+
+            traceback.print_exception(Exception,
+                                      exception_error,
+                                      tb=None,
+                                      limit=None,
+                                      file=sys.stderr)
+
+            alog.info(code)
+
+            alog.info(("****\n", str(exception_error)))
+
+            # alog.info(traceback.format_exc())
+            if return_error:
+                return ChartExecutorResponse(
+                    spec=None,
+                    status=False,
+                    raster=None,
+                    code=code,
+                    library=library,
+                    error={
+                        "message": str(exception_error),
+                        "traceback": traceback.format_exc(),
+                    },
+                )
+        return None
 
     def execute(
         self,
@@ -107,8 +546,44 @@ class ChartExecutor:
         summary: Summary,
         library="altair",
         return_error: bool = False,
+        dataset_id: Optional[str] = None,
+    ) -> Any:
+        """Validate and convert code
+
+        With a chart cache, charts already rendered from the same code, data, library and render
+        options are returned from the cache without being executed. dataset_id identifies the
+        content of data (e.g. the dataset_id of the summary the data was registered with): the chart
+        cache and the execution workers use it instead of hashing the frame, which is only hashed
+        when no dataset_id is given.
+        """
+        if self.chart_cache is None or not isinstance(data, pl.DataFrame) or not code_specs:
+            return self._execute(code_specs, data, summary, library, return_error, dataset_id=dataset_id)
+
+        if isinstance(summary, dict):
+            summary = Summary(**summary)
+        fingerprint = dataset_id or fingerprint_dataframe(data)
+        options = self.render_options(library, summary)
+        keys = [self.chart_cache.get_key(code_hash(code), fingerprint, library, options) for code in code_specs]
+        charts = [self.chart_cache.get(key) for key in keys]
+        missing = [index for index, chart in enumerate(charts) if chart is None]
+        if missing:
+            # with errors returned, every code spec gives exactly one chart
+            executed = self._execute([code_specs[index] for index in missing], data, summary, library,
+                                     return_error=True, dataset_id=dataset_id)
+            for index, chart in zip(missing, executed):
+                charts[index] = chart
+                self.chart_cache.set(keys[index], chart)
+        return [chart for chart in charts if return_error or chart.status]
+
+    def _execute(
+        self,
+        code_specs: List[str],
+        data: Any,
+        summary: Summary,
+        library="altair",
+        return_error: bool = False,
+        dataset_id: Optional[str] = None,
     ) -> Any:
-        """Validate and convert code"""
 
         # # check if user has given permission to execute code. if env variable
         # # LIDA_ALLOW_CODE_EVAL is set to '1'. Else raise exception
@@ -116,21 +591,26 @@ class ChartExecutor:
         #     raise Exception(
         #         "Permission to execute code not granted. Please set the environment variable LIDA_ALLOW_CODE_EVAL to '1' to allow code execution.")
 
+        if self.pool is not None:
+            return self.pool.execute(code_specs, data, summary, library=library, return_error=return_error,
+                                     project_columns=self.project_columns, dataset_id=dataset_id)
+
         if isinstance(summary, dict):
             summary = Summary(**summary)
 
         charts = []
         code_spec_copy = code_specs.copy()
-        code_specs = [preprocess_code(code) for code in code_specs]
+        compiled = [self.code_cache.get(code) for code in code_specs]
+        code_specs = [chart.source for chart in compiled]
 
         alog.info('### print code_specs ###')
         alog.info(''.join(code_specs))
 
         if library == "altair":
-            for code in code_specs:
+            for code, compiled_chart in zip(code_specs, compiled):
                 try:
-                    ex_locals = get_globals_dict(code, data)
-                    exec(code, ex_locals)
+                    ex_locals = self.chart_globals(compiled_chart, data, summary)
+                    exec(compiled_chart.code, ex_locals)
                     chart = ex_locals["chart"]
                     vega_spec = chart.to_dict()
                     del vega_spec["data"]
@@ -167,78 +647,22 @@ class ChartExecutor:
                         )
             return charts
         elif library == "matplotlib" or library == "seaborn":
-            # print colum dtypes
-            for code in code_specs:
-                # import alog
-                # alog.info(code)
-
-                try:
-                    ex_locals = get_globals_dict(code, data)
-                    exec(code, ex_locals)
-
-                    chart, df, cols = ex_locals["chart"]
-
-                    if plt:
-                        buf = io.BytesIO()
-                        plt.box(False)
-                        plt.grid(color="lightgray", linestyle="dashed", zorder=-10)
-                        # try:
-                        #     plt.draw()
-                        #     # plt.tight_layout()
-                        # except AttributeError:
-                        #     alog.info("Warning: tight_layout encountered an error. The layout may not be optimal.")
-                        #     pass
-
-                        plt.savefig(buf, format="png", dpi=100, pad_inches=0.2)
-                        buf.seek(0)
-                        plot_data = base64.b64encode(buf.read()).decode("ascii")
-                        plt.close()
-                    charts.append(
-                        ChartExecutorResponse(
-                            df=df,
-                            cols=cols,
-                            spec=None,
-                            status=True,
-                            raster=plot_data,
-                            code=code,
-                            library=library,
-                        )
-                    )
-                except Exception as exception_error:
-                    # alog.info(exception_error)
-
-                    traceback.print_exception(Exception,
-                                              exception_error,
-                                              tb=None,
-                                              limit=None,
-                                              file=sys.stderr)
-
-                    alog.info(code_specs[0])
-
-                    alog.info(("****\n", str(exception_error)))
-
-                    # alog.info(traceback.format_exc())
-                    if return_error:
-                        charts.append(
-                            ChartExecutorResponse(
-                                spec=None,
-                                status=False,
-                                raster=None,
-                                code=code,
-                                library=library,
-                                error={
-                                    "message": str(exception_error),
-                                    "traceback": traceback.format_exc(),
-                                },
-                            )
-                        )
-            return charts
+            # charts draw on figures of their own thread, so they can be rendered in parallel
+            if self.n_threads > 1 and len(code_specs) > 1:
+                with ThreadPoolExecutor(max_workers=min(self.n_threads, len(code_specs))) as threads:
+                    results = list(threads.map(
+                        lambda args: self._execute_pyplot(*args, data, summary, library, return_error),
+                        zip(code_specs, compiled)))
+            else:
+                results = [self._execute_pyplot(code, compiled_chart, data, summary, library, return_error)
+                           for code, compiled_chart in zip(code_specs, compiled)]
+            return [chart for chart in results if chart is not None]
         elif library == "ggplot":
             # print colum dtypes
-            for code in code_specs:
+            for code, compiled_chart in zip(code_specs, compiled):
                 try:
-                    ex_locals = get_globals_dict(code, data)
-                    exec(code, ex_locals)
+                    ex_locals = self.chart_globals(compiled_chart, data, summary)
+                    exec(compiled_chart.code, ex_locals)
                     chart = ex_locals["chart"]
                     if plt:
                         buf = io.BytesIO()
@@ -273,10 +697,10 @@ class ChartExecutor:
             return charts
 
         elif library == "plotly":
-            for code in code_specs:
+            for code, compiled_chart in zip(code_specs, compiled):
                 try:
-                    ex_locals = get_globals_dict(code, data)
-                    exec(code, ex_locals)
+                    ex_locals = self.chart_globals(compiled_chart, data, summary)
+                    exec(compiled_chart.code, ex_locals)
                     chart = ex_locals["chart"]
 
                     if pio:
@@ -11,6 +11,7 @@ from lida.datamodel.summary import Summary
 from lida.datamodel.text_generator import TextGenerator
 from lida.datamodel.persona import Persona
 from lida.utils import clean_code_snippet, logger
+from lida.components.serializer import serialize_summary
 
 
 @dataclass
@@ -60,8 +61,7 @@ class Goal:
             raise Exception('summary is required.')
 
         textgen_config = self.textgen_config
-        summary_str = summary.__dict__
-        # summary_str = alog.pformat(summary.__dict__)
+        summary_str = serialize_summary(summary)
 
         data_str = None
 
@@ -1,5 +1,6 @@
 import json
 import logging
+from typing import Optional
 
 import alog
 
@@ -9,6 +10,8 @@ from llmx import TextGenerator
 from lida.datamodel.__init__ import TextGenerationConfig
 from lida.datamodel.persona import Persona
 from lida.components.goal.goal import Goal
+from lida.components.compactor import SummaryCompactor
+from lida.components.serializer import serialize_summary
 
 logger = logging.getLogger("lida")
 
@@ -16,15 +19,16 @@ logger = logging.getLogger("lida")
 class GoalExplorer(object):
     """Generate goals given a summary of data"""
 
-    def __init__(self) -> None:
-        pass
+    def __init__(self, compactor: Optional[SummaryCompactor] = None) -> None:
+        self.compactor = compactor or SummaryCompactor()
 
     def generate(self, summary: dict, textgen_config: TextGenerationConfig,
                  text_gen: TextGenerator, n=5, persona: Persona = None) -> list[Goal]:
         """Generate goals given a summary of data"""
 
+        summary = self.compactor.compact(summary, query=persona.persona if persona else "")
         user_prompt = f"""The number of GOALS to generate is {n}. The goals should be based on the data summary below, \n\n .
-        {summary} \n\n"""
+        {serialize_summary(summary)} \n\n"""
 
         if not persona:
             persona = Persona(
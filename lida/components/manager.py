@@ -6,7 +6,8 @@
 # execute the specification given some data
 
 import os
-from typing import List, Union
+import uuid
+from typing import Dict, List, Optional, Union
 import logging
 import alog
 
@@ -16,11 +17,19 @@ from lida.datamodel.__init__ import TextGenerationConfig
 from ..datamodel import Summary
 from ..datamodel.persona import Persona
 from lida.components.goal.goal import Goal
-from lida.utils import read_dataframe
+from lida.sampling import Sampler
+from lida.utils import MAX_SAMPLE_ROWS, read_dataframe, sample_lazyframe, scan_dataframe
 from ..components.summarizer import Summarizer
+from ..components.profiler import cast_columns, get_column_kind, infer_prepared_formats, prepare_dataframe
+from ..components.cache import ChartCache, SummaryCache
+from ..components.compactor import SummaryCompactor
+from ..components.batch import BatchSummarizer
+from ..components.store import DatasetStore
+from ..components.registry import DatasetRegistry
 from lida.components.goal.goal_explorer import GoalExplorer
 from ..components.persona import PersonaExplorer
 from ..components.executor import ChartExecutor
+from ..components.pool import ExecutorPool
 from ..components.viz import VizGenerator, VizEditor, VizExplainer, VizEvaluator, VizRepairer, VizRecommender
 
 import lida.web as lida
@@ -30,26 +39,54 @@ logger = logging.getLogger("lida")
 
 
 class Manager(object):
-    def __init__(self, text_gen: TextGenerator = None) -> None:
+    def __init__(self, text_gen: TextGenerator = None, summary_cache: SummaryCache = None,
+                 summary_max_tokens: int = 2000, dataset_store: DatasetStore = None,
+                 dataset_memory_budget: int = 2 ** 30, sampler: Sampler = None,
+                 executor_pool: ExecutorPool = None, chart_cache: ChartCache = None,
+                 profile_workers: int = 1) -> None:
         """
         Initialize the Manager object.
 
         Args:
             text_gen (TextGenerator, optional): Text generator object. Defaults to None.
+            summary_cache (SummaryCache, optional): Cache of summaries keyed by dataset content. Defaults to None (no caching).
+            summary_max_tokens (int, optional): Token budget of the summary embedded in goal and visualization prompts. Defaults to 2000.
+            dataset_store (DatasetStore, optional): Store of ingested files, read back when executing charts. Defaults to None.
+            dataset_memory_budget (int, optional): Total size in bytes of the summarized datasets kept in memory for
+                chart execution, least recently used datasets are evicted beyond it. Defaults to 1GB.
+            sampler (Sampler, optional): Strategy and number of rows of the sample kept from large files, see
+                lida.sampling. The dataset store samples with its own sampler. Defaults to a uniform sample of 4500 rows.
+            executor_pool (ExecutorPool, optional): Pool of worker processes executing charts in parallel, isolated
+                from this process. Defaults to None (charts are executed one after the other in this process).
+            chart_cache (ChartCache, optional): Cache of rendered charts by code, data, library and render options,
+                cached charts are not executed again. Defaults to None (no caching).
+            profile_workers (int, optional): Number of processes profiling the columns of wide datasets, see
+                ParallelColumnProfiler. Defaults to 1 (columns are profiled in this process).
         """
 
         self.text_gen = text_gen or llm()
 
-        self.summarizer = Summarizer()
-        self.goal = GoalExplorer()
-        self.vizgen = VizGenerator()
-        self.vizeditor = VizEditor()
-        self.executor = ChartExecutor()
+        self.summarizer = Summarizer(n_workers=profile_workers)
+        # wide summaries are compacted to the budget, keeping the fields relevant to each prompt
+        self.compactor = SummaryCompactor(max_tokens=summary_max_tokens)
+        self.goal = GoalExplorer(compactor=self.compactor)
+        self.vizgen = VizGenerator(compactor=self.compactor)
+        self.vizeditor = VizEditor(compactor=self.compactor)
+        self.executor = ChartExecutor(pool=executor_pool, chart_cache=chart_cache)
         self.explainer = VizExplainer()
         self.evaluator = VizEvaluator()
-        self.repairer = VizRepairer()
-        self.recommender = VizRecommender()
+        self.repairer = VizRepairer(compactor=self.compactor)
+        self.recommender = VizRecommender(compactor=self.compactor)
+        # data of summaries without a dataset_id, summarize does not set it
         self.data = None
+        # files of the datasets that are read again when they are not registered, by dataset id,
+        # e.g. the file of a cached summary, only read if a chart is executed
+        self.data_locations: Dict[str, str] = {}
+        self.summary_cache = summary_cache
+        self.dataset_store = dataset_store
+        self.sampler = sampler or Sampler()
+        # data of each summary by dataset id, so that sessions sharing the manager do not overwrite each other
+        self.datasets = DatasetRegistry(max_bytes=dataset_memory_budget, loader=self.load_data)
         self.infographer = None
         self.persona = PersonaExplorer()
 
@@ -75,21 +112,37 @@ class Manager(object):
 
     def summarize(
         self,
-        data: Union[pl.DataFrame, str],
+        data: Union[pl.DataFrame, pl.LazyFrame, str],
         file_name="",
         n_samples: int = 3,
         summary_method: str = "default",
         textgen_config: TextGenerationConfig = TextGenerationConfig(n=1, temperature=0),
+        streaming: bool = False,
+        approximate: bool = False,
+        incremental: bool = False,
+        fingerprint: Optional[str] = None,
     ) -> Summary:
         """
         Summarize data given a DataFrame or file path.
 
         Args:
-            data (Union[pl.DataFrame, str]): Input data, either a DataFrame or file path.
+            data (Union[pl.DataFrame, pl.LazyFrame, str]): Input data, either a DataFrame, LazyFrame or file path.
             file_name (str, optional): Name of the file if data is loaded from a file path. Defaults to "".
             n_samples (int, optional): Number of summary samples to generate. Defaults to 3.
             summary_method (str, optional): Summary method to use. Defaults to "default".
             textgen_config (TextGenerationConfig, optional): Text generation configuration. Defaults to TextGenerationConfig(n=1, temperature=0).
+            streaming (bool, optional): Scan the file lazily and compute statistics with the streaming engine
+                so that files larger than memory can be summarized. Only a sample of the rows is loaded. Defaults to False.
+            approximate (bool, optional): Compute approximate statistics (distinct counts, quantiles and frequent values)
+                in a single pass with bounded memory, along with their error bounds. A file is streamed in full, only
+                a sample of its rows is kept for visualization. Slower than exact statistics on a DataFrame, see
+                Summarizer.summarize. Defaults to False.
+            incremental (bool, optional): Compute approximate statistics and keep their mergeable state in the summary
+                so that it can be updated with new rows using update_summary. A file is streamed in full, as with
+                approximate. Defaults to False.
+            fingerprint (str, optional): Precomputed fingerprint of the file content (see lida.utils.write_stream),
+                so that the file is not read again to look up the summary cache and dataset store, or of the
+                content a DataFrame was read from, used as its dataset_id. Defaults to None.
 
         Returns:
             Summary: Summary object containing the generated summary.
@@ -128,17 +181,210 @@ class Manager(object):
         self.check_textgen(config=textgen_config)
 
         if isinstance(data, str):
-            file_name = data.split("/")[-1]
-
-            if '.parquet' in file_name:
-                data = pl.read_parquet(data)
+            file_name = os.path.basename(os.path.normpath(data))
+
+        cache_params = None
+        if self.summary_cache is not None:
+            cache_params = self.summary_cache.get_params(
+                data, textgen_config=textgen_config, n_samples=n_samples,
+                summary_method=summary_method, streaming=streaming, approximate=approximate,
+                incremental=incremental, fingerprint=fingerprint,
+                # summaries of the typed data (see prepare_dataframe), never those of summarize_batch
+                typed=True)
+            summary = self.summary_cache.get(cache_params) if cache_params and textgen_config.use_cache else None
+            if summary is not None:
+                logger.info("Using cached summary for %s", file_name)
+                # the cache is keyed by content, a dataset still registered under the cached id is this data
+                dataset_id = summary.get("dataset_id")
+                if dataset_id not in self.datasets and (self.dataset_store is None or dataset_id not in self.dataset_store):
+                    if isinstance(data, str) and self.dataset_store is not None:
+                        summary["dataset_id"] = self.dataset_store.put_file(data, fingerprint=fingerprint)
+                    elif isinstance(data, str):
+                        # the data is only read if a visualization is executed
+                        summary["dataset_id"] = cache_params["fingerprint"]
+                        self.data_locations[summary["dataset_id"]] = data
+                    else:
+                        summary["dataset_id"] = self.register_data(
+                            prepare_dataframe(data) if isinstance(data, pl.DataFrame) else data,
+                            cache_params["fingerprint"])
+                if summary.get("name") == summary.get("file_name"):
+                    summary["name"] = file_name
+                summary["file_name"] = file_name
+                return summary
+
+        # the state of this call is kept local, summaries can run concurrently on a shared manager
+        source = data
+        dataset_id = None
+        sample = None
+        if isinstance(data, str):
+            if streaming or os.path.isdir(data):
+                data = scan_dataframe(data)
+            elif self.dataset_store is not None:
+                # parsed and typed once into the store, then memory mapped by every process using it
+                dataset_id = self.dataset_store.put_file(data, fingerprint=fingerprint)
+                data = self.dataset_store.get(dataset_id)
             else:
-                data = read_dataframe(data)
+                dataset_id = fingerprint or (cache_params or {}).get("fingerprint")
+                if dataset_id is not None:
+                    # read again if the registry evicts it
+                    self.data_locations[dataset_id] = data
+                data = prepare_dataframe(read_dataframe(
+                    data, seed=int(dataset_id[:8], 16) if dataset_id else None, sampler=self.sampler))
+            if (approximate or incremental) and isinstance(data, pl.DataFrame):
+                # sketches describe every row of the file, typed like the sample kept in memory
+                rows = scan_dataframe(source)
+                kinds = {column: get_column_kind(dtype) for column, dtype in data.schema.items()}
+                sample, data = data, cast_columns(rows, kinds, infer_prepared_formats(rows, kinds))
+        elif isinstance(data, pl.DataFrame):
+            dataset_id = fingerprint or (cache_params or {}).get("fingerprint")
+            # dates are parsed and categories cast once, instead of in every generated chart
+            data = prepare_dataframe(data)
+
+        if isinstance(data, pl.LazyFrame):
+            # keep only a sample in memory, statistics are streamed over the full data
+            if sample is None:
+                sample = self.sampler.sample(data)
+            summary = self.summarizer.summarize(
+                data=data, text_gen=self.text_gen, file_name=file_name, n_samples=n_samples,
+                summary_method=summary_method, textgen_config=textgen_config, sample=sample,
+                approximate=approximate, incremental=incremental)
+        else:
+            sample = data
+            summary = self.summarizer.summarize(
+                data=sample, text_gen=self.text_gen, file_name=file_name, n_samples=n_samples,
+                summary_method=summary_method, textgen_config=textgen_config, approximate=approximate,
+                incremental=incremental)
+
+        state = summary.get("state")
+        if state is not None:
+            # the formats dates were parsed with, to type new rows the same way in update_summary
+            kinds = {column: column_state["kind"] for column, column_state in state["columns"].items()}
+            state["date_formats"] = infer_prepared_formats(
+                scan_dataframe(source) if isinstance(source, str) else source, kinds)
+
+        summary["dataset_id"] = self.register_data(sample, dataset_id)
+        if cache_params:
+            self.summary_cache.set(cache_params, summary)
+        return summary
+
+    def summarize_batch(
+        self,
+        source: Union[str, List[str]],
+        n_workers: int = 4,
+        n_samples: int = 3,
+        summary_method: str = "default",
+        textgen_config: TextGenerationConfig = TextGenerationConfig(n=1, temperature=0),
+        streaming: bool = False,
+        approximate: bool = False,
+    ) -> dict:
+        """
+        Summarize every dataset in a directory or matching a glob pattern, n_workers at a time.
+
+        Directories of parquet partitions are summarized as a single dataset. Unlike summarize,
+        the data of the summarized datasets is not kept for visualization.
+
+        Args:
+            source (Union[str, List[str]]): A directory, a glob pattern or a list of paths.
+            n_workers (int, optional): Number of datasets summarized at the same time. Defaults to 4.
+            n_samples, summary_method, textgen_config, streaming, approximate: See summarize.
+
+        Returns:
+            dict: The summary or error of each dataset under "results", with the throughput of the batch.
+            See BatchSummarizer.summarize.
+        """
+        self.check_textgen(config=textgen_config)
+        batch = BatchSummarizer(self.summarizer, summary_cache=self.summary_cache, n_workers=n_workers)
+        return batch.summarize(
+            source, text_gen=self.text_gen, n_samples=n_samples, summary_method=summary_method,
+            textgen_config=textgen_config, streaming=streaming, approximate=approximate)
+
+    def update_summary(
+        self,
+        summary: Summary,
+        new_rows: Union[pl.DataFrame, pl.LazyFrame, str],
+    ) -> Summary:
+        """
+        Update a summary created with incremental=True with rows appended to the dataset.
+
+        The new rows are typed like the summarized rows: strings of categorical columns are cast to
+        pl.Categorical, and dates are parsed with the format found when the dataset was summarized.
 
-        self.data = data
-        return self.summarizer.summarize(
-            data=self.data, text_gen=self.text_gen, file_name=file_name, n_samples=n_samples,
-            summary_method=summary_method, textgen_config=textgen_config)
+        Args:
+            summary (Summary): Summary created with summarize(..., incremental=True).
+            new_rows (Union[pl.DataFrame, pl.LazyFrame, str]): The new rows, either a DataFrame, LazyFrame or file path.
+
+        Returns:
+            Summary: The updated summary. See Summarizer.update_summary for how it compares to a summary of all the rows.
+        """
+        if isinstance(new_rows, str):
+            new_rows = scan_dataframe(new_rows)
+
+        state = (summary.get("state") if isinstance(summary, dict) else summary.state) or {}
+        n_rows = state.get("n_rows", 0)
+        kinds = {column: column_state["kind"] for column, column_state in state.get("columns", {}).items()}
+        date_formats = state.get("date_formats")
+        if date_formats is None:
+            # summaries without the formats, found again on the new rows
+            date_formats = infer_prepared_formats(new_rows, kinds)
+        new_rows = cast_columns(new_rows, kinds, date_formats)
+        updated_summary = self.summarizer.update_summary(summary, new_rows)
+        updated_summary["state"]["date_formats"] = date_formats
+
+        dataset_id = summary.get("dataset_id") if isinstance(summary, dict) else summary.dataset_id
+        data = self.datasets.get(dataset_id)
+        if data is not None:
+            # keep a sample of all the rows, with the new rows in proportion to their number
+            n_new_rows = updated_summary["state"]["n_rows"] - n_rows
+            n_keep = min(MAX_SAMPLE_ROWS, len(data) + n_new_rows)
+            n_from_new = round(n_keep * n_new_rows / max(n_rows + n_new_rows, 1))
+            data = pl.concat([
+                data.sample(min(len(data), n_keep - n_from_new)),
+                prepare_dataframe(sample_lazyframe(new_rows.lazy(), n=n_from_new, n_rows=n_new_rows)),
+            ], how="diagonal_relaxed")
+            updated_summary["dataset_id"] = self.register_data(data)
+
+        return updated_summary
+
+    def register_data(self, data: pl.DataFrame, dataset_id: Optional[str] = None) -> Optional[str]:
+        """
+        Keep the data of a summary in the dataset registry for chart execution, and in the dataset store if
+        there is one, so that it is read back once evicted from the registry.
+
+        Args:
+            data (pl.DataFrame): The data, other inputs (e.g. a LazyFrame) are not registered.
+            dataset_id (str, optional): Id of the data, e.g. its id in the dataset store. Defaults to the
+                fingerprint of the data with a dataset store, else a new random id.
+
+        Returns:
+            Optional[str]: The id to set as the dataset_id of the summary, None if the data was not registered.
+        """
+        if not isinstance(data, pl.DataFrame):
+            return dataset_id
+        if self.dataset_store is not None:
+            dataset_id = self.dataset_store.put(data, dataset_id)
+        dataset_id = dataset_id or uuid.uuid4().hex
+        self.datasets.put(dataset_id, data)
+        return dataset_id
+
+    def load_data(self, dataset_id: str) -> Optional[pl.DataFrame]:
+        """
+        Load the data of a dataset that is not registered: from the dataset store, or by reading its file again.
+
+        Args:
+            dataset_id (str): The dataset_id of a summary.
+
+        Returns:
+            Optional[pl.DataFrame]: The data, None if the dataset is unknown or its file was deleted.
+        """
+        if self.dataset_store is not None:
+            data = self.dataset_store.get(dataset_id)
+            if data is not None:
+                return data
+        location = self.data_locations.get(dataset_id)
+        if location is None or not os.path.exists(location):
+            return None
+        # the sample drawn when the dataset was summarized
+        return prepare_dataframe(read_dataframe(location, seed=int(dataset_id[:8], 16), sampler=self.sampler))
 
     def goals(
         self,
@@ -215,7 +461,7 @@ class Manager(object):
 
         charts = self.execute(
             code_specs=code_specs,
-            data=self.data,
+            data=None,
             summary=summary,
             library=library,
             return_error=return_error,
@@ -231,6 +477,19 @@ class Manager(object):
         return_error: bool = False,
     ):
 
+        dataset_id = None
+        if data is None:
+            # the data of this summary, even if other datasets were summarized since
+            dataset_id = summary.get("dataset_id") if isinstance(summary, dict) else summary.dataset_id
+            data = self.datasets.get(dataset_id)
+            if data is None and dataset_id is not None:
+                # never the data of another summary
+                raise ValueError(
+                    f"The data of dataset {dataset_id} is no longer available, summarize the dataset again")
+
+        if data is None:
+            data = self.data
+
         if data is None:
             root_file_path = os.path.dirname(os.path.abspath(lida.__file__))
             alog.info(root_file_path)
@@ -246,6 +505,7 @@ class Manager(object):
             summary=summary,
             library=library,
             return_error=return_error,
+            dataset_id=dataset_id,
         )
 
     def edit(
@@ -283,7 +543,7 @@ class Manager(object):
 
         charts = self.execute(
             code_specs=code_specs,
-            data=self.data,
+            data=None,
             summary=summary,
             library=library,
             return_error=return_error,
@@ -313,7 +573,7 @@ class Manager(object):
         )
         charts = self.execute(
             code_specs=code_specs,
-            data=self.data,
+            data=None,
             summary=summary,
             library=library,
             return_error=return_error,
@@ -401,7 +661,7 @@ class Manager(object):
         )
         charts = self.execute(
             code_specs=code_specs,
-            data=self.data,
+            data=None,
             summary=summary,
             library=library,
             return_error=return_error,
@@ -1,6 +1,7 @@
 import json
 import logging
 from lida.utils import clean_code_snippet
+from lida.components.serializer import serialize_summary
 from llmx import TextGenerator
 from lida.datamodel.__init__ import TextGenerationConfig
 from lida.datamodel.persona import Persona
@@ -25,7 +26,7 @@ class PersonaExplorer():
         """Generate personas given a summary of data"""
 
         user_prompt = f"""The number of PERSONAs to generate is {n}. Generate {n} personas in the right format given the data summary below,\n .
-        {summary} \n""" + """
+        {serialize_summary(summary)} \n""" + """
 
         .
         """
@@ -0,0 +1,322 @@
+import logging
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+import polars as pl
+
+from lida.components.executor import (DEFAULT_PRELOAD, SUPPORTED_LIBRARIES, ChartExecutor, preload_modules,
+                                      preprocess_code)
+from lida.components.store import DatasetStore
+from lida.utils import fingerprint_dataframe
+from lida.datamodel.__init__ import ChartExecutorResponse
+from lida.datamodel import Summary
+
+logger = logging.getLogger("lida")
+
+# frames memory mapped by a worker process, by store directory and dataset id
+_worker_frames: "OrderedDict[Tuple[str, str], pl.DataFrame]" = OrderedDict()
+WORKER_FRAMES = 4
+_worker_executors: Dict[bool, ChartExecutor] = {}
+
+
+def _load_frame(root: str, dataset_id: str) -> pl.DataFrame:
+    """Frame shared by the parent process, mapped once per worker"""
+    key = (root, dataset_id)
+    df = _worker_frames.get(key)
+    if df is None:
+        df = DatasetStore(root).get(dataset_id)
+        if df is None:
+            raise FileNotFoundError(f"Shared dataset {dataset_id} is no longer available")
+        _worker_frames[key] = df
+        while len(_worker_frames) > WORKER_FRAMES:
+            _worker_frames.popitem(last=False)
+    _worker_frames.move_to_end(key)
+    return df
+
+
+def _init_worker(preload: List[str]) -> None:
+    """Run when a worker process starts: import the libraries charts use"""
+    preload_modules(preload)
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _execute_chart(code: str, data: Any, root: str, dataset_id: Optional[str], summary: Summary,
+                   library: str, return_error: bool, project_columns: bool) -> List[ChartExecutorResponse]:
+    """Run in a worker process: execute one chart on the shared frame, or on data if it was sent"""
+    if dataset_id is not None:
+        data = _load_frame(root, dataset_id)
+    # one executor per setting, so that the compiled code is cached for the life of the worker
+    executor = _worker_executors.setdefault(project_columns, ChartExecutor(project_columns=project_columns))
+    return executor.execute([code], data, summary, library=library, return_error=return_error)
+
+
+class ExecutorPool:
+    """Execute charts in parallel in a pool of worker processes.
+
+    Charts run in worker processes, isolated from the server: charts do not share pyplot
+    state, and a chart running longer than timeout is stopped. A pool whose worker is killed or
+    crashes is broken for every chart it runs, so the workers are then all replaced, and the
+    charts of other calls that fail because of it (running or queued) are executed once more in
+    the new workers: only the stuck charts, and charts crashing twice, fail. Results keep the
+    order of the code specs. Workers are replaced after running max_jobs_per_worker charts on
+    average, so that memory leaked by plotting libraries is returned.
+
+    DataFrames are neither pickled nor copied for every chart: workers memory map them from the
+    dataset_store when they are stored there, else from uncompressed Arrow IPC files written once
+    in shared memory (/dev/shm when available), by dataset id. Frames are not deleted from shared
+    memory while charts using them are pending.
+
+    Workers import the preload libraries when they start (see preload_modules), and the forkserver
+    they are forked from imports them first, so that new workers start with the libraries loaded.
+    With warm, all workers are started as soon as the pool is (re)created instead of on the first
+    charts. The forkserver is shared by the pools of a process and preloads the libraries of the
+    first pool.
+
+    Args:
+        n_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        timeout (float, optional): Seconds a chart may run, None for no limit. Defaults to 60.
+        max_jobs_per_worker (int, optional): Charts executed per worker before the workers are replaced. Defaults to 100.
+        shared_dir (str, optional): Directory of the shared frames. Defaults to a new directory in
+            /dev/shm, or in the temporary directory if there is no /dev/shm.
+        max_shared (int, optional): Number of frames kept shared, least recently used first out. Defaults to 8.
+        preload (List[str], optional): Modules imported by every worker before its first chart, modules that
+            fail to import are skipped. Defaults to DEFAULT_PRELOAD (numpy, pandas, the plotting libraries).
+        warm (bool, optional): Start all the workers when the pool is created. Defaults to True.
+        dataset_store (DatasetStore, optional): Store of ingested datasets, mapped by the workers without
+            being copied to shared memory. Defaults to None.
+    """
+
+    def __init__(self, n_workers: Optional[int] = None, timeout: Optional[float] = 60,
+                 max_jobs_per_worker: int = 100, shared_dir: Optional[str] = None, max_shared: int = 8,
+                 preload: Optional[List[str]] = None, warm: bool = True,
+                 dataset_store: Optional[DatasetStore] = None) -> None:
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        root = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        self.store = DatasetStore(shared_dir or os.path.join(root, f"lida-executor-{uuid.uuid4().hex[:8]}"))
+        self.max_shared = max_shared
+        self.shared: "OrderedDict[str, None]" = OrderedDict()
+        # charts pending by dataset id, their frames are not deleted
+        self.pinned: Counter = Counter()
+        self.dataset_store = dataset_store
+        self.lock = threading.Lock()
+        # workers are started from a clean server process rather than forked from this one
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.context = multiprocessing.get_context(method)
+        self.preload = list(DEFAULT_PRELOAD if preload is None else preload)
+        self.warm = warm
+        if method == "forkserver" and self.preload:
+            self.context.set_forkserver_preload(["lida.components.executor"] + self.preload)
+        self.warming: List[Future] = []
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.jobs = 0
+        self.restarts = 0
+        self.retries = 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # max_tasks_per_child is not used: it needs python 3.11 and can leave pools hanging in 3.11
+        pool = ProcessPoolExecutor(max_workers=self.n_workers, mp_context=self.context,
+                                   initializer=_init_worker, initargs=(self.preload,))
+        if self.warm:
+            # a worker is started for every task submitted while none is idle
+            self.warming = [pool.submit(_warm_up) for _ in range(self.n_workers)]
+        return pool
+
+    def start(self, wait_ready: bool = True) -> None:
+        """Start the workers ahead of the first charts, waiting until they are ready if wait_ready"""
+        with self.lock:
+            if self.pool is None:
+                self.pool = self._new_pool()
+            warming = self.warming
+        if wait_ready:
+            wait(warming)
+
+    def _get_pool(self, n_jobs: int) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                self.pool = self._new_pool()
+            elif self.jobs >= self.max_jobs_per_worker * self.n_workers:
+                # the workers are replaced together, the old ones exit once their charts end
+                self.pool.shutdown(wait=False)
+                self.pool, self.jobs = self._new_pool(), 0
+            self.jobs += n_jobs
+            return self.pool
+
+    def _restart(self, pool: ProcessPoolExecutor) -> None:
+        """Kill the workers of a pool with stuck or crashed charts and start new ones
+
+        The charts of other calls are not cancelled: they fail with BrokenProcessPool and are
+        submitted again to the new pool by their call.
+        """
+        with self.lock:
+            if self.pool is not pool:
+                return
+            for process in list((getattr(pool, "_processes", None) or {}).values()):
+                process.kill()
+            pool.shutdown(wait=False)
+            self.pool, self.jobs = self._new_pool(), 0
+            self.restarts += 1
+
+    def _submit(self, tasks: List[tuple]) -> Tuple[ProcessPoolExecutor, List[Future]]:
+        """Submit charts to the current pool, replacing it if it is broken"""
+        for attempt in range(3):
+            pool = self._get_pool(len(tasks))
+            try:
+                return pool, [pool.submit(_execute_chart, *task) for task in tasks]
+            except (BrokenProcessPool, RuntimeError):
+                # broken by a crash, or shut down by another call since _get_pool
+                if attempt == 2:
+                    raise
+                self._restart(pool)
+
+    def share(self, data: pl.DataFrame, dataset_id: Optional[str] = None) -> Tuple[str, str]:
+        """Share a frame with the workers and pin it until unpin is called
+
+        Frames in the dataset store are mapped from it. Other frames are written to shared memory
+        under dataset_id, the id of their content (e.g. the dataset_id of their summary), or under
+        their fingerprint if it is not given.
+
+        Returns:
+            Tuple[str, str]: The directory of the store the workers map the frame from, and its dataset id.
+        """
+        dataset_id = dataset_id or fingerprint_dataframe(data)
+        with self.lock:
+            # pinned before it is written, so that other calls do not delete it meanwhile
+            self.pinned[dataset_id] += 1
+        if self.dataset_store is not None and dataset_id in self.dataset_store:
+            return self.dataset_store.root, dataset_id
+        self.store.put(data, dataset_id)
+        with self.lock:
+            self.shared[dataset_id] = None
+            self.shared.move_to_end(dataset_id)
+            for evicted in list(self.shared):
+                if len(self.shared) <= self.max_shared:
+                    break
+                if self.pinned[evicted]:
+                    continue
+                del self.shared[evicted]
+                # workers that mapped the file keep their mapping
+                if os.path.exists(self.store.path(evicted)):
+                    os.remove(self.store.path(evicted))
+        return self.store.root, dataset_id
+
+    def unpin(self, dataset_id: str) -> None:
+        """Allow a shared frame to be deleted once the charts using it are done"""
+        with self.lock:
+            self.pinned[dataset_id] -= 1
+            if self.pinned[dataset_id] <= 0:
+                del self.pinned[dataset_id]
+
+    def in_use(self, dataset_id: str) -> bool:
+        """Whether charts using a dataset are pending, e.g. to keep it in the dataset store meanwhile"""
+        with self.lock:
+            return dataset_id in self.pinned
+
+    def execute(self, code_specs: List[str], data: Any, summary: Summary, library: str = "altair",
+                return_error: bool = False, project_columns: bool = True,
+                dataset_id: Optional[str] = None) -> List[ChartExecutorResponse]:
+        """Execute code specs in parallel, see ChartExecutor.execute
+
+        dataset_id identifies the content of data, so that the frame is shared without hashing it.
+        """
+        if library not in SUPPORTED_LIBRARIES:
+            raise Exception(
+                f"Unsupported library. Supported libraries are altair, matplotlib, seaborn, ggplot, plotly. You provided {library}"
+            )
+        if not code_specs:
+            return []
+        if isinstance(summary, dict):
+            summary = Summary(**summary)
+        root, shared_id = self.store.root, None
+        if isinstance(data, pl.DataFrame):
+            (root, shared_id), data = self.share(data, dataset_id), None
+        try:
+            results, errors = self._run(
+                [(code, data, root, shared_id, summary, library, return_error, project_columns) for code in code_specs])
+        finally:
+            if shared_id is not None:
+                self.unpin(shared_id)
+
+        charts = []
+        for code, result, error in zip(code_specs, results, errors):
+            if result is not None:
+                charts.extend(result)
+                continue
+            logger.error(f"Error executing chart in worker: {str(error)}")
+            if return_error:
+                charts.append(
+                    ChartExecutorResponse(
+                        spec=None,
+                        status=False,
+                        raster=None,
+                        code=preprocess_code(code),
+                        library=library,
+                        error={"message": str(error), "traceback": ""},
+                    )
+                )
+        return charts
+
+    def _run(self, tasks: List[tuple]) -> Tuple[List[Optional[List[ChartExecutorResponse]]], List[Exception]]:
+        """Run chart tasks, returning the charts of each task or the error that prevented it
+
+        Tasks failing because the pool broke (a worker was killed or crashed) are run once more.
+        """
+        results: List[Optional[List[ChartExecutorResponse]]] = [None] * len(tasks)
+        errors: List[Optional[Exception]] = [None] * len(tasks)
+        pending = list(range(len(tasks)))
+        for attempt in range(2):
+            pool, futures = self._submit([tasks[index] for index in pending])
+            # charts queued behind others get the time of the rounds before them
+            rounds = math.ceil(len(futures) / self.n_workers)
+            _, not_done = wait(futures, timeout=self.timeout * rounds if self.timeout is not None else None)
+            broken = bool(not_done)
+            retry = []
+            for index, future in zip(pending, futures):
+                if future in not_done:
+                    errors[index] = TimeoutError(f"Chart execution did not finish within {self.timeout} seconds")
+                elif future.cancelled():
+                    errors[index] = RuntimeError("Chart execution was cancelled")
+                    retry.append(index)
+                elif future.exception() is not None:
+                    errors[index] = future.exception()
+                    if isinstance(errors[index], BrokenProcessPool):
+                        broken = True
+                        retry.append(index)
+                else:
+                    results[index] = future.result()
+            if broken:
+                self._restart(pool)
+            if not retry:
+                break
+            if attempt == 0:
+                self.retries += len(retry)
+            pending = retry
+        return results, errors
+
+    def close(self) -> None:
+        """Stop the workers and delete the shared frames"""
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=True, cancel_futures=True)
+                self.pool = None
+            self.shared.clear()
+        shutil.rmtree(self.store.root, ignore_errors=True)
+
+    def stats(self) -> dict:
+        """Pool usage statistics"""
+        with self.lock:
+            return {"workers": self.n_workers, "jobs": self.jobs, "restarts": self.restarts,
+                    "retries": self.retries, "shared_datasets": len(self.shared)}
@@ -0,0 +1,438 @@
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+
+logger = logging.getLogger("lida")
+
+# date formats tried on string columns, in order of preference: a column is parsed with the first
+# format that parses every sampled value (so ambiguous day/month dates are read as US dates)
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S%.f",
+    "%Y-%m-%dT%H:%M:%S%.f",
+    "%Y-%m-%dT%H:%M:%S%.f%#z",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y %H:%M:%S",
+    "%d.%m.%Y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%d-%b-%Y",
+    "epoch_s",
+    "epoch_ms",
+]
+
+# plausible ranges (1973 to 2286) of unix timestamps in seconds and milliseconds
+EPOCH_RANGES = {"epoch_s": (10 ** 8, 10 ** 10), "epoch_ms": (10 ** 11, 10 ** 13)}
+
+# values are only read as unix timestamps in columns named like a time, e.g. created_at or ts
+EPOCH_COLUMN_NAME = re.compile(r"date|time|epoch|^ts$|_ts$|_at$", re.IGNORECASE)
+
+# rows and values per column sampled to find date formats before parsing whole columns
+DATE_SAMPLE_ROWS = 10_000
+DATE_SAMPLE_SIZE = 100
+
+# string columns with fewer distinct values than this share of their rows are categories
+CATEGORY_MAX_RATIO = 0.5
+
+
+def check_type(dtype: Any, value):
+    """Cast value to right type to ensure it is JSON serializable"""
+    if value is None:
+        return value
+    if "float" in str(dtype).lower():
+        return float(value)
+    elif "int" in str(dtype).lower():
+        return int(value)
+    else:
+        return value
+
+
+def get_column_kind(dtype: pl.DataType) -> str:
+    """Map a polars dtype to the kind of statistics computed for the column"""
+    if dtype.is_numeric():
+        return "number"
+    elif dtype == pl.Boolean:
+        return "boolean"
+    elif dtype == pl.String:
+        return "string"
+    elif isinstance(dtype, (pl.Categorical, pl.Enum)):
+        return "category"
+    elif dtype.is_temporal() and dtype != pl.Duration and dtype != pl.Time:
+        return "date"
+    return "other"
+
+
+def get_type_name(dtype: Union[pl.DataType, str]) -> str:
+    """Short name of a polars dtype, e.g. Datetime for Datetime(time_unit='us', time_zone=None)"""
+    return str(dtype).split("(")[0]
+
+
+def parse_dates(expr: pl.Expr, date_format: str, dtype: pl.DataType = pl.String) -> pl.Expr:
+    """Parse an expression of dtype to datetimes with a format from DATE_FORMATS
+
+    Values that do not parse with the format are null.
+    """
+    if date_format in EPOCH_RANGES:
+        low, high = EPOCH_RANGES[date_format]
+        values = expr.str.to_integer(strict=False) if dtype == pl.String else expr.cast(pl.Int64, strict=False)
+        unit = "s" if date_format == "epoch_s" else "ms"
+        return pl.when(values.is_between(low, high)).then(pl.from_epoch(values, time_unit=unit))
+    return expr.str.to_datetime(date_format, strict=False)
+
+
+def infer_date_formats(data: Union[pl.DataFrame, pl.LazyFrame],
+                       schema: Optional[Dict[str, pl.DataType]] = None) -> Dict[str, str]:
+    """Find the date format of the columns of data that look like dates
+
+    Only the first DATE_SAMPLE_SIZE non null values of each string column (and of numeric columns
+    named like a time) are tested against DATE_FORMATS, in a single query over all columns and
+    formats. The formats found still have to be confirmed on the whole column.
+
+    Args:
+        data (Union[pl.DataFrame, pl.LazyFrame]): The data, of which only the first rows are read.
+        schema (Dict[str, pl.DataType], optional): The columns to test. Defaults to the schema of data.
+
+    Returns:
+        Dict[str, str]: The first format of DATE_FORMATS parsing every sampled value, by column.
+    """
+    schema = dict(data.collect_schema()) if schema is None else schema
+    candidates = {column: dtype for column, dtype in schema.items()
+                  if dtype == pl.String or (dtype.is_numeric() and EPOCH_COLUMN_NAME.search(column))}
+    if not candidates:
+        return {}
+    head = data.head(DATE_SAMPLE_ROWS).select(list(candidates))
+    if isinstance(head, pl.LazyFrame):
+        head = head.collect()
+    # every format needs digits, which rules out most text columns before trying any format
+    values = {}
+    for column, dtype in candidates.items():
+        series = head[column].drop_nulls().head(DATE_SAMPLE_SIZE)
+        if len(series) and (dtype != pl.String or series.str.contains(r"\d").all()):
+            values[column] = series
+    if not values:
+        return {}
+    sample = pl.DataFrame([series.extend_constant(None, DATE_SAMPLE_SIZE - len(series))
+                           for series in values.values()])
+
+    exprs, keys = [], []
+    for column in values:
+        dtype = candidates[column]
+        formats = [date_format for date_format in DATE_FORMATS
+                   if (date_format in EPOCH_RANGES and EPOCH_COLUMN_NAME.search(column))
+                   or (date_format not in EPOCH_RANGES and dtype == pl.String)]
+        for date_format in formats:
+            col = pl.col(column)
+            exprs.append((parse_dates(col, date_format, dtype).null_count() == col.null_count()).alias(
+                str(len(keys))))
+            keys.append((column, date_format))
+    date_formats = {}
+    for (column, date_format), parsed in zip(keys, sample.select(exprs).row(0)):
+        if parsed and column not in date_formats:
+            date_formats[column] = date_format
+    return date_formats
+
+
+def prepare_dataframe(df: pl.DataFrame) -> pl.DataFrame:
+    """Cast the columns of a DataFrame to the types they are summarized as
+
+    Columns of dates (see infer_date_formats) are parsed to datetimes when every value parses,
+    and string columns with few distinct values are cast to pl.Categorical. Done once when a
+    dataset is loaded, so that charts neither parse the dates again nor group by full strings.
+
+    Args:
+        df (pl.DataFrame): The data.
+
+    Returns:
+        pl.DataFrame: The data with typed columns, the other columns are unchanged.
+    """
+    if not len(df):
+        return df
+    schema = df.schema
+    date_formats = infer_date_formats(df, schema)
+    strings = [column for column, dtype in schema.items() if dtype == pl.String]
+    if not date_formats and not strings:
+        return df
+    stats = df.select(
+        [pl.col(column).null_count().alias(f"{column}:null_count") for column in date_formats]
+        + [parse_dates(pl.col(column), date_format, schema[column]).null_count().alias(f"{column}:date_null_count")
+           for column, date_format in date_formats.items()]
+        + [pl.col(column).n_unique().alias(f"{column}:n_unique") for column in strings]
+    ).row(0, named=True)
+
+    exprs = []
+    dates = set()
+    for column, date_format in date_formats.items():
+        null_count = stats[f"{column}:null_count"]
+        if null_count < len(df) and stats[f"{column}:date_null_count"] == null_count:
+            exprs.append(parse_dates(pl.col(column), date_format, schema[column]).alias(column))
+            dates.add(column)
+    for column in strings:
+        if column not in dates and stats[f"{column}:n_unique"] / len(df) < CATEGORY_MAX_RATIO:
+            exprs.append(pl.col(column).cast(pl.Categorical))
+    return df.with_columns(exprs) if exprs else df
+
+
+def infer_prepared_formats(data: Union[pl.DataFrame, pl.LazyFrame], kinds: Dict[str, str]) -> Dict[str, str]:
+    """Find the date formats of the columns of untyped data that prepared data has as dates
+
+    Args:
+        data (Union[pl.DataFrame, pl.LazyFrame]): Untyped data, of which only the first rows are read.
+        kinds (Dict[str, str]): The kind of each column in the prepared data (see get_column_kind).
+
+    Returns:
+        Dict[str, str]: The date format of the columns that are dates once prepared but not in data.
+    """
+    schema = data.collect_schema()
+    candidates = {column: schema[column] for column, kind in kinds.items()
+                  if kind == "date" and column in schema and get_column_kind(schema[column]) != "date"}
+    return infer_date_formats(data, candidates) if candidates else {}
+
+
+def cast_columns(data: Union[pl.DataFrame, pl.LazyFrame], kinds: Dict[str, str],
+                 date_formats: Dict[str, str]) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """Type the columns of untyped data like prepare_dataframe typed the rows they are appended to
+
+    String columns of kind category are cast to pl.Categorical, and columns of kind date are parsed
+    with their format in date_formats (values that do not parse are null). Other columns are unchanged.
+
+    Args:
+        data (Union[pl.DataFrame, pl.LazyFrame]): The untyped data.
+        kinds (Dict[str, str]): The kind of each column in the prepared data (see get_column_kind).
+        date_formats (Dict[str, str]): Date formats, see infer_prepared_formats.
+    """
+    schema = data.collect_schema()
+    exprs = []
+    for column, kind in kinds.items():
+        dtype = schema.get(column)
+        if dtype is None or get_column_kind(dtype) == kind:
+            continue
+        if kind == "category" and dtype == pl.String:
+            exprs.append(pl.col(column).cast(pl.Categorical))
+        elif kind == "date" and column in date_formats:
+            exprs.append(parse_dates(pl.col(column), date_formats[column], dtype).alias(column))
+    return data.with_columns(exprs) if exprs else data
+
+
+class ColumnProfiler:
+    """Compute the properties of every column of a dataframe in a single query.
+
+    Instead of running one pass over the data per statistic and per column, the profiler
+    builds one polars expression per statistic for all columns and evaluates them in a
+    single ``select``, letting polars schedule the work across columns in parallel.
+
+    In streaming mode the plan only contains aggregations whose state is bounded in size
+    (distinct counts are estimated with ``approx_n_unique``) and is run on the streaming
+    engine, while samples are drawn from a separate in-memory sample of the rows. This
+    keeps memory usage independent of the size of the data.
+
+    String columns (and numeric columns named like a time) are dates if their first values
+    parse with one of the formats of DATE_FORMATS and every value of the column parses with it.
+    Only columns passing the sampled test are parsed in full, with min and max computed on the
+    parsed values.
+    """
+
+    def __init__(self, n_samples: int = 3, seed: Optional[int] = None,
+                 streaming: bool = False) -> None:
+        self.n_samples = n_samples
+        self.seed = seed
+        self.streaming = streaming
+
+    def _alias(self, index: int, stat: str) -> str:
+        # columns are addressed by position so that arbitrary names never collide
+        return f"{index}:{stat}"
+
+    def build_plan(self, schema: Dict[str, pl.DataType], samples: bool = True,
+                   date_formats: Optional[Dict[str, str]] = None) -> List[pl.Expr]:
+        """Build the list of aggregation expressions covering every column in the schema
+
+        Columns in date_formats are also parsed with their date format to confirm they are dates.
+        """
+        date_formats = date_formats or {}
+        exprs = [pl.len().alias("__len__")]
+        for index, (column, dtype) in enumerate(schema.items()):
+            col = pl.col(column)
+            kind = get_column_kind(dtype)
+            if kind == "number":
+                exprs += [
+                    col.std().alias(self._alias(index, "std")),
+                    col.min().alias(self._alias(index, "min")),
+                    col.max().alias(self._alias(index, "max")),
+                ]
+            elif kind == "date":
+                exprs += [
+                    col.min().alias(self._alias(index, "min")),
+                    col.max().alias(self._alias(index, "max")),
+                ]
+            if column in date_formats:
+                # a column is a date if every non null value parses with its date format
+                parsed = parse_dates(col, date_formats[column], dtype)
+                exprs += [
+                    col.null_count().alias(self._alias(index, "null_count")),
+                    parsed.null_count().alias(self._alias(index, "date_null_count")),
+                    parsed.min().alias(self._alias(index, "date_min")),
+                    parsed.max().alias(self._alias(index, "date_max")),
+                ]
+            n_unique = col.approx_n_unique() if self.streaming else col.n_unique()
+            exprs.append(n_unique.alias(self._alias(index, "n_unique")))
+            if samples:
+                exprs.append(self.build_samples(index, column))
+        return exprs
+
+    def build_samples(self, index: int, column: str) -> pl.Expr:
+        """Build the expression drawing distinct non null sample values of a column"""
+        col = pl.col(column)
+        return col.drop_nulls().unique(maintain_order=True).shuffle(seed=self.seed).head(
+            self.n_samples).implode().alias(self._alias(index, "samples"))
+
+    def collect(self, data: Union[pl.DataFrame, pl.LazyFrame], exprs: List[pl.Expr]) -> Dict[str, Any]:
+        """Evaluate the plan and return the single row of statistics as a dictionary"""
+        if isinstance(data, pl.LazyFrame):
+            engine = "streaming" if self.streaming else "auto"
+            return data.select(exprs).collect(engine=engine).row(0, named=True)
+        # eager frames skip the query optimizer, which is slow to plan hundreds of expressions
+        return data.select(exprs).row(0, named=True)
+
+    def assemble(self, schema: Dict[str, pl.DataType], stats: Dict[str, Any],
+                 date_formats: Optional[Dict[str, str]] = None) -> List[dict]:
+        """Convert the statistics row into the list of column properties used in a summary"""
+        date_formats = date_formats or {}
+        n_rows = stats["__len__"]
+        properties_list = []
+        for index, (column, dtype) in enumerate(schema.items()):
+            kind = get_column_kind(dtype)
+            properties = {}
+            if column in date_formats and stats[self._alias(index, "null_count")] < n_rows and \
+                    stats[self._alias(index, "date_null_count")] == stats[self._alias(index, "null_count")]:
+                properties["dtype"] = "date"
+                properties["format"] = date_formats[column]
+                properties["min"] = stats[self._alias(index, "date_min")]
+                properties["max"] = stats[self._alias(index, "date_max")]
+            elif kind == "number":
+                properties["dtype"] = "number"
+                properties["std"] = check_type(dtype, stats[self._alias(index, "std")])
+                properties["min"] = check_type(dtype, stats[self._alias(index, "min")])
+                properties["max"] = check_type(dtype, stats[self._alias(index, "max")])
+            elif kind == "boolean":
+                properties["dtype"] = "boolean"
+            elif kind == "string":
+                if n_rows and stats[self._alias(index, "n_unique")] / n_rows < CATEGORY_MAX_RATIO:
+                    properties["dtype"] = "category"
+                else:
+                    properties["dtype"] = "string"
+            elif kind == "category":
+                properties["dtype"] = "category"
+                # typed columns are used as they are, without conversion, in generated code
+                properties["polars_dtype"] = get_type_name(dtype)
+            elif kind == "date":
+                properties["dtype"] = "date"
+                properties["polars_dtype"] = get_type_name(dtype)
+                properties["min"] = stats[self._alias(index, "min")]
+                properties["max"] = stats[self._alias(index, "max")]
+            else:
+                properties["dtype"] = str(dtype)
+
+            properties["samples"] = stats[self._alias(index, "samples")]
+            properties["num_unique_values"] = stats[self._alias(index, "n_unique")]
+            properties["semantic_type"] = ""
+            properties["description"] = ""
+            properties_list.append({"column": column, "properties": properties})
+
+        return properties_list
+
+    def profile(self, data: Union[pl.DataFrame, pl.LazyFrame],
+                sample: Optional[pl.DataFrame] = None) -> List[dict]:
+        """Get properties of each column in a polars DataFrame or LazyFrame
+
+        Args:
+            data (Union[pl.DataFrame, pl.LazyFrame]): The data to profile.
+            sample (pl.DataFrame, optional): A sample of the rows of data to draw sample values
+                from. If None, sample values are drawn from data in the same pass as the statistics.
+        """
+        schema = dict(data.collect_schema())
+        if not schema:
+            return []
+        date_formats = infer_date_formats(data if sample is None else sample, schema)
+        stats = self.collect(data, self.build_plan(schema, samples=sample is None, date_formats=date_formats))
+        if sample is not None:
+            stats.update(sample.select(
+                [self.build_samples(index, column) for index, column in enumerate(schema)]
+            ).row(0, named=True))
+        return self.assemble(schema, stats, date_formats=date_formats)
+
+
+# process pools shared by all parallel profilers, keyed by number of workers
+_executors: Dict[int, ProcessPoolExecutor] = {}
+
+
+def get_executor(n_workers: int) -> ProcessPoolExecutor:
+    """Return a process pool with n_workers workers, started once and reused across calls"""
+    if n_workers not in _executors:
+        # spawn rather than fork, forking a process running polars threads can deadlock
+        _executors[n_workers] = ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executors[n_workers]
+
+
+def _profile_shard(path: str, columns: List[str], n_samples: int, seed: Optional[int]) -> List[dict]:
+    # runs in a worker process: polars copies IPC files into memory when reading them, pyarrow maps
+    # them, so the shard columns are viewed in the memory mapped file without being copied
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all().select(columns)
+    df = pl.from_arrow(table, rechunk=False)
+    return ColumnProfiler(n_samples=n_samples, seed=seed).profile(df)
+
+
+class ParallelColumnProfiler(ColumnProfiler):
+    """Profile the columns of a wide dataframe in a pool of worker processes.
+
+    The dataframe is written once to an uncompressed Arrow IPC file (in shared memory when
+    available) that workers memory map, so only the file path and column names are sent to the
+    workers. The columns are split into contiguous shards, each profiled by a worker with a
+    ColumnProfiler, and the shard results are concatenated in the original column order.
+
+    Args:
+        n_samples (int, optional): Number of sample values per column. Defaults to 3.
+        seed (int, optional): Seed used to draw sample values. Defaults to None.
+        n_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        min_columns (int, optional): Dataframes with fewer columns are profiled in process. Defaults to 200.
+    """
+
+    def __init__(self, n_samples: int = 3, seed: Optional[int] = None, n_workers: Optional[int] = None,
+                 min_columns: int = 200) -> None:
+        super().__init__(n_samples=n_samples, seed=seed)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.min_columns = min_columns
+
+    def profile(self, data: Union[pl.DataFrame, pl.LazyFrame],
+                sample: Optional[pl.DataFrame] = None) -> List[dict]:
+        """Get properties of each column in a polars DataFrame, in parallel for wide dataframes"""
+        if isinstance(data, pl.LazyFrame) or sample is not None or self.n_workers < 2 \
+                or data.width < self.min_columns:
+            return super().profile(data, sample=sample)
+
+        shards = [list(shard) for shard in np.array_split(np.array(data.columns, dtype=object),
+                                                          min(self.n_workers * 2, data.width))]
+        shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        with tempfile.TemporaryDirectory(dir=shm) as directory:
+            path = os.path.join(directory, "data.arrow")
+            data.write_ipc(path, compression="uncompressed")
+            executor = get_executor(self.n_workers)
+            futures = [executor.submit(_profile_shard, path, shard, self.n_samples, self.seed)
+                       for shard in shards]
+            return [field for future in futures for field in future.result()]
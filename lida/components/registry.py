@@ -0,0 +1,88 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import polars as pl
+
+logger = logging.getLogger("lida")
+
+
+class DatasetRegistry:
+    """Thread safe map of dataset ids to loaded frames, bounded by their total size in memory.
+
+    Frames are registered under the dataset_id of their summary, so that concurrent sessions
+    sharing a Manager each execute charts on their own data. When the total estimated size of the
+    frames exceeds max_bytes, the least recently used frames are evicted. Evicted or unknown
+    datasets are reloaded with loader (e.g. DatasetStore.get) when one is given.
+
+    Args:
+        max_bytes (int, optional): Memory budget of the registered frames. Defaults to 1GB.
+        loader (Callable[[str], Optional[pl.DataFrame]], optional): Loads a dataset missing from
+            the registry by id, returning None if it is unknown. Defaults to None.
+    """
+
+    def __init__(self, max_bytes: int = 2 ** 30,
+                 loader: Optional[Callable[[str], Optional[pl.DataFrame]]] = None) -> None:
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self.frames: "OrderedDict[str, pl.DataFrame]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, dataset_id: Optional[str]) -> bool:
+        with self.lock:
+            return dataset_id in self.frames
+
+    def put(self, dataset_id: str, df: pl.DataFrame) -> None:
+        """Register a frame, evicting the least recently used frames to stay within max_bytes"""
+        size = df.estimated_size()
+        with self.lock:
+            self._remove(dataset_id)
+            if size > self.max_bytes:
+                logger.info("Dataset %s (%d bytes) is larger than the registry budget", dataset_id, size)
+                return
+            self.frames[dataset_id] = df
+            self.sizes[dataset_id] = size
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                evicted, _ = self.frames.popitem(last=False)
+                self.total_bytes -= self.sizes.pop(evicted)
+                self.evictions += 1
+
+    def get(self, dataset_id: Optional[str]) -> Optional[pl.DataFrame]:
+        """Frame of a dataset, loaded with loader if it is not registered, or None"""
+        if dataset_id is None:
+            return None
+        with self.lock:
+            df = self.frames.get(dataset_id)
+            if df is not None:
+                self.frames.move_to_end(dataset_id)
+                self.hits += 1
+                return df
+            self.misses += 1
+        # loading happens outside the lock so that other datasets can be served meanwhile
+        df = self.loader(dataset_id) if self.loader is not None else None
+        if df is not None:
+            self.put(dataset_id, df)
+        return df
+
+    def _remove(self, dataset_id: str) -> None:
+        if dataset_id in self.frames:
+            del self.frames[dataset_id]
+            self.total_bytes -= self.sizes.pop(dataset_id)
+
+    def remove(self, dataset_id: str) -> None:
+        """Unregister a dataset"""
+        with self.lock:
+            self._remove(dataset_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Registry usage statistics"""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self.frames), "bytes": self.total_bytes, "max_bytes": self.max_bytes}
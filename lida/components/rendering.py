@@ -0,0 +1,135 @@
+"""Figure-scoped rendering of matplotlib charts, safe to use from several threads.
+
+pyplot keeps the figures it creates, and which one is current, in a single registry shared by the
+whole process (matplotlib._pylab_helpers.Gcf). Within figure_scope, the registry seen by the
+calling thread is a private one: plt.gca(), plt.bar() or seaborn draw on figures of this thread
+only, the figure the code drew on is captured from it, and every figure left in it is destroyed
+when the scope ends. Figures are rendered with Figure.savefig, without pyplot.
+
+Figures created within a scope are managed by the Agg backend, whatever backend pyplot uses: they
+are never shown, and no GUI window is created from a worker thread. Outside of a scope, pyplot
+behaves as usual. rcParams remain shared by all threads: charts that change the global style
+(e.g. plt.style.use or sns.set_theme) affect charts rendered meanwhile.
+
+This relies on matplotlib internals, installed once on the first scope for the whole process:
+the Gcf.figs registry is replaced by a ThreadScopedFigures, and pyplot.new_figure_manager, which
+pyplot.figure calls to create every figure, by a function choosing the backend per thread. Both
+are private APIs (matplotlib 3.x), to check when upgrading matplotlib.
+"""
+import base64
+import io
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import matplotlib.pyplot as pyplot
+from matplotlib._pylab_helpers import Gcf
+from matplotlib.axes import Axes
+from matplotlib.backends import backend_agg
+from matplotlib.figure import Figure
+
+
+class ThreadScopedFigures:
+    """Registry of pyplot figure managers, private to the threads inside a figure_scope"""
+
+    def __init__(self, shared: "OrderedDict") -> None:
+        self.shared = shared
+        self.local = threading.local()
+
+    @property
+    def current(self) -> "OrderedDict":
+        figs = getattr(self.local, "figs", None)
+        return self.shared if figs is None else figs
+
+    def __getitem__(self, key):
+        return self.current[key]
+
+    def __setitem__(self, key, value):
+        self.current[key] = value
+
+    def __delitem__(self, key):
+        del self.current[key]
+
+    def __contains__(self, key):
+        return key in self.current
+
+    def __iter__(self):
+        return iter(self.current)
+
+    def __reversed__(self):
+        return reversed(self.current)
+
+    def __len__(self):
+        return len(self.current)
+
+    def __bool__(self):
+        return bool(self.current)
+
+    def __getattr__(self, name):
+        # get, pop, values, move_to_end, clear...
+        return getattr(self.current, name)
+
+
+_install_lock = threading.Lock()
+_new_figure_manager = pyplot.new_figure_manager
+
+
+def _scoped_new_figure_manager(*args, **kwargs):
+    """pyplot.new_figure_manager, with Agg figure managers for the threads inside a figure_scope"""
+    figs = Gcf.figs
+    if isinstance(figs, ThreadScopedFigures) and getattr(figs.local, "figs", None) is not None:
+        return backend_agg.new_figure_manager(*args, **kwargs)
+    return _new_figure_manager(*args, **kwargs)
+
+
+def _scoped_figures() -> ThreadScopedFigures:
+    with _install_lock:
+        if not isinstance(Gcf.figs, ThreadScopedFigures):
+            Gcf.figs = ThreadScopedFigures(Gcf.figs)
+            pyplot.new_figure_manager = _scoped_new_figure_manager
+        return Gcf.figs
+
+
+class FigureScope:
+    """The pyplot figures created by the calling thread within figure_scope"""
+
+    def __init__(self, figs: "OrderedDict") -> None:
+        self.figs = figs
+
+    def figure(self, chart: Any = None) -> Figure:
+        """The figure a chart was drawn on: chart itself if it is a Figure or Axes, else the current figure"""
+        if isinstance(chart, Figure):
+            return chart
+        if isinstance(chart, Axes):
+            return chart.get_figure()
+        if self.figs:
+            return next(reversed(self.figs.values())).canvas.figure
+        # nothing was drawn, like plt.savefig on an empty current figure
+        return Figure()
+
+
+@contextmanager
+def figure_scope() -> Iterator[FigureScope]:
+    """Give the calling thread its own pyplot figures until the scope ends"""
+    scoped = _scoped_figures()
+    previous = getattr(scoped.local, "figs", None)
+    figs = OrderedDict()
+    scoped.local.figs = figs
+    try:
+        yield FigureScope(figs)
+    finally:
+        for manager in list(figs.values()):
+            Gcf.destroy(manager)
+        scoped.local.figs = previous
+
+
+def render_figure(figure: Figure, dpi: int = 100) -> str:
+    """Render a figure to a base64 encoded PNG, its current axes without frame and with a light dashed grid"""
+    axes = figure.gca()
+    axes.set_frame_on(False)
+    axes.grid(color="lightgray", linestyle="dashed", zorder=-10)
+    buf = io.BytesIO()
+    # PNGs are printed by an Agg canvas of the figure, not through pyplot
+    figure.savefig(buf, format="png", dpi=dpi, pad_inches=0.2)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
@@ -16,13 +16,16 @@ class ChartScaffold(object):
 
     def get_template(self, goal: Goal, library: str):
 
-        general_instructions = (f"If the solution requires a single value (e.g. max, min, median, first, last etc), ALWAYS add a line (axvline or axhline) to the chart, ALWAYS with a legend containing the single value (formatted with 0.2F). If using a <field> where semantic_type=date, YOU MUST APPLY the following transform before using that column "
-        f"*) convert date fields to date types using data = data.with_column(pl.col(<field>).str.to_datetime(time_zone='UTC')) ONLY if they are not already date types. "
+        general_instructions = (f"If the solution requires a single value (e.g. max, min, median, first, last etc), ALWAYS add a line (axvline or axhline) to the chart, ALWAYS with a legend containing the single value (formatted with 0.2F). "
+        f"*) Fields with pl=Datetime or pl=Date are already parsed: use them as they are, NEVER convert or cast them. "
+        f"*) Fields with pl=Categorical are already categorical: use them as they are, except for string operations (e.g. .str.to_lowercase() or .str.contains()), which need them cast first with pl.col(<field>).cast(pl.String). "
+        f"*) If using a date <field> without pl=Datetime or pl=Date and with a fmt other than epoch_s or epoch_ms, YOU MUST convert it before using that column with data = data.with_columns(pl.col(<field>).str.to_datetime(<fmt>)), using the fmt of the field. "
+        f"*) If the fmt of a date <field> is epoch_s or epoch_ms, it holds unix timestamps: convert it with data = data.with_columns(pl.from_epoch(pl.col(<field>).cast(pl.Int64), time_unit=<unit>)), with unit 's' for epoch_s and 'ms' for epoch_ms, NEVER with str.to_datetime. "
         # f"*) drop the rows with NaT values data = data.filter(pl.all_horizontal(cs.float().is_not_nan())) "
         f"*) convert field to right time format for plotting.  ALWAYS make sure the x-axis labels are legible (e.g., rotate when needed). "
         f"*) Always use `list` dtype methods for column dtype List(String) not `array` methods. \n"
         f"*) Always use `list` dtype for column dtype List(String). \n"
-        f"*) Always assume strings are lowercase. \n"
+        f"*) Always assume strings are lowercase (cast pl=Categorical fields with .cast(pl.String) before lowercasing or matching them). \n"
         f"*) Always remove columns which have a dtype of List(String) just before creating the chart. \n"
         f"*) ALWAYS '&' operator when combining multiple keyword based conditions.\n"
         f"`is_not_nan` operation not supported for dtype `str`. DO NOT use this con str columns.\n"
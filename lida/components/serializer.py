@@ -0,0 +1,133 @@
+import dataclasses
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Union
+
+from lida.datamodel.summary import Summary
+
+# short codes of the field dtypes, explained once at the top of every serialized summary
+TYPE_CODES = {"number": "num", "category": "cat", "string": "str", "boolean": "bool", "date": "date"}
+
+# order and short names of field properties, properties not listed here follow in sorted order
+PROPERTY_NAMES = OrderedDict([
+    ("polars_dtype", "pl"),
+    ("format", "fmt"),
+    ("min", "min"),
+    ("max", "max"),
+    ("std", "std"),
+    ("num_unique_values", "unique"),
+    ("quantiles", "q"),
+    ("top_values", "top"),
+    ("samples", "samples"),
+    ("error_bounds", "err"),
+    ("semantic_type", "semantic"),
+    ("description", "desc"),
+])
+
+# number of serialized summaries kept in memory
+CACHE_SIZE = 256
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _as_dict(summary: Union[dict, Summary]) -> dict:
+    if dataclasses.is_dataclass(summary):
+        summary = dataclasses.asdict(summary)
+    return {key: value for key, value in summary.items() if key != "state"}
+
+
+def format_value(value: Any) -> str:
+    """Compact text form of a property value"""
+    if isinstance(value, bool) or value is None:
+        return json.dumps(value)
+    if isinstance(value, float):
+        return format(value, ".6g")
+    if isinstance(value, datetime):
+        if value.tzinfo is None and value.time() == datetime.min.time():
+            return value.date().isoformat()
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(format_value(x) for x in value) + "]"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{key}: {format_value(x)}" for key, x in value.items()) + "}"
+    return str(value)
+
+
+def serialize_field(field: dict) -> str:
+    """One line description of a summary field: its name, type code and properties"""
+    properties = dict(field.get("properties", {}))
+    dtype = properties.pop("dtype", "")
+    parts = [f"- {field.get('column')}: {TYPE_CODES.get(dtype, dtype)}"]
+    keys = [key for key in PROPERTY_NAMES if key in properties] + \
+        sorted(key for key in properties if key not in PROPERTY_NAMES)
+    for key in keys:
+        value = properties[key]
+        if value is None or value == "" or value == []:
+            continue
+        if key == "top_values":
+            value = "[" + ", ".join(f"{format_value(x['value'])}: {x['count']}" for x in value) + "]"
+        elif key in ("semantic_type", "format", "polars_dtype"):
+            value = str(value)
+        else:
+            value = format_value(value)
+        parts.append(f"{PROPERTY_NAMES.get(key, key)}={value}")
+    return " ".join(parts)
+
+
+def _serialize(summary: dict) -> str:
+    lines = [f"name: {summary.get('name', '')}"]
+    if summary.get("file_name") and summary.get("file_name") != summary.get("name"):
+        lines.append(f"file_name: {summary['file_name']}")
+    if summary.get("dataset_description"):
+        lines.append(f"description: {summary['dataset_description']}")
+    fields = summary.get("fields") or []
+    if fields:
+        lines.append("types: " + ", ".join(f"{code}={dtype}" for dtype, code in TYPE_CODES.items()))
+        lines.append("fields:")
+        lines += [serialize_field(field) for field in fields]
+    described = {field.get("column") for field in fields}
+    others = [name for name in summary.get("field_names") or [] if name not in described]
+    if others:
+        lines.append(("other columns: " if fields else "columns: ") + ", ".join(map(str, others)))
+    return "\n".join(lines)
+
+
+def summary_fingerprint(summary: Union[dict, Summary]) -> str:
+    """Fingerprint of the content of a summary, independent of key order"""
+    canonical = json.dumps(_as_dict(summary), sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def serialize_summary(summary: Union[dict, Summary]) -> str:
+    """Compact text form of a summary used in prompts
+
+    The summary is written as a header (name, description), a legend of the type codes and one
+    line per field with its properties in a fixed order, e.g.
+    ``- price: num min=1 max=99.5 std=12.3 unique=120 samples=[1.5, 20, 99.5]``. Columns listed in
+    field_names without a field (e.g. dropped by SummaryCompactor) are listed by name. The
+    incremental statistics state is never included.
+
+    Serialized summaries are memoized by summary_fingerprint, so the same summary used in several
+    prompts is serialized once.
+    """
+    summary = _as_dict(summary)
+    key = summary_fingerprint(summary)
+    with _lock:
+        text = _cache.get(key)
+        if text is not None:
+            _cache.move_to_end(key)
+            return text
+    text = _serialize(summary)
+    with _lock:
+        _cache[key] = text
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return text
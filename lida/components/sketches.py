@@ -0,0 +1,584 @@
+import base64
+import logging
+import math
+import zlib
+from datetime import date, datetime, time
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import polars as pl
+
+from lida.components.profiler import (CATEGORY_MAX_RATIO, check_type, get_column_kind, get_type_name,
+                                     infer_date_formats, parse_dates)
+
+logger = logging.getLogger("lida")
+
+# seed used to hash values for distinct counting, sketches built with different seeds cannot be merged
+HASH_SEED = 0
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Number of significant bits of each value in an array of unsigned 64 bit integers"""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp returns the exponent e such that x = m * 2**e with 0.5 <= m < 1, i.e. the bit length
+    return np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+
+
+class HyperLogLog:
+    """HyperLogLog distinct count sketch over 64 bit hashes.
+
+    Uses 2**precision one byte registers, with a relative standard error of 1.04 / sqrt(2**precision)
+    (about 0.8% for the default precision of 14, using 16KB of memory).
+    """
+
+    def __init__(self, precision: int = 14) -> None:
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        """Add an array of uint64 hashes to the sketch"""
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        precision = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - precision)).astype(np.int64)
+        rest = hashes << precision
+        # position of the first set bit in the remaining 64 - precision bits
+        rank = np.minimum(64 - _bit_length(rest), 64 - self.precision) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Merge another sketch into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precisions")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> int:
+        """Estimated number of distinct values added to the sketch"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # small range correction with linear counting
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the estimate"""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def to_dict(self) -> dict:
+        # registers are mostly zeros for small cardinalities and compress well
+        registers = base64.b64encode(zlib.compress(self.registers.tobytes())).decode("ascii")
+        return {"precision": self.precision, "registers": registers}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "HyperLogLog":
+        sketch = cls(precision=state["precision"])
+        registers = zlib.decompress(base64.b64decode(state["registers"]))
+        sketch.registers = np.frombuffer(registers, dtype=np.uint8).copy()
+        return sketch
+
+
+class TDigest:
+    """Merging t-digest for quantile estimation.
+
+    Values are kept as at most about ``compression`` weighted centroids. Centroids are small near
+    the tails (k1 scale function) so extreme quantiles are more accurate than the median.
+    """
+
+    def __init__(self, compression: int = 200) -> None:
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        """Add an array of values to the digest"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self._compress(np.concatenate([values, self.means]),
+                       np.concatenate([np.ones(len(values)), self.weights]))
+
+    def update_series(self, series: pl.Series) -> None:
+        """Add the values of a numeric series, sorted in polars so that compression only merges two runs"""
+        values = series.cast(pl.Float64).drop_nulls().drop_nans().sort()
+        self.update(values.to_numpy())
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Merge another digest into this one"""
+        if len(other.means):
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        q_left = (np.cumsum(weights) - weights) / weights.sum()
+        # every centroid spans at most one unit of the k1 scale function
+        k = self.compression * (np.arcsin(np.clip(2 * q_left - 1, -1, 1)) / np.pi + 0.5)
+        groups = np.floor(k)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0 <= q <= 1)"""
+        if len(self.means) == 0:
+            return None
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.total, centers, self.means))
+
+    @property
+    def rank_error(self) -> float:
+        """Upper bound on the error of an estimated quantile, as a fraction of the ranks"""
+        if len(self.weights) == 0:
+            return 0.0
+        return float(self.weights.max() / self.total)
+
+    def to_dict(self) -> dict:
+        return {"compression": self.compression, "means": self.means.tolist(),
+                "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "TDigest":
+        digest = cls(compression=state["compression"])
+        digest.means = np.asarray(state["means"], dtype=np.float64)
+        digest.weights = np.asarray(state["weights"], dtype=np.float64)
+        return digest
+
+
+class MisraGries:
+    """Misra-Gries frequent items summary keeping at most k counters.
+
+    The count of every value is underestimated by at most ``error`` and every value occurring
+    more than n / (k + 1) times is guaranteed to be kept.
+    """
+
+    def __init__(self, k: int = 10) -> None:
+        self.k = k
+        self.n = 0
+        self.counters: Dict[Any, int] = {}
+
+    def _prune(self, counters: Dict[Any, int]) -> None:
+        if len(counters) > self.k:
+            threshold = sorted(counters.values(), reverse=True)[self.k]
+            counters = {value: count - threshold for value, count in counters.items() if count > threshold}
+        self.counters = counters
+
+    def update(self, values: List[Any], counts: List[int], n: Optional[int] = None) -> None:
+        """Add values with their number of occurrences to the summary
+
+        n is the number of items summarized by values and counts, if they are themselves a summary.
+        """
+        counters = dict(self.counters)
+        for value, count in zip(values, counts):
+            counters[value] = counters.get(value, 0) + count
+        self.n += int(sum(counts)) if n is None else n
+        self._prune(counters)
+
+    def update_series(self, series: pl.Series) -> None:
+        """Add the values of a series, pruned to k counters in polars before merging"""
+        counts = series.value_counts(sort=True, name="__count__")
+        n = int(counts["__count__"].sum())
+        if len(counts) > self.k:
+            # the exact counts pruned at the (k+1)-th count are a valid summary of the series
+            threshold = counts["__count__"][self.k]
+            counts = counts.filter(pl.col("__count__") > threshold).with_columns(
+                pl.col("__count__") - threshold)
+        self.update(counts[counts.columns[0]].to_list(), counts["__count__"].to_list(), n=n)
+
+    def merge(self, other: "MisraGries") -> "MisraGries":
+        """Merge another summary into this one"""
+        self.update(list(other.counters), list(other.counters.values()), n=other.n)
+        return self
+
+    def top(self, n: Optional[int] = None) -> List[tuple]:
+        """The most frequent values with their (lower bound) counts"""
+        return sorted(self.counters.items(), key=lambda x: x[1], reverse=True)[:n]
+
+    @property
+    def error(self) -> int:
+        """Maximum undercount of any value"""
+        return int((self.n - sum(self.counters.values())) // (self.k + 1))
+
+    def to_dict(self) -> dict:
+        return {"k": self.k, "n": self.n, "counters": [[value, count] for value, count in self.counters.items()]}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "MisraGries":
+        summary = cls(k=state["k"])
+        summary.n = state["n"]
+        summary.counters = {value: count for value, count in state["counters"]}
+        return summary
+
+
+def _encode_value(value: Any) -> Any:
+    """Make a statistic JSON serializable"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(value: Any, kind: str, dtype: str) -> Any:
+    """Restore a statistic encoded with _encode_value"""
+    if kind == "date" and isinstance(value, str):
+        return date.fromisoformat(value) if dtype == "Date" else datetime.fromisoformat(value)
+    return value
+
+
+def _decode_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+class ColumnSketch:
+    """Bounded size statistics of a single column, built one batch of rows at a time.
+
+    Sketches are mergeable: the sketch of two sets of rows merged together is the sketch of their
+    union, and can be serialized with to_dict to be stored alongside a summary.
+
+    Columns with a date_format (see infer_date_formats) are also parsed as dates on every batch,
+    and reported as dates if every value parsed.
+    """
+
+    def __init__(self, column: str, dtype: Union[pl.DataType, str], n_samples: int = 3, precision: int = 14,
+                 compression: int = 200, top_k: int = 10, kind: Optional[str] = None,
+                 date_format: Optional[str] = None) -> None:
+        self.column = column
+        self.dtype = dtype
+        self.kind = kind or get_column_kind(dtype)
+        self.date_format = date_format
+        self.n_samples = n_samples
+        self.count = 0
+        self.null_count = 0
+        self.date_null_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.date_min = None
+        self.date_max = None
+        self.samples: List[Any] = []
+        self.hll = HyperLogLog(precision)
+        self.tdigest = TDigest(compression) if self.kind == "number" else None
+        self.topk = MisraGries(top_k) if self.kind in ("string", "category", "boolean") else None
+
+    @staticmethod
+    def batch_exprs(index: int, column: str, dtype: pl.DataType,
+                    date_format: Optional[str] = None) -> List[pl.Expr]:
+        """Aggregations computed on every batch for a column, aliased as '<index>:<stat>'"""
+        col = pl.col(column)
+
+        def alias(stat):
+            return f"{index}:{stat}"
+
+        kind = get_column_kind(dtype)
+        exprs = [col.null_count().alias(alias("null_count"))]
+        if kind == "number":
+            exprs += [col.mean().alias(alias("mean")), col.var(ddof=0).alias(alias("var"))]
+        if kind in ("number", "date"):
+            exprs += [col.min().alias(alias("min")), col.max().alias(alias("max"))]
+        if date_format is not None:
+            parsed = parse_dates(col, date_format, dtype)
+            exprs += [parsed.null_count().alias(alias("date_null_count")),
+                      parsed.min().alias(alias("date_min")), parsed.max().alias(alias("date_max"))]
+        return exprs
+
+    def update(self, series: pl.Series, stats: Dict[str, Any], seed: Optional[int] = None) -> None:
+        """Fold a batch of values, with its aggregations from batch_exprs keyed by stat, into the sketch"""
+        n = len(series)
+        null_count = stats["null_count"]
+        valid = n - null_count
+        if self.kind == "number" and valid > 0:
+            self._merge_moments(valid, stats["mean"], stats["var"] * valid)
+        if self.date_format is not None:
+            self.date_null_count += stats["date_null_count"]
+            self._merge_date_range(stats["date_min"], stats["date_max"])
+        self._merge_range(stats.get("min"), stats.get("max"))
+        self.count += n
+        self.null_count += null_count
+
+        values = series.drop_nulls()
+        self.hll.update(values.hash(seed=HASH_SEED).to_numpy())
+        if self.tdigest is not None:
+            self.tdigest.update_series(values)
+        if self.topk is not None:
+            self.topk.update_series(values.cast(pl.String) if self.kind == "category" else values)
+        self.add_samples(values, seed=seed)
+
+    def add_samples(self, values: pl.Series, seed: Optional[int] = None) -> None:
+        """Draw distinct sample values from a series of non null values, until n_samples are kept"""
+        if len(self.samples) < self.n_samples:
+            candidates = values.unique(maintain_order=True).shuffle(seed=seed).head(self.n_samples).to_list()
+            self.samples += [x for x in candidates if x not in self.samples][:self.n_samples - len(self.samples)]
+
+    def add_nulls(self, n: int) -> None:
+        """Account for n rows where the column is missing"""
+        self.count += n
+        self.null_count += n
+
+    def _merge_moments(self, n: int, mean: float, m2: float) -> None:
+        # Chan et al. parallel update of the Welford mean and sum of squared deviations
+        valid = self.count - self.null_count
+        total = valid + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * valid * n / total
+
+    def _merge_range(self, low: Any, high: Any) -> None:
+        if low is not None:
+            self.min = low if self.min is None else min(self.min, low)
+        if high is not None:
+            self.max = high if self.max is None else max(self.max, high)
+
+    def _merge_date_range(self, low: Optional[datetime], high: Optional[datetime]) -> None:
+        if low is not None:
+            self.date_min = low if self.date_min is None else min(self.date_min, low)
+        if high is not None:
+            self.date_max = high if self.date_max is None else max(self.date_max, high)
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        """Merge the sketch of another set of rows of the same column into this one"""
+        if other.date_format != self.date_format:
+            # rows parsed with different formats cannot be checked to be dates together
+            self.date_format = None
+        if other.kind == "number" and other.count - other.null_count > 0:
+            self._merge_moments(other.count - other.null_count, other.mean, other.m2)
+        self._merge_range(other.min, other.max)
+        self.count += other.count
+        self.null_count += other.null_count
+        self.date_null_count += other.date_null_count
+        self._merge_date_range(other.date_min, other.date_max)
+        self.hll.merge(other.hll)
+        if self.tdigest is not None and other.tdigest is not None:
+            self.tdigest.merge(other.tdigest)
+        if self.topk is not None and other.topk is not None:
+            self.topk.merge(other.topk)
+        self.samples += [x for x in other.samples if x not in self.samples][:self.n_samples - len(self.samples)]
+        return self
+
+    def to_dict(self) -> dict:
+        """JSON serializable state of the sketch"""
+        return {
+            "dtype": str(self.dtype),
+            "kind": self.kind,
+            "date_format": self.date_format,
+            "n_samples": self.n_samples,
+            "count": self.count,
+            "null_count": self.null_count,
+            "date_null_count": self.date_null_count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": _encode_value(self.min),
+            "max": _encode_value(self.max),
+            "date_min": _encode_value(self.date_min),
+            "date_max": _encode_value(self.date_max),
+            "samples": [_encode_value(x) for x in self.samples],
+            "hll": self.hll.to_dict(),
+            "tdigest": self.tdigest.to_dict() if self.tdigest is not None else None,
+            "topk": self.topk.to_dict() if self.topk is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, column: str, state: dict) -> "ColumnSketch":
+        """Restore a sketch from the state returned by to_dict"""
+        kind, dtype = state["kind"], state["dtype"]
+        sketch = cls(column, dtype, n_samples=state["n_samples"], kind=kind,
+                     date_format=state.get("date_format"))
+        for key in ["count", "null_count", "date_null_count", "mean", "m2"]:
+            setattr(sketch, key, state[key])
+        sketch.min = _decode_value(state["min"], kind, dtype)
+        sketch.max = _decode_value(state["max"], kind, dtype)
+        sketch.date_min = _decode_datetime(state.get("date_min"))
+        sketch.date_max = _decode_datetime(state.get("date_max"))
+        sketch.samples = [_decode_value(x, kind, dtype) for x in state["samples"]]
+        sketch.hll = HyperLogLog.from_dict(state["hll"])
+        sketch.tdigest = TDigest.from_dict(state["tdigest"]) if state["tdigest"] else None
+        sketch.topk = MisraGries.from_dict(state["topk"]) if state["topk"] else None
+        return sketch
+
+    @property
+    def std(self) -> Optional[float]:
+        valid = self.count - self.null_count
+        return math.sqrt(self.m2 / (valid - 1)) if valid > 1 else None
+
+    @property
+    def n_unique(self) -> int:
+        # null counts as a distinct value, as in polars n_unique
+        return self.hll.estimate() + (1 if self.null_count else 0)
+
+    def properties(self, quantiles: List[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> dict:
+        """Column properties in the format of a summary field, with approximate statistics"""
+        properties = {}
+        if self.date_format is not None and self.null_count < self.count and \
+                self.date_null_count == self.null_count:
+            properties["dtype"] = "date"
+            properties["format"] = self.date_format
+            properties["min"] = self.date_min
+            properties["max"] = self.date_max
+        elif self.kind == "number":
+            properties["dtype"] = "number"
+            properties["std"] = self.std
+            properties["min"] = check_type(self.dtype, self.min)
+            properties["max"] = check_type(self.dtype, self.max)
+        elif self.kind == "boolean":
+            properties["dtype"] = "boolean"
+        elif self.kind == "string":
+            if self.count and self.n_unique / self.count < CATEGORY_MAX_RATIO:
+                properties["dtype"] = "category"
+            else:
+                properties["dtype"] = "string"
+        elif self.kind == "category":
+            properties["dtype"] = "category"
+            properties["polars_dtype"] = get_type_name(self.dtype)
+        elif self.kind == "date":
+            properties["dtype"] = "date"
+            properties["polars_dtype"] = get_type_name(self.dtype)
+            properties["min"] = self.min
+            properties["max"] = self.max
+        else:
+            properties["dtype"] = str(self.dtype)
+
+        properties["samples"] = self.samples
+        properties["num_unique_values"] = self.n_unique
+        error_bounds = {"num_unique_values": round(self.hll.relative_error, 4)}
+        if self.tdigest is not None and self.tdigest.total:
+            properties["quantiles"] = {str(q): self.tdigest.quantile(q) for q in quantiles}
+            error_bounds["quantiles"] = round(self.tdigest.rank_error, 4)
+        if self.topk is not None and self.topk.counters:
+            properties["top_values"] = [{"value": value, "count": count} for value, count in self.topk.top()]
+            error_bounds["top_values"] = self.topk.error
+        properties["error_bounds"] = error_bounds
+        properties["semantic_type"] = ""
+        properties["description"] = ""
+        return properties
+
+
+class SketchProfiler:
+    """Compute approximate column properties in one pass with bounded memory.
+
+    Rows are processed in batches of ``batch_size`` and folded into one ColumnSketch per column:
+    HyperLogLog distinct counts, t-digest quantiles for numbers and Misra-Gries frequent values for
+    other columns. Every property carries its error bound in ``error_bounds``:
+
+    - num_unique_values: relative standard error of the distinct count.
+    - quantiles: maximum error of a quantile, as a fraction of the ranks.
+    - top_values: maximum undercount of a frequent value.
+    """
+
+    def __init__(self, n_samples: int = 3, seed: Optional[int] = None, batch_size: int = 100_000,
+                 precision: int = 14, compression: int = 200, top_k: int = 10) -> None:
+        self.n_samples = n_samples
+        self.seed = seed
+        self.batch_size = batch_size
+        self.precision = precision
+        self.compression = compression
+        self.top_k = top_k
+
+    def iter_batches(self, data: Union[pl.DataFrame, pl.LazyFrame]) -> Iterator[pl.DataFrame]:
+        if isinstance(data, pl.LazyFrame):
+            return iter(data.collect_batches(chunk_size=self.batch_size, engine="streaming"))
+        return data.iter_slices(self.batch_size)
+
+    def new_sketches(self, schema: Dict[str, pl.DataType],
+                     date_formats: Optional[Dict[str, str]] = None) -> Dict[str, ColumnSketch]:
+        date_formats = date_formats or {}
+        return {
+            column: ColumnSketch(column, dtype, n_samples=self.n_samples, precision=self.precision,
+                                 compression=self.compression, top_k=self.top_k,
+                                 date_format=date_formats.get(column))
+            for column, dtype in schema.items()
+        }
+
+    def update(self, sketches: Dict[str, ColumnSketch], batch: pl.DataFrame) -> None:
+        """Fold a batch of rows into the sketches of its columns"""
+        # columns without any value in the batch only contribute nulls
+        columns = [column for column in batch.columns if batch.schema[column] != pl.Null]
+        for column in columns:
+            sketch, dtype = sketches[column], batch.schema[column]
+            if get_column_kind(dtype) != sketch.kind:
+                if sketch.count > sketch.null_count:
+                    raise ValueError(f"Column {column} has type {dtype} but was summarized as {sketch.kind}")
+                # the column had no values so far, its type is set by the first values seen
+                schema = {column: dtype}
+                sketches[column] = self.new_sketches(schema, infer_date_formats(batch, schema))[column]
+                sketches[column].add_nulls(sketch.count)
+        exprs = []
+        for index, column in enumerate(columns):
+            exprs += ColumnSketch.batch_exprs(index, column, batch.schema[column], sketches[column].date_format)
+        stats = [{} for _ in columns]
+        if exprs:
+            for key, value in batch.select(exprs).row(0, named=True).items():
+                index, stat = key.split(":", 1)
+                stats[int(index)][stat] = value
+        for index, column in enumerate(columns):
+            sketches[column].update(batch[column], stats[index], seed=self.seed)
+        for column in set(sketches) - set(columns):
+            sketches[column].add_nulls(len(batch))
+
+    def fold(self, sketches: Dict[str, ColumnSketch],
+             data: Union[pl.DataFrame, pl.LazyFrame]) -> Dict[str, ColumnSketch]:
+        """Fold the rows of data into existing sketches, adding sketches for new columns"""
+        n_rows = max((sketch.count for sketch in sketches.values()), default=0)
+        schema = {column: dtype for column, dtype in data.collect_schema().items() if column not in sketches}
+        # date formats of new columns are found on the first rows, and then checked on every batch
+        date_formats = infer_date_formats(data, schema) if schema else {}
+        for column, sketch in self.new_sketches(schema, date_formats).items():
+            # rows summarized before the column existed are missing values
+            sketch.add_nulls(n_rows)
+            sketches[column] = sketch
+        for batch in self.iter_batches(data):
+            if len(batch):
+                self.update(sketches, batch)
+        return sketches
+
+    def sketch(self, data: Union[pl.DataFrame, pl.LazyFrame],
+               sample: Optional[pl.DataFrame] = None) -> Dict[str, ColumnSketch]:
+        """Build the sketches of every column of data
+
+        Sample values are drawn from sample, a subset of the rows of data, if it is given, and
+        otherwise from the first rows of data.
+        """
+        sketches = self.fold({}, data)
+        if sample is not None:
+            for column, sketch in sketches.items():
+                sketch.samples = []
+                if column in sample.columns:
+                    sketch.add_samples(sample[column].drop_nulls(), seed=self.seed)
+        return sketches
+
+    def dump_state(self, sketches: Dict[str, ColumnSketch]) -> dict:
+        """JSON serializable state of the profiler and its sketches, to be stored in a summary"""
+        return {
+            "n_rows": max((sketch.count for sketch in sketches.values()), default=0),
+            "profiler": {"n_samples": self.n_samples, "precision": self.precision,
+                         "compression": self.compression, "top_k": self.top_k},
+            "columns": {column: sketch.to_dict() for column, sketch in sketches.items()},
+        }
+
+    @classmethod
+    def load_state(cls, state: dict) -> Tuple["SketchProfiler", Dict[str, ColumnSketch]]:
+        """Restore a profiler and its sketches from the state returned by dump_state"""
+        profiler = cls(**state["profiler"])
+        sketches = {column: ColumnSketch.from_dict(column, sketch_state)
+                    for column, sketch_state in state["columns"].items()}
+        return profiler, sketches
+
+    def properties(self, sketches: Dict[str, ColumnSketch]) -> List[dict]:
+        """Column properties in the format of summary fields"""
+        return [{"column": column, "properties": sketch.properties()} for column, sketch in sketches.items()]
+
+    def profile(self, data: Union[pl.DataFrame, pl.LazyFrame],
+                sample: Optional[pl.DataFrame] = None) -> List[dict]:
+        """Get approximate properties of each column in a polars DataFrame or LazyFrame, see sketch"""
+        return self.properties(self.sketch(data, sample=sample))
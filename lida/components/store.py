@@ -0,0 +1,150 @@
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Optional
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.ipc
+from llmx.utils import get_user_cache_dir
+
+from lida.components.profiler import prepare_dataframe
+from lida.sampling import Sampler
+from lida.utils import fingerprint_dataframe, fingerprint_file, read_dataframe
+
+logger = logging.getLogger("lida")
+
+
+class DatasetStore:
+    """Content addressed store of ingested datasets, kept as uncompressed Arrow IPC files.
+
+    A file is parsed once with read_dataframe, typed with prepare_dataframe and written to
+    ``<root>/<dataset_id>.arrow``, where the dataset id is the fingerprint of the file content.
+    Later reads memory map the IPC file, so every process using the same root (e.g. web workers)
+    gets a zero-copy view of the same frame instead of parsing the file again.
+
+    Every dataset stored compacts the store: datasets not used for ttl seconds are deleted, then
+    the least recently used ones until the files fit in max_bytes, except datasets in use
+    according to in_use. Last use times are kept as file modification times, shared by the
+    processes using the root. Frames memory mapped before their file is deleted stay readable.
+
+    Args:
+        root (str, optional): Directory of the store. Defaults to a lida/datasets folder in the
+            user cache directory.
+        sampler (Sampler, optional): Sampling strategy of large files, the same for every process
+            sharing the root. Defaults to a uniform sample of 4500 rows.
+        max_bytes (int, optional): Disk quota of the stored datasets, None for no quota. Defaults to None.
+        ttl (float, optional): Seconds after which unused datasets are deleted, None to keep them. Defaults to None.
+        in_use (Callable[[str], bool], optional): Whether a dataset id is used by a live session and
+            must not be deleted, e.g. its frame is registered in memory. Defaults to None.
+    """
+
+    def __init__(self, root: Optional[str] = None, sampler: Optional[Sampler] = None,
+                 max_bytes: Optional[int] = None, ttl: Optional[float] = None,
+                 in_use: Optional[Callable[[str], bool]] = None) -> None:
+        self.root = root or os.path.join(get_user_cache_dir("lida"), "datasets")
+        self.sampler = sampler or Sampler()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.in_use = in_use
+        self.evictions = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, dataset_id: str) -> str:
+        """Location of the IPC file of a dataset"""
+        return os.path.join(self.root, f"{dataset_id}.arrow")
+
+    def __contains__(self, dataset_id: Optional[str]) -> bool:
+        return bool(dataset_id) and os.path.exists(self.path(dataset_id))
+
+    def put(self, df: pl.DataFrame, dataset_id: Optional[str] = None) -> str:
+        """Store a DataFrame, by default under the fingerprint of its content, and return its id"""
+        dataset_id = dataset_id or fingerprint_dataframe(df)
+        if dataset_id in self:
+            self.touch(dataset_id)
+            return dataset_id
+        # write to a temporary file renamed into place, readers never see a partial file
+        descriptor, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(descriptor)
+        try:
+            # uncompressed buffers can be memory mapped without decoding
+            df.write_ipc(tmp_path, compression="uncompressed")
+            os.replace(tmp_path, self.path(dataset_id))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if self.max_bytes is not None or self.ttl is not None:
+            self.compact(keep=dataset_id)
+        return dataset_id
+
+    def put_file(self, file_location: str, encoding: str = "utf-8", fingerprint: Optional[str] = None) -> str:
+        """Ingest a file with read_dataframe unless its content is already stored, and return its id
+
+        The rows sampled from large files only depend on the file content, so every process
+        ingesting the same file stores the same frame. fingerprint is the precomputed
+        fingerprint_file of the file, e.g. hashed while it was uploaded.
+        """
+        dataset_id = fingerprint or fingerprint_file(file_location)
+        if dataset_id not in self:
+            logger.info("Ingesting %s into the dataset store as %s", file_location, dataset_id)
+            df = read_dataframe(file_location, encoding=encoding, seed=int(dataset_id[:8], 16), sampler=self.sampler)
+            # dates and categories are stored typed, charts use them without converting them
+            self.put(prepare_dataframe(df), dataset_id)
+        else:
+            self.touch(dataset_id)
+        return dataset_id
+
+    def get(self, dataset_id: Optional[str]) -> Optional[pl.DataFrame]:
+        """Memory mapped view of a stored dataset, or None if it is not in the store"""
+        if dataset_id not in self:
+            return None
+        try:
+            # polars copies IPC files into memory when reading them, pyarrow maps them
+            with pa.memory_map(self.path(dataset_id)) as source:
+                table = pa.ipc.open_file(source).read_all()
+        except FileNotFoundError:
+            # deleted by the compaction of another process
+            return None
+        self.touch(dataset_id)
+        return pl.from_arrow(table, rechunk=False)
+
+    def touch(self, dataset_id: str) -> None:
+        """Mark a stored dataset as used"""
+        try:
+            os.utime(self.path(dataset_id))
+        except FileNotFoundError:
+            pass
+
+    def compact(self, keep: Optional[str] = None) -> None:
+        """Delete the datasets unused for ttl seconds, then the least recently used ones beyond max_bytes"""
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(".arrow"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.name[:-len(".arrow")]))
+        total_bytes = sum(size for _, size, _ in entries)
+        for modified, size, dataset_id in sorted(entries):
+            expired = self.ttl is not None and now - modified > self.ttl
+            over_quota = self.max_bytes is not None and total_bytes > self.max_bytes
+            if not (expired or over_quota) or dataset_id == keep \
+                    or (self.in_use is not None and self.in_use(dataset_id)):
+                continue
+            logger.info("Deleting dataset %s from the dataset store", dataset_id)
+            try:
+                os.remove(self.path(dataset_id))
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Dataset store usage statistics"""
+        sizes = [entry.stat().st_size for entry in os.scandir(self.root) if entry.name.endswith(".arrow")]
+        return {"datasets": len(sizes), "bytes": sum(sizes), "max_bytes": self.max_bytes,
+                "evictions": self.evictions}
@@ -1,11 +1,15 @@
+import dataclasses
 import json
 import logging
+import os
 from typing import Union
 import polars as pl
-from lida.utils import clean_code_snippet, read_dataframe
+from lida.utils import clean_code_snippet, read_dataframe, sample_lazyframe, scan_dataframe
+from lida.components.profiler import ColumnProfiler, ParallelColumnProfiler, check_type
+from lida.components.sketches import SketchProfiler
 from lida.datamodel.__init__ import TextGenerationConfig
+from lida.datamodel.summary import Summary
 from llmx import TextGenerator
-import warnings
 import alog
 
 system_prompt = """
@@ -20,91 +24,23 @@ logger = logging.getLogger("lida")
 
 
 class Summarizer():
-    def __init__(self) -> None:
+    def __init__(self, n_workers: int = 1) -> None:
+        """
+        Args:
+            n_workers (int, optional): Number of processes used to profile the columns of wide dataframes. Defaults to 1.
+        """
         self.summary = None
+        self.n_workers = n_workers
 
     def check_type(self, dtype: str, value):
         """Cast value to right type to ensure it is JSON serializable"""
-        if "float" in str(dtype):
-            return float(value)
-        elif "int" in str(dtype):
-            return int(value)
-        else:
-            return value
+        return check_type(dtype, value)
 
     def get_column_properties(self, df: pl.DataFrame, n_samples: int = 3) -> list[dict]:
-        """Get properties of each column in a pandas DataFrame"""
-        properties_list = []
-
-        for column in df.columns:
-            dtype = df[column].dtype
-            properties = {}
-            if dtype in [int, float, complex]:
-                properties["dtype"] = "number"
-                properties["std"] = self.check_type(dtype, df[column].std())
-                properties["min"] = self.check_type(dtype, df[column].min())
-                properties["max"] = self.check_type(dtype, df[column].max())
-
-            elif dtype == bool:
-                properties["dtype"] = "boolean"
-            elif dtype == object:
-                # Check if the string column can be cast to a valid datetime
-                try:
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        # pl.col(column)
-                        # pl.--(df[column], errors='raise')
-                        df.with_columns(
-                            pl.col(column).str.to_datetime("%d %B %Y")
-                        )
-                        properties["dtype"] = "date"
-                except ValueError:
-                    # Check if the string column has a limited number of values
-                    if df[column].n_unique() / len(df[column]) < 0.5:
-                        properties["dtype"] = "category"
-                    else:
-                        properties["dtype"] = "string"
-            elif isinstance(dtype, pl.Categorical):
-            #     pass
-            # elif pl.api.types.is_categorical_dtype(df[column]):
-                properties["dtype"] = "category"
-            elif isinstance(dtype, pl.Datetime):
-                properties["dtype"] = "date"
-            else:
-                properties["dtype"] = str(dtype)
-
-            # add min max if dtype is date
-            if properties["dtype"] == "date":
-                try:
-                    properties["min"] = df[column].min()
-                    properties["max"] = df[column].max()
-                except TypeError:
-                    cast_date_col = pl.to_datetime(df[column], errors='coerce')
-                    properties["min"] = cast_date_col.min()
-                    properties["max"] = cast_date_col.max()
-            # Add additional properties to the output dictionary
-            if "samples" not in properties:
-                non_null_values = df.select(pl.col(column).filter(pl.col(column).is_not_null())).unique()
-                # non_null_values = df[column][df[column].is_not_null()].unique()
-                n_samples = min(n_samples, len(non_null_values))
-                samples = pl.Series(non_null_values).sample(
-                    n_samples,
-                    # random_state=42
-                ).to_list()
-                properties["samples"] = samples
-
-            try:
-                nunique = df[column].n_unique()
-                properties["num_unique_values"] = nunique
-            except:
-                pass
-
-            properties["semantic_type"] = ""
-            properties["description"] = ""
-            properties_list.append(
-                {"column": column, "properties": properties})
-
-        return properties_list
+        """Get properties of each column in a polars DataFrame"""
+        if self.n_workers > 1:
+            return ParallelColumnProfiler(n_samples=n_samples, n_workers=self.n_workers).profile(df)
+        return ColumnProfiler(n_samples=n_samples).profile(df)
 
     def enrich(self, base_summary: dict, text_gen: TextGenerator,
                textgen_config: TextGenerationConfig) -> dict:
@@ -134,20 +70,59 @@ class Summarizer():
         return enriched_summary
 
     def summarize(
-            self, data: Union[pl.DataFrame, str],
+            self, data: Union[pl.DataFrame, pl.LazyFrame, str],
             text_gen: TextGenerator, file_name="", n_samples: int = 3,
             textgen_config=TextGenerationConfig(n=1),
-            summary_method: str = "default", encoding: str = 'utf-8') -> dict:
-        """Summarize data from a pandas DataFrame or a file location"""
+            summary_method: str = "default", encoding: str = 'utf-8',
+            streaming: bool = False, sample: pl.DataFrame = None,
+            approximate: bool = False, incremental: bool = False) -> dict:
+        """Summarize data from a polars DataFrame, LazyFrame or a file location
+
+        If data is a LazyFrame (or a file location with streaming=True) statistics are computed
+        on the streaming engine over the full data and sample values are drawn from sample, a
+        subset of the rows that is drawn from data if not provided.
+
+        If approximate is True, column properties are computed in a single pass with bounded
+        memory using sketches (see SketchProfiler), and include quantiles, frequent values
+        and the error bounds of the approximate statistics. A file location is then streamed in
+        full, so that the statistics and their error bounds describe every row, with sample values
+        drawn from sample if it is given. Sketches pay off on data that is not in memory: on a
+        DataFrame the exact statistics are about twice as fast (see benchmarks/bench_sketches.py),
+        and approximate is only worth it for the quantiles and frequent values it adds.
+
+        If incremental is True, properties are computed with sketches as with approximate=True (a
+        file location is streamed in full as well) and their mergeable state is stored in the summary
+        under "state", so that the summary can later be updated with new rows using update_summary.
+        """
 
         # alog.info(alog.pformat(locals()))
 
-        # if data is a file path, read it into a pandas DataFrame, set file_name to the file name
+        # if data is a file path, read it into a polars DataFrame, set file_name to the file name
         if isinstance(data, str):
-            file_name = data.split("/")[-1]
-            # modified to include encoding
-            data = read_dataframe(data, encoding=encoding)
-        data_properties = self.get_column_properties(data, n_samples)
+            file_name = os.path.basename(os.path.normpath(data))
+            if streaming or approximate or incremental or os.path.isdir(data):
+                # partitioned directories are always streamed, they can be larger than memory,
+                # and sketches describe every row rather than the sample read into memory
+                data = scan_dataframe(data, encoding=encoding)
+            else:
+                # modified to include encoding
+                data = read_dataframe(data, encoding=encoding)
+
+        state = None
+        if incremental:
+            profiler = SketchProfiler(n_samples=n_samples)
+            sketches = profiler.sketch(data, sample=sample)
+            data_properties = profiler.properties(sketches)
+            state = profiler.dump_state(sketches)
+        elif approximate:
+            data_properties = SketchProfiler(n_samples=n_samples).profile(data, sample=sample)
+        elif isinstance(data, pl.LazyFrame):
+            if sample is None:
+                sample = sample_lazyframe(data)
+            data_properties = ColumnProfiler(n_samples=n_samples, streaming=True).profile(
+                data, sample=sample)
+        else:
+            data_properties = self.get_column_properties(data, n_samples)
 
         # default single stage summary construction
         base_summary = {
@@ -173,8 +148,52 @@ class Summarizer():
                 "dataset_description": ""
             }
 
-        data_summary["field_names"] = data.columns
+        data_summary["field_names"] = data.collect_schema().names()
 
         data_summary["file_name"] = file_name
 
+        if state is not None:
+            data_summary["state"] = state
+
         return data_summary
+
+    def update_summary(self, summary: Union[dict, Summary],
+                       new_rows: Union[pl.DataFrame, pl.LazyFrame, str],
+                       encoding: str = 'utf-8') -> dict:
+        """Fold new rows into a summary created with incremental=True
+
+        Only the new rows are read, so the time taken is proportional to their number rather than
+        to the size of the dataset. Compared with summarizing all the rows from scratch with
+        incremental=True, the updated summary has:
+
+        - the same dtype, min, max and num_unique_values (HyperLogLog sketches merge exactly),
+        - std equal up to floating point rounding (relative error below 1e-9),
+        - quantiles within error_bounds["quantiles"] of the ranks of the exact quantiles,
+        - top_values counts within error_bounds["top_values"] of the exact counts,
+        - samples taken from the first rows seen.
+
+        The semantic_type and description of existing fields are kept. Columns that only appear in
+        the new rows are added, and are counted as missing in the rows summarized before.
+        """
+        if not isinstance(summary, dict):
+            summary = dataclasses.asdict(summary)
+        if not summary.get("state"):
+            raise ValueError(
+                "The summary has no mergeable state. Create it with summarize(..., incremental=True)")
+        if isinstance(new_rows, str):
+            new_rows = scan_dataframe(new_rows, encoding=encoding)
+
+        profiler, sketches = SketchProfiler.load_state(summary["state"])
+        sketches = profiler.fold(sketches, new_rows)
+
+        updated_summary = dict(summary)
+        if summary.get("fields") is not None:
+            previous = {field["column"]: field["properties"] for field in summary["fields"]}
+            fields = profiler.properties(sketches)
+            for field in fields:
+                for key in ["semantic_type", "description"]:
+                    field["properties"][key] = previous.get(field["column"], {}).get(key, "")
+            updated_summary["fields"] = fields
+        updated_summary["field_names"] = list(sketches)
+        updated_summary["state"] = profiler.dump_state(sketches)
+        return updated_summary
@@ -0,0 +1,226 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from lida.utils import fingerprint_file, write_stream
+
+logger = logging.getLogger("lida")
+
+# suffix of files being written, removed by compaction if left behind by a crash
+PARTIAL_SUFFIXES = (".part", ".tmp")
+
+
+class UploadStore:
+    """Directory of uploaded files bounded by a disk quota, deduplicated by content.
+
+    Uploads are written under their file name (with a short fingerprint appended if another file
+    already uses the name). An upload whose content is already stored is not written again: the
+    stored file is reused. Files are evicted least recently used first once their total size
+    exceeds max_bytes, and once they have not been used for ttl seconds, except files still used
+    by a live session according to in_use. Last use times are kept as file modification times, so
+    they survive restarts.
+
+    compact() reconciles the index with the directory (adopting files written by other processes
+    or before a restart, forgetting deleted ones), removes partial files left by interrupted
+    uploads and applies the quota and ttl. start() runs it periodically in a background thread.
+
+    Args:
+        root (str): Directory of the uploaded files.
+        max_bytes (int, optional): Disk quota of the directory. Defaults to 10GB.
+        ttl (float, optional): Seconds after which unused files are evicted, None to keep them
+            until the quota is reached. Defaults to 7 days.
+        in_use (Callable[[str], bool], optional): Whether the file with a given fingerprint is
+            used by a live session, e.g. its dataset is registered in memory. Defaults to None.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 10 * 2 ** 30, ttl: Optional[float] = 7 * 24 * 3600,
+                 in_use: Optional[Callable[[str], bool]] = None) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.in_use = in_use
+        # file name -> (fingerprint, size), least recently used first
+        self.files: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self.names: Dict[str, str] = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.uploads = 0
+        self.dedupe_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.compactions = 0
+        self.last_compaction: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, file_name: str) -> str:
+        """Location of a stored file"""
+        return os.path.join(self.root, file_name)
+
+    def __contains__(self, file_name: str) -> bool:
+        with self.lock:
+            return file_name in self.files
+
+    def put(self, chunks: Iterable[bytes], file_name: str, max_bytes: Optional[int] = None) -> Tuple[str, str]:
+        """Store an upload written a chunk at a time, unless its content is already stored
+
+        Args:
+            chunks (Iterable[bytes]): The content of the file.
+            file_name (str): Name of the uploaded file.
+            max_bytes (int, optional): Maximum size of the upload, see write_stream.
+
+        Returns:
+            Tuple[str, str]: The name of the stored file, which may differ from file_name, and
+                the fingerprint of its content.
+        """
+        file_name = os.path.basename(file_name)
+        part_path = self.path(f".{uuid.uuid4().hex}.part")
+        fingerprint = write_stream(chunks, part_path, max_bytes=max_bytes)
+        try:
+            with self.lock:
+                self.uploads += 1
+                existing = self.names.get(fingerprint)
+                if existing is not None and os.path.exists(self.path(existing)):
+                    self.dedupe_hits += 1
+                    self._touch(existing)
+                    logger.info("Upload %s has the content of %s, reusing it", file_name, existing)
+                    return existing, fingerprint
+                stored = self._free_name(file_name, fingerprint)
+                os.replace(part_path, self.path(stored))
+                self._add(stored, fingerprint, os.path.getsize(self.path(stored)))
+                self._evict(keep=stored)
+                return stored, fingerprint
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    def touch(self, file_name: str) -> None:
+        """Mark a stored file as used"""
+        with self.lock:
+            if file_name in self.files:
+                self._touch(file_name)
+
+    def remove(self, file_name: str) -> None:
+        """Delete a stored file"""
+        with self.lock:
+            self._delete(file_name)
+
+    def compact(self) -> None:
+        """Reconcile the index with the directory, remove partial files and apply the quota and ttl"""
+        now = time.time()
+        with self.lock:
+            entries = {entry.name: entry for entry in os.scandir(self.root) if entry.is_file()}
+        adopted = []
+        for name, entry in entries.items():
+            if name.endswith(PARTIAL_SUFFIXES):
+                # uploads in progress are younger than an hour
+                if now - entry.stat().st_mtime > 3600:
+                    os.remove(entry.path)
+                continue
+            if name not in self.files:
+                # hashed outside the lock, uploads can go on meanwhile
+                adopted.append((entry.stat().st_mtime, name, fingerprint_file(entry.path), entry.stat().st_size))
+        with self.lock:
+            for name in [name for name in self.files if name not in entries]:
+                self._forget(name)
+            for _, name, fingerprint, size in sorted(adopted):
+                if name not in self.files and os.path.exists(self.path(name)):
+                    self._add(name, fingerprint, size, touch=False)
+            # adopted files are ordered by their last use
+            for name in sorted(self.files, key=lambda name: os.path.getmtime(self.path(name))):
+                self.files.move_to_end(name)
+            if self.ttl is not None:
+                for name in list(self.files):
+                    if now - os.path.getmtime(self.path(name)) > self.ttl and not self._is_live(name):
+                        self._delete(name)
+                        self.expirations += 1
+            self._evict()
+            self.compactions += 1
+            self.last_compaction = now
+
+    def start(self, interval: float = 600) -> None:
+        """Compact the store now and every interval seconds in a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while True:
+                try:
+                    self.compact()
+                except Exception as exception_error:
+                    logger.error(f"Error compacting uploads: {str(exception_error)}")
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name="lida-upload-compaction", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background compaction"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Upload store usage statistics"""
+        with self.lock:
+            return {"files": len(self.files), "bytes": self.total_bytes, "max_bytes": self.max_bytes,
+                    "uploads": self.uploads, "dedupe_hits": self.dedupe_hits, "evictions": self.evictions,
+                    "expirations": self.expirations, "compactions": self.compactions,
+                    "last_compaction": self.last_compaction}
+
+    def _free_name(self, file_name: str, fingerprint: str) -> str:
+        if file_name not in self.files and not os.path.exists(self.path(file_name)):
+            return file_name
+        stem, extension = os.path.splitext(file_name)
+        return f"{stem}-{fingerprint[:8]}{extension}"
+
+    def _is_live(self, file_name: str) -> bool:
+        return self.in_use is not None and self.in_use(self.files[file_name][0])
+
+    def _touch(self, file_name: str) -> None:
+        self.files.move_to_end(file_name)
+        os.utime(self.path(file_name))
+
+    def _add(self, file_name: str, fingerprint: str, size: int, touch: bool = True) -> None:
+        self.files[file_name] = (fingerprint, size)
+        self.names.setdefault(fingerprint, file_name)
+        self.total_bytes += size
+        if touch:
+            self._touch(file_name)
+
+    def _forget(self, file_name: str) -> None:
+        fingerprint, size = self.files.pop(file_name)
+        self.total_bytes -= size
+        if self.names.get(fingerprint) == file_name:
+            del self.names[fingerprint]
+            # another copy of the same content, e.g. adopted from the directory
+            for name, (other, _) in self.files.items():
+                if other == fingerprint:
+                    self.names[fingerprint] = name
+                    break
+
+    def _delete(self, file_name: str) -> None:
+        if file_name not in self.files:
+            return
+        self._forget(file_name)
+        if os.path.exists(self.path(file_name)):
+            os.remove(self.path(file_name))
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Delete least recently used files that are not live until the quota is met"""
+        for name in list(self.files):
+            if self.total_bytes <= self.max_bytes:
+                return
+            if name == keep or self._is_live(name):
+                continue
+            logger.info("Evicting upload %s to stay within the disk quota", name)
+            self._delete(name)
+            self.evictions += 1
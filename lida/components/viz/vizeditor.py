@@ -1,5 +1,9 @@
+from typing import Optional
+
 from llmx import TextGenerator, TextGenerationConfig, TextGenerationResponse
 from ..scaffold import ChartScaffold
+from ..compactor import SummaryCompactor
+from ..serializer import serialize_summary
 from ...datamodel import Summary
 from lida.components.goal.goal import Goal
 
@@ -12,9 +16,10 @@ class VizEditor(object):
     """Generate visualizations from prompt"""
 
     def __init__(
-        self,
+        self, compactor: Optional[SummaryCompactor] = None
     ) -> None:
         self.scaffold = ChartScaffold()
+        self.compactor = compactor or SummaryCompactor()
 
     def generate(
             self, code: str, summary: Summary, instructions: list[str],
@@ -31,11 +36,12 @@ class VizEditor(object):
             visualization="",
             rationale=""), library)
         # alog.info("instructions", instructions)
+        summary = self.compactor.compact(summary, query=f"{code} {instruction_string}")
 
         messages = [
             {
                 "role": "system", "content": system_prompt}, {
-                "role": "system", "content": f"The dataset summary is : \n\n {summary} \n\n"}, {
+                "role": "system", "content": f"The dataset summary is : \n\n {serialize_summary(summary)} \n\n"}, {
                 "role": "system", "content": f"The modifications you make MUST BE CORRECT and  based on the '{library}' library and also follow these instructions \n\n{library_instructions} \n\n. The resulting code MUST use the following template \n\n {library_template} \n\n "}, {
                     "role": "user", "content": f"ALL ADDITIONAL LIBRARIES USED MUST BE IMPORTED.\n The code to be modified is: \n\n{code} \n\n. YOU MUST THINK STEP BY STEP, AND CAREFULLY MODIFY ONLY the content of the plot(..) method TO MEET EACH OF THE FOLLOWING INSTRUCTIONS: \n\n {instruction_string} \n\n. The completed modified code THAT FOLLOWS THE TEMPLATE above is. \n"}]
 
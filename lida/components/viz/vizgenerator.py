@@ -1,7 +1,9 @@
-from typing import Dict
+from typing import Dict, Optional
 from llmx import TextGenerator, TextGenerationConfig, TextGenerationResponse
 
 from ..scaffold import ChartScaffold
+from ..compactor import SummaryCompactor
+from ..serializer import serialize_summary
 from lida.components.goal.goal import Goal
 
 system_prompt = """
@@ -13,19 +15,21 @@ class VizGenerator(object):
     """Generate visualizations from prompt"""
 
     def __init__(
-        self
+        self, compactor: Optional[SummaryCompactor] = None
     ) -> None:
 
         self.scaffold = ChartScaffold()
+        self.compactor = compactor or SummaryCompactor()
 
     def generate(self, summary: Dict, goal: Goal,
                  textgen_config: TextGenerationConfig, text_gen: TextGenerator, library='altair'):
         """Generate visualization code given a summary and a goal"""
 
         library_template, library_instructions = self.scaffold.get_template(goal, library)
+        summary = self.compactor.compact(summary, query=f"{goal.question} {goal.visualization}")
         messages = [
             {"role": "system", "content": system_prompt},
-            {"role": "system", "content": f"The dataset summary is : {summary} \n\n"},
+            {"role": "system", "content": f"The dataset summary is : {serialize_summary(summary)} \n\n"},
             library_instructions,
             {"role": "user",
              "content":
@@ -1,6 +1,9 @@
 import logging
+from typing import Optional
 from lida.utils import clean_code_snippet
 from ..scaffold import ChartScaffold
+from ..compactor import SummaryCompactor
+from ..serializer import serialize_summary
 from llmx import TextGenerator, TextGenerationConfig, TextGenerationResponse
 # from lida.modules.scaffold import ChartScaffold
 from ...datamodel import Summary
@@ -41,9 +44,10 @@ class VizRecommender(object):
     """Generate visualizations from prompt"""
 
     def __init__(
-        self,
+        self, compactor: Optional[SummaryCompactor] = None
     ) -> None:
         self.scaffold = ChartScaffold()
+        self.compactor = compactor or SummaryCompactor()
 
     def generate(
             self, code: str, summary: Summary,
@@ -58,6 +62,7 @@ class VizRecommender(object):
             question="",
             visualization="",
             rationale=""), library)
+        summary = self.compactor.compact(summary, query=code)
 
         structure_instruction = f"""
         EACH CODE SNIPPET MUST BE A FULL PROGRAM (IT MUST IMPORT ALL THE LIBRARIES THAT ARE USED AND MUST CONTAIN plot(data) method). IT MUST FOLLOW THE STRUCTURE BELOW AND ONLY MODIFY THE INDICATED SECTIONS. \n\n {library_template} \n\n.
@@ -66,7 +71,7 @@ class VizRecommender(object):
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "system", "content": structure_instruction},
-            {"role": "system", "content": f"The dataset summary is : \n\n {summary} \n\n"},
+            {"role": "system", "content": f"The dataset summary is : \n\n {serialize_summary(summary)} \n\n"},
             {"role": "system",
              "content":
              f"An example visualization code is: \n\n ```{code}``` \n\n. You MUST use only the {library} library. \n"},
@@ -1,7 +1,9 @@
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 from llmx import TextGenerator, TextGenerationConfig, TextGenerationResponse
 
 from ..scaffold import ChartScaffold
+from ..compactor import SummaryCompactor
+from ..serializer import serialize_summary
 from ...datamodel import Summary
 from lida.components.goal.goal import Goal
 
@@ -15,9 +17,10 @@ class VizRepairer(object):
     """Fix visualization code based on feedback"""
 
     def __init__(
-        self,
+        self, compactor: Optional[SummaryCompactor] = None
     ) -> None:
         self.scaffold = ChartScaffold()
+        self.compactor = compactor or SummaryCompactor()
 
     def generate(
             self, code: str, feedback: Union[str, Dict, List[Dict]],
@@ -29,9 +32,10 @@ class VizRepairer(object):
             question="",
             visualization="",
             rationale=""), library)
+        summary = self.compactor.compact(summary, query=f"{code} {goal} {feedback}")
         messages = [
             {"role": "system", "content": system_prompt},
-            {"role": "system", "content": f"The dataset summary is : {summary}. \n . The original goal was: {goal}."},
+            {"role": "system", "content": f"The dataset summary is : {serialize_summary(summary)}. \n . The original goal was: {goal}."},
             {"role": "system",
              "content":
              f"You MUST use only the {library}. The resulting code MUST use the following template {library_template}. Only use variables that have been defined in the code or are in the dataset summary"},
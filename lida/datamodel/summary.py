@@ -1,4 +1,5 @@
-from typing import List, Any, Optional
+from dataclasses import field
+from typing import List, Any, Optional, Dict
 
 from pydantic.dataclasses import dataclass
 
@@ -12,6 +13,10 @@ class Summary:
     dataset_description: str
     field_names: List[Any]
     fields: Optional[List[Any]] = None
+    # id of the data in the DatasetRegistry (and DatasetStore once ingested), used for chart execution
+    dataset_id: Optional[str] = None
+    # mergeable statistics used to update the summary with new rows (see Summarizer.update_summary)
+    state: Optional[Dict[str, Any]] = field(default=None, repr=False)
 
     def _repr_markdown_(self):
         field_lines = "\n".join([f"- **{name}:** {field}" for name,
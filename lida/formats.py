@@ -0,0 +1,209 @@
+"""Detection of the format of data files from their content, and lazy readers for every format.
+
+Files are identified by their leading bytes rather than their extension: compressed files
+(gzip, zstd, bz2) are recognized by their magic bytes and decompressed while they are read,
+binary formats (parquet, Arrow IPC, excel) by their signature, and text formats (csv, tsv, json,
+ndjson) by sniffing their first bytes. Every format is read as a LazyFrame, so that files are
+sampled while they are streamed instead of being loaded whole. Text files in other encodings
+than UTF-8 are transcoded to UTF-8 while they are read.
+"""
+import io
+import json
+from typing import Iterator, List, Optional, Tuple
+
+import polars as pl
+import pyarrow as pa
+from polars.io.plugins import register_io_source
+
+# leading bytes of compressed files, decompressed with pyarrow codecs
+COMPRESSION_MAGIC = [(b"\x1f\x8b", "gzip"), (b"\x28\xb5\x2f\xfd", "zstd"), (b"BZh", "bz2")]
+
+# leading bytes of binary formats
+FORMAT_MAGIC = [
+    (b"PAR1", "parquet"),
+    (b"ARROW1", "ipc"),
+    # Arrow IPC streams start with a continuation marker
+    (b"\xff\xff\xff\xff", "ipc_stream"),
+    # xlsx files are zip archives, xls files OLE compound documents
+    (b"PK\x03\x04", "excel"),
+    (b"\xd0\xcf\x11\xe0", "excel"),
+]
+
+# bytes read to detect the format of a text file
+SNIFF_SIZE = 1 << 16
+
+# bytes of decompressed text parsed at a time
+BLOCK_SIZE = 1 << 24
+
+# rows used to infer the schema of compressed text files, from their first block
+INFER_SCHEMA_LENGTH = 10_000
+
+
+def is_utf8(encoding: str) -> bool:
+    """Whether text in an encoding is parsed by polars without transcoding it"""
+    return encoding.lower().replace("-", "").replace("_", "") in ("utf8", "utf8lossy")
+
+
+def open_stream(file_location: str, compression: Optional[str] = None, encoding: str = "utf-8") -> pa.NativeFile:
+    """Open a file for sequential reads, decompressing it and transcoding it to UTF-8 on the fly"""
+    stream = pa.input_stream(file_location, compression=compression)
+    if not is_utf8(encoding):
+        # raises LookupError for unknown encodings, and UnicodeDecodeError for bytes invalid in the encoding
+        stream = pa.transcoding_input_stream(stream, encoding, "utf-8")
+    return stream
+
+
+def sniff_text(head: bytes) -> str:
+    """Text format of a file from its first bytes: json, ndjson, tsv or csv"""
+    text = head.decode("utf-8", errors="ignore").lstrip("﻿ \t\r\n")
+    if text.startswith("["):
+        return "json"
+    if text.startswith("{"):
+        # newline delimited json has a complete object on its first line
+        try:
+            json.loads(text.split("\n", 1)[0])
+            return "ndjson"
+        except ValueError:
+            return "json"
+    first_line = text.split("\n", 1)[0]
+    return "tsv" if first_line.count("\t") > first_line.count(",") else "csv"
+
+
+def detect_format(file_location: str, encoding: str = "utf-8") -> Tuple[str, Optional[str]]:
+    """Detect the format and compression of a file from its content
+
+    Args:
+        file_location (str): The path to the file.
+        encoding (str, optional): Encoding of the file if it is a text file. Defaults to "utf-8".
+
+    Returns:
+        Tuple[str, Optional[str]]: The format (parquet, ipc, ipc_stream, excel, json, ndjson, tsv
+            or csv) and the compression (gzip, zstd, bz2 or None).
+    """
+    with open(file_location, "rb") as file_object:
+        head = file_object.read(SNIFF_SIZE)
+    compression = next((codec for magic, codec in COMPRESSION_MAGIC if head.startswith(magic)), None)
+    if compression is not None:
+        with open_stream(file_location, compression) as stream:
+            head = stream.read(SNIFF_SIZE)
+    file_format = next((name for magic, name in FORMAT_MAGIC if head.startswith(magic)), None)
+    if file_format is not None:
+        if compression is not None:
+            raise ValueError(f"Compressed {file_format} files are not supported")
+        return file_format, None
+    if not is_utf8(encoding):
+        head = head.decode(encoding, errors="ignore").encode("utf-8")
+    return sniff_text(head), compression
+
+
+def _row_end(block: bytes, quote: Optional[bytes]) -> int:
+    """Position of the last newline of block that ends a row, or -1"""
+    end = len(block)
+    while True:
+        end = block.rfind(b"\n", 0, end)
+        # a newline inside a quoted value has an odd number of quotes before it
+        if end == -1 or quote is None or block.count(quote, 0, end) % 2 == 0:
+            return end
+
+
+def iter_blocks(file_location: str, compression: Optional[str], quote: Optional[bytes] = None,
+                block_size: Optional[int] = None, encoding: str = "utf-8") -> Iterator[bytes]:
+    """Read a text file in blocks of complete UTF-8 rows (of about BLOCK_SIZE bytes), decompressing
+    and transcoding it on the fly"""
+    block_size = block_size or BLOCK_SIZE
+    rest = b""
+    with open_stream(file_location, compression, encoding) as stream:
+        while True:
+            data = stream.read(block_size)
+            if not data:
+                break
+            block = rest + data
+            end = _row_end(block, quote)
+            if end == -1:
+                rest = block
+                continue
+            rest = block[end + 1:]
+            yield block[:end + 1]
+    if rest.strip():
+        yield rest
+
+
+def scan_text_stream(file_location: str, file_format: str, compression: Optional[str],
+                     encoding: str = "utf-8") -> pl.LazyFrame:
+    """Lazily read a csv, tsv or ndjson file, decompressing, transcoding and parsing it block by block
+
+    Used for compressed files and for files in other encodings than UTF-8, which polars does not
+    scan. The schema is inferred from the first rows, as polars does when scanning files.
+    """
+    csv_encoding = encoding if is_utf8(encoding) else "utf8"
+    if file_format == "ndjson":
+        def parse(block: bytes, schema: Optional[pl.Schema] = None) -> pl.DataFrame:
+            return pl.read_ndjson(io.BytesIO(block), schema=schema, infer_schema_length=INFER_SCHEMA_LENGTH)
+        quote = None
+    else:
+        separator = "\t" if file_format == "tsv" else ","
+
+        def parse(block: bytes, schema: Optional[pl.Schema] = None) -> pl.DataFrame:
+            # blocks after the first have no header, their columns are given by the schema
+            return pl.read_csv(io.BytesIO(block), separator=separator, encoding=csv_encoding, has_header=schema is None,
+                               schema=schema, infer_schema_length=INFER_SCHEMA_LENGTH)
+        quote = b'"'
+
+    def frames() -> Iterator[pl.DataFrame]:
+        schema = None
+        for block in iter_blocks(file_location, compression, quote, encoding=encoding):
+            df = parse(block, schema)
+            schema = schema or df.schema
+            yield df
+
+    first = next(frames(), None)
+    schema = first.schema if first is not None else pl.Schema()
+
+    def source(with_columns: Optional[List[str]], predicate: Optional[pl.Expr], n_rows: Optional[int],
+               batch_size: Optional[int]) -> Iterator[pl.DataFrame]:
+        remaining = n_rows
+        for df in frames():
+            if with_columns is not None:
+                df = df.select(with_columns)
+            if predicate is not None:
+                df = df.filter(predicate)
+            if remaining is not None:
+                df = df.head(remaining)
+                remaining -= len(df)
+            yield df
+            if remaining == 0:
+                break
+
+    return register_io_source(source, schema=schema)
+
+
+def scan_file(file_location: str, encoding: str = "utf-8") -> pl.LazyFrame:
+    """Lazily read a data file in the format detected from its content (see detect_format)
+
+    Args:
+        file_location (str): The path to the file.
+        encoding (str, optional): Encoding of text files, any python codec. Text in other encodings
+            than UTF-8 is transcoded, invalid bytes raise UnicodeDecodeError. Defaults to "utf-8".
+
+    Returns:
+        pl.LazyFrame: The data. json and excel files are read whole, other formats are streamed.
+    """
+    file_format, compression = detect_format(file_location, encoding)
+    if file_format == "parquet":
+        return pl.scan_parquet(file_location)
+    if file_format == "ipc":
+        # uncompressed IPC files are memory mapped, not copied
+        return pl.scan_ipc(file_location)
+    if file_format == "ipc_stream":
+        return pl.read_ipc_stream(file_location).lazy()
+    if file_format == "excel":
+        return pl.read_excel(file_location).lazy()
+    if file_format == "json":
+        with open_stream(file_location, compression, encoding) as stream:
+            return pl.read_json(io.BytesIO(stream.read())).lazy()
+    if compression is not None or not is_utf8(encoding):
+        return scan_text_stream(file_location, file_format, compression, encoding=encoding)
+    if file_format == "ndjson":
+        return pl.scan_ndjson(file_location)
+    csv_encoding = "utf8-lossy" if encoding.lower().replace("-", "").replace("_", "") == "utf8lossy" else "utf8"
+    return pl.scan_csv(file_location, separator="\t" if file_format == "tsv" else ",", encoding=csv_encoding)
@@ -0,0 +1,265 @@
+"""Strategies drawing a bounded sample of rows from data streamed in batches.
+
+Every row gets a pseudo random priority, a seeded hash of its position, and each strategy keeps
+a reservoir of the rows with the lowest priorities that it may still select, so that only the
+reservoir and one batch are held in memory. Samples only depend on the seed and the data, and
+sampled rows keep their order.
+"""
+import copy
+from typing import Dict, Optional, Union
+
+import numpy as np
+import polars as pl
+
+# maximum number of rows kept in memory for summarization and chart execution
+MAX_SAMPLE_ROWS = 4500
+
+
+class Sampler:
+    """Uniform sample of n rows (bottom-k reservoir sampling).
+
+    Args:
+        n (int, optional): The number of rows to sample. Defaults to MAX_SAMPLE_ROWS.
+        seed (int, optional): Seed of the row priorities, drawn at random if not given.
+        batch_size (int, optional): Number of rows streamed at a time. Defaults to 100_000.
+    """
+
+    name = "uniform"
+
+    def __init__(self, n: int = MAX_SAMPLE_ROWS, seed: Optional[int] = None, batch_size: int = 100_000) -> None:
+        self.n = n
+        self.seed = seed
+        self.batch_size = batch_size
+
+    def with_keys(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        """Add the columns the strategy selects rows by, at least __row__ and __priority__"""
+        return lf
+
+    def observe(self, batch: pl.DataFrame) -> None:
+        """Update the statistics of the strategy with a new batch of rows"""
+
+    def reduce(self, reservoir: pl.DataFrame) -> pl.DataFrame:
+        """Drop the rows of the reservoir that can no longer be part of the sample"""
+        return reservoir.bottom_k(self.n, by="__priority__") if len(reservoir) > self.n else reservoir
+
+    def select(self, reservoir: pl.DataFrame) -> pl.DataFrame:
+        """Select the sample from the reservoir once every row has been streamed"""
+        return self.reduce(reservoir)
+
+    def sample(self, data: Union[pl.DataFrame, pl.LazyFrame], n_rows: Optional[int] = None,
+               seed: Optional[int] = None) -> pl.DataFrame:
+        """Draw the sample in a single streaming pass over data
+
+        Args:
+            data (Union[pl.DataFrame, pl.LazyFrame]): The data to sample from.
+            n_rows (int, optional): The number of rows of data, if known.
+            seed (int, optional): Seed of this sample, overriding the seed of the sampler.
+
+        Returns:
+            pl.DataFrame: A DataFrame with at most n rows.
+        """
+        # the statistics of a strategy are kept on a copy, a sampler can be shared between threads
+        return copy.copy(self)._sample(data, n_rows, seed)
+
+    def _sample(self, data: Union[pl.DataFrame, pl.LazyFrame], n_rows: Optional[int],
+                seed: Optional[int]) -> pl.DataFrame:
+        lf = data.lazy()
+        if n_rows is not None and n_rows <= self.n:
+            return lf.collect(engine="streaming")
+        seed = seed if seed is not None else self.seed
+        if seed is None:
+            seed = int(np.random.default_rng().integers(2 ** 32))
+
+        reservoir = None
+        lf = lf.with_row_index("__row__").with_columns(pl.col("__row__").hash(seed).alias("__priority__"))
+        for batch in self.with_keys(lf).collect_batches(chunk_size=self.batch_size, engine="streaming"):
+            self.observe(batch)
+            reservoir = batch if reservoir is None else pl.concat([reservoir, batch])
+            reservoir = self.reduce(reservoir)
+        if reservoir is None:
+            return lf.head(0).collect().drop("__row__", "__priority__")
+        sample = self.select(reservoir).sort("__row__")
+        return sample.drop([column for column in sample.columns if column.startswith("__")])
+
+
+UniformSampler = Sampler
+
+
+def allocate(counts: np.ndarray, n: int) -> np.ndarray:
+    """Split n rows between strata of the given sizes as evenly as possible
+
+    Every stratum gets min(count, t) rows for the largest t that fits in n, so that small
+    strata are kept whole and large strata are sampled down to the same number of rows.
+    Remaining rows go to the first strata that still have rows.
+    """
+    if counts.sum() <= n:
+        return counts.copy()
+    order = np.argsort(counts, kind="stable")
+    quotas = np.zeros_like(counts)
+    remaining = n
+    for i, index in enumerate(order):
+        share = remaining // (len(order) - i)
+        if counts[index] <= share:
+            quotas[index] = counts[index]
+            remaining -= counts[index]
+        else:
+            rest = order[i:]
+            quotas[rest] = share
+            remainder = remaining - share * len(rest)
+            quotas[np.sort(rest)[:remainder]] += 1
+            break
+    return quotas
+
+
+class StratifiedSampler(Sampler):
+    """Sample of n rows spread evenly over the values of a column.
+
+    Rare values are kept whole and frequent values are sampled down to the same number of rows
+    (see allocate), rows being drawn uniformly within each value. Suited to columns with a
+    limited number of distinct values: a count is kept per value.
+
+    Args:
+        column (str): The column to stratify by, null is a value of its own.
+        n, seed, batch_size: See Sampler.
+    """
+
+    name = "stratified"
+
+    def __init__(self, column: str, n: int = MAX_SAMPLE_ROWS, seed: Optional[int] = None,
+                 batch_size: int = 100_000) -> None:
+        super().__init__(n=n, seed=seed, batch_size=batch_size)
+        self.column = column
+        self.counts: Optional[pl.DataFrame] = None
+
+    def stratum(self, lf: pl.LazyFrame) -> pl.Expr:
+        return pl.col(self.column)
+
+    def with_keys(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        self.counts = None
+        return lf.with_columns(self.stratum(lf).alias("__stratum__"))
+
+    def quotas(self) -> pl.DataFrame:
+        quotas = allocate(self.counts["__count__"].to_numpy(), self.n)
+        return self.counts.with_columns(__quota__=pl.Series(quotas, dtype=pl.UInt32))
+
+    def keep(self, reservoir: pl.DataFrame, quotas: pl.DataFrame) -> pl.DataFrame:
+        rank = pl.col("__priority__").rank("ordinal").over("__stratum__")
+        return (reservoir.join(quotas.select("__stratum__", "__quota__"), on="__stratum__", nulls_equal=True)
+                .filter(rank <= pl.col("__quota__")).drop("__quota__"))
+
+    def observe(self, batch: pl.DataFrame) -> None:
+        counts = batch.group_by("__stratum__").agg(pl.len().cast(pl.UInt64).alias("__count__"))
+        if self.counts is not None:
+            counts = pl.concat([self.counts, counts]).group_by("__stratum__").agg(pl.col("__count__").sum())
+        # sorted so that remainders go to the same strata whatever the batches
+        self.counts = counts.sort("__stratum__", nulls_last=True)
+
+    def reduce(self, reservoir: pl.DataFrame) -> pl.DataFrame:
+        if len(reservoir) <= self.n:
+            return reservoir
+        # quotas only shrink as more rows are counted, one more row per stratum covers the remainders
+        quotas = self.quotas().with_columns(pl.col("__quota__") + 1)
+        return self.keep(reservoir, quotas)
+
+    def select(self, reservoir: pl.DataFrame) -> pl.DataFrame:
+        return self.keep(reservoir, self.quotas())
+
+
+class TimeBucketSampler(StratifiedSampler):
+    """Sample of n rows spread evenly over equal width time intervals.
+
+    The range of the time column is split into n_buckets intervals and rows are stratified by
+    interval, so that sparse periods are as visible as busy ones. The range is computed in a
+    first streaming pass over the column.
+
+    Args:
+        column (str): A date, datetime or numeric column.
+        n_buckets (int, optional): The number of intervals. Defaults to 20.
+        n, seed, batch_size: See Sampler.
+    """
+
+    name = "time"
+
+    def __init__(self, column: str, n_buckets: int = 20, n: int = MAX_SAMPLE_ROWS, seed: Optional[int] = None,
+                 batch_size: int = 100_000) -> None:
+        super().__init__(column, n=n, seed=seed, batch_size=batch_size)
+        self.n_buckets = n_buckets
+
+    def stratum(self, lf: pl.LazyFrame) -> pl.Expr:
+        time = pl.col(self.column).to_physical().cast(pl.Float64)
+        low, high = lf.select(time.min().alias("low"), time.max().alias("high")).collect(engine="streaming").row(0)
+        if low is None or high == low:
+            return pl.lit(0)
+        bucket = ((time - low) / (high - low) * self.n_buckets).floor().clip(0, self.n_buckets - 1)
+        return bucket.cast(pl.Int32)
+
+
+class TailSampler(Sampler):
+    """Uniform sample of n rows that always contains the extreme values of numeric columns.
+
+    A share of the sample, tail_fraction, is split between the lowest and highest values of
+    every numeric column so that charts of the sample show the true range and outliers. The rest
+    is a uniform sample of the other rows.
+
+    Args:
+        columns (List[str], optional): The columns whose tails are kept. Defaults to every numeric column.
+        tail_fraction (float, optional): Share of the sample made of tail rows. Defaults to 0.1.
+        n, seed, batch_size: See Sampler.
+    """
+
+    name = "tail"
+
+    def __init__(self, columns: Optional[list] = None, tail_fraction: float = 0.1, n: int = MAX_SAMPLE_ROWS,
+                 seed: Optional[int] = None, batch_size: int = 100_000) -> None:
+        super().__init__(n=n, seed=seed, batch_size=batch_size)
+        self.columns = columns
+        self.tail_fraction = tail_fraction
+        self.tail_columns: list = []
+
+    def with_keys(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        schema = lf.collect_schema()
+        self.tail_columns = [column for column in (self.columns or schema.names())
+                             if not column.startswith("__") and schema[column].is_numeric()]
+        return lf
+
+    def is_tail(self) -> pl.Expr:
+        k = int(self.n * self.tail_fraction) // max(2 * len(self.tail_columns), 1)
+        if not k:
+            return pl.lit(False)
+        ranks = []
+        for column in self.tail_columns:
+            # ties are broken by position, the reservoir is sorted by row
+            ranks += [pl.col(column).rank("ordinal") <= k,
+                      pl.col(column).rank("ordinal", descending=True) <= k]
+        return pl.any_horizontal(ranks).fill_null(False)
+
+    def reduce(self, reservoir: pl.DataFrame) -> pl.DataFrame:
+        if len(reservoir) <= self.n:
+            return reservoir
+        reservoir = reservoir.sort("__row__")
+        return reservoir.filter(self.is_tail() | (pl.col("__priority__").rank("ordinal") <= self.n))
+
+    def select(self, reservoir: pl.DataFrame) -> pl.DataFrame:
+        if len(reservoir) <= self.n:
+            return reservoir
+        reservoir = reservoir.sort("__row__").with_columns(self.is_tail().alias("__tail__"))
+        tails = reservoir.filter(pl.col("__tail__"))
+        rest = reservoir.filter(~pl.col("__tail__")).bottom_k(max(self.n - len(tails), 0), by="__priority__")
+        return pl.concat([tails, rest])
+
+
+SAMPLERS: Dict[str, type] = {
+    sampler.name: sampler for sampler in [Sampler, StratifiedSampler, TimeBucketSampler, TailSampler]
+}
+
+
+def get_sampler(strategy: str = "uniform", **kwargs) -> Sampler:
+    """Create a sampler by strategy name: uniform, stratified, time or tail
+
+    Args:
+        strategy (str, optional): Name of the strategy. Defaults to "uniform".
+        kwargs: Arguments of the sampler class, e.g. n, seed or column.
+    """
+    if strategy not in SAMPLERS:
+        raise ValueError(f"Unknown sampling strategy {strategy}. Available strategies are: {', '.join(SAMPLERS)}")
+    return SAMPLERS[strategy](**kwargs)
@@ -1,17 +1,23 @@
 import base64
 import json
 import logging
-from typing import Any, List, Tuple, Union
+from typing import Any, Iterable, List, Optional, Tuple, Union
 import os
 import io
 import numpy as np
 import polars as pl
+import pyarrow as pa
+import pyarrow.ipc
 import re
 import matplotlib.pyplot as plt
 import tiktoken
 from diskcache import Cache
 import hashlib
 import io
+import tempfile
+
+from lida.formats import scan_file
+from lida.sampling import MAX_SAMPLE_ROWS, Sampler
 
 logger = logging.getLogger("lida")
 
@@ -44,67 +50,91 @@ def clean_column_names(df: pl.DataFrame) -> pl.DataFrame:
     return cleaned_df
 
 
-def read_dataframe(file_location: str, encoding: str = 'utf-8') -> pl.DataFrame:
+def read_dataframe(file_location: str, encoding: str = 'utf-8', seed: int = None,
+                   sampler: Sampler = None) -> pl.DataFrame:
     """
     Read a dataframe from a given file location and clean its column names.
-    It also samples down to 4500 rows if the data exceeds that limit.
+    It also samples down to 4500 rows (or the rows of sampler) if the data exceeds that limit.
+
+    The format is detected from the content of the file (see lida.formats). Every format is
+    sampled while the file is streamed, so only the sampled rows of csv, tsv, ndjson (plain or
+    compressed), parquet and Arrow IPC files are ever held in memory.
 
-    :param file_location: The path to the file containing the data.
+    :param file_location: The path to the file containing the data, or to a directory of parquet partitions.
     :param encoding: Encoding to use for the file reading.
+    :param seed: Seed of the sample, the same seed draws the same rows from the same file.
+    :param sampler: Sampling strategy, see lida.sampling. Defaults to a uniform sample.
     :return: A cleaned DataFrame.
     """
-    file_extension = file_location.split('.')[-1]
-
-    read_funcs = {
-        'json': lambda: pl.read_json(file_location, orient='records', encoding=encoding),
-        'csv': lambda: pl.read_csv(file_location, encoding=encoding),
-        'xls': lambda: pl.read_excel(file_location, encoding=encoding),
-        'xlsx': lambda: pl.read_excel(file_location, encoding=encoding),
-        'parquet': pl.read_parquet,
-        # disable for polars
-        # 'feather': pl.read_feather,
-        'tsv': lambda: pl.read_csv(file_location, sep="\t", encoding=encoding)
-    }
-
-    if file_extension not in read_funcs:
-        raise ValueError('Unsupported file type')
-
+    sampler = sampler or Sampler()
     try:
-        df = read_funcs[file_extension]()
+        return sampler.sample(scan_dataframe(file_location, encoding=encoding), seed=seed)
     except Exception as e:
         logger.error(f"Failed to read file: {file_location}. Error: {e}")
         raise
 
-    # Clean column names
-    cleaned_df = clean_column_names(df)
-
-    # Sample down to 4500 rows if necessary
-    if len(cleaned_df) > 4500:
-        logger.info(
-            "Dataframe has more than 4500 rows. We will sample 4500 rows.")
-        cleaned_df = cleaned_df.sample(4500)
-
-    # if cleaned_df.columns.tolist() != df.columns.tolist():
-    #     write_funcs = {
-    #         'csv': lambda: cleaned_df.to_csv(file_location, index=False, encoding=encoding),
-    #         'xls': lambda: cleaned_df.to_excel(file_location, index=False),
-    #         'xlsx': lambda: cleaned_df.to_excel(file_location, index=False),
-    #         'parquet': lambda: cleaned_df.to_parquet(file_location, index=False),
-    #         'feather': lambda: cleaned_df.to_feather(file_location, index=False),
-    #         'json': lambda: cleaned_df.to_json(file_location, orient='records', index=False, default_handler=str),
-    #         'tsv': lambda: cleaned_df.to_csv(file_location, index=False, sep='\t', encoding=encoding)
-    #     }
-    #
-    #     if file_extension not in write_funcs:
-    #         raise ValueError('Unsupported file type')
-    #
-    #     try:
-    #         write_funcs[file_extension]()
-    #     except Exception as e:
-    #         logger.error(f"Failed to write file: {file_location}. Error: {e}")
-    #         raise
 
-    return cleaned_df
+def scan_dataframe(file_location: str, encoding: str = 'utf-8') -> pl.LazyFrame:
+    """
+    Lazily scan a dataframe from a given file location and clean its column names.
+    Nothing is read until the returned LazyFrame is collected, so files larger than
+    memory can be processed with the streaming engine.
+
+    A directory is scanned as a single table made of all the parquet files it contains,
+    with hive style partition directories (e.g. year=2020/) added as columns. The format of a
+    file is detected from its content, see lida.formats.scan_file.
+
+    :param file_location: The path to the file containing the data, or to a directory of parquet partitions.
+    :param encoding: Encoding to use for the file reading.
+    :return: A LazyFrame with clean column names.
+    """
+    if os.path.isdir(file_location):
+        lf = pl.scan_parquet(os.path.join(file_location, "**", "*.parquet"), hive_partitioning=True)
+        return lf.rename({col: clean_column_name(col) for col in lf.collect_schema().names()})
+
+    lf = scan_file(file_location, encoding=encoding)
+    # renaming is part of the query plan and does not touch the data
+    return lf.rename({col: clean_column_name(col) for col in lf.collect_schema().names()})
+
+
+def read_arrow(buffer: Union[bytes, memoryview], seed: int = None, sampler: Sampler = None) -> pl.DataFrame:
+    """
+    Read an Arrow IPC stream (or file) held in memory and clean its column names, sampling it
+    down like read_dataframe. The frame is built on the buffers of the message, without parsing
+    or copying them (except where polars and Arrow layouts differ, e.g. strings).
+
+    :param buffer: The IPC stream, e.g. the body of a request.
+    :param seed: Seed of the sample, the same seed draws the same rows from the same data.
+    :param sampler: Sampling strategy, see lida.sampling. Defaults to a uniform sample.
+    :return: A cleaned DataFrame.
+    """
+    source = pa.py_buffer(buffer)
+    reader = pa.ipc.open_file(source) if bytes(source[:6]) == b"ARROW1" else pa.ipc.open_stream(source)
+    df = pl.from_arrow(reader.read_all(), rechunk=False)
+    if not isinstance(df, pl.DataFrame):
+        df = df.to_frame()
+    df = df.rename({col: clean_column_name(col) for col in df.columns})
+    return (sampler or Sampler()).sample(df, n_rows=len(df), seed=seed)
+
+
+def sample_lazyframe(lf: pl.LazyFrame, n: int = MAX_SAMPLE_ROWS, seed: int = None,
+                     n_rows: int = None, batch_size: int = 100_000) -> pl.DataFrame:
+    """
+    Draw a uniform sample of n rows from a LazyFrame in a single streaming pass.
+    Every row is given a pseudo random priority, a seeded hash of its position, and the
+    n rows with the lowest priorities are kept while the data is streamed in batches
+    (bottom-k reservoir sampling). Only the sample and one batch are held in memory, and
+    the sample only depends on the seed and the data. Sampled rows keep their order.
+    See lida.sampling for other sampling strategies.
+
+    :param lf: The LazyFrame to sample from.
+    :param n: The number of rows to sample.
+    :param seed: Seed of the row priorities, drawn at random if not given.
+    :param n_rows: The number of rows in the LazyFrame, if known.
+    :param batch_size: Number of rows streamed at a time.
+    :return: A DataFrame with at most n rows.
+    """
+    return Sampler(n=n, seed=seed, batch_size=batch_size).sample(lf, n_rows=n_rows)
 
 
 def file_to_df(file_location: str):
@@ -116,11 +146,11 @@ def file_to_df(file_location: str):
     elif "xlsx" in file_name:
         df = pl.read_excel(file_location)
     elif "json" in file_name:
-        df = pl.read_json(file_location, orient="records")
+        df = pl.read_json(file_location)
     elif "parquet" in file_name:
         df = pl.read_parquet(file_location)
-    elif "feather" in file_name:
-        df = pl.read_feather(file_location)
+    elif "feather" in file_name or "arrow" in file_name:
+        df = pl.read_ipc(file_location)
 
     return df
 
@@ -198,23 +228,93 @@ def num_tokens_from_messages(messages, model="gpt-3.5-turbo-0301"):
             f"""num_tokens_from_messages() is not presently implemented for model {model}.""")
 
 
+def get_cache_key(params: Any) -> str:
+    """Generate a unique key for a set of JSON serializable request parameters"""
+    return hashlib.md5(json.dumps(
+        params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
 def cache_request(cache: Cache, params: Any, values: Any = None) -> Any:
     # Generate a unique key for the request
 
-    key = hashlib.md5(json.dumps(
-        params, sort_keys=True).encode("utf-8")).hexdigest()
+    key = get_cache_key(params)
     # Check if the request is cached
     if key in cache and values is None:
-        alog.info("retrieving from cache")
+        logger.info("retrieving from cache")
         return cache[key]
 
     # Cache the provided values and return them
     if values:
-        alog.info("saving to cache")
+        logger.info("saving to cache")
         cache[key] = values
     return values
 
 
+def fingerprint_file(file_location: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute a fingerprint of the content of a file, or of all the files in a directory
+    along with their relative paths.
+
+    :param file_location: The path to the file or directory.
+    :param chunk_size: Number of bytes read at a time.
+    :return: The hex digest of the file content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if os.path.isdir(file_location):
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(file_location) for name in names)
+    else:
+        paths = [file_location]
+    for path in paths:
+        if path != file_location:
+            digest.update(os.path.relpath(path, file_location).encode("utf-8"))
+        with open(path, "rb") as file_object:
+            for chunk in iter(lambda: file_object.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_stream(chunks: Iterable[bytes], file_location: str, max_bytes: Optional[int] = None) -> str:
+    """
+    Write chunks of bytes to a file while computing its fingerprint, so that uploads are neither
+    held in memory nor read again to be fingerprinted. The file only appears once complete.
+
+    :param chunks: The content of the file, e.g. read from an upload a chunk at a time.
+    :param file_location: The path of the file to write.
+    :param max_bytes: Maximum size of the file, a ValueError is raised beyond it and nothing is written.
+    :return: The fingerprint of the content, equal to fingerprint_file(file_location).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    size = 0
+    descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_location)), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file_object:
+            for chunk in chunks:
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise ValueError(f"File is larger than the maximum size of {max_bytes} bytes")
+                digest.update(chunk)
+                file_object.write(chunk)
+        os.replace(tmp_path, file_location)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return digest.hexdigest()
+
+
+def fingerprint_dataframe(df: pl.DataFrame) -> str:
+    """
+    Compute a fingerprint of the content of a DataFrame from its schema and a hash of every row.
+    Row hashes are only stable for a given polars version, which is part of the fingerprint.
+
+    :param df: The DataFrame.
+    :return: The hex digest of the DataFrame content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{pl.__version__}{df.schema}".encode("utf-8"))
+    digest.update(df.hash_rows(seed=0).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
 def clean_code_snippet(code_string):
     # Extract code snippet using regex
     cleaned_snippet = re.search(r'```(?:\w+)?\s*([\s\S]*?)\s*```', code_string)
@@ -1,7 +1,11 @@
 import os
+import asyncio
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import requests
-from fastapi import FastAPI, UploadFile
+from fastapi import FastAPI, Request, UploadFile
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import traceback
@@ -9,15 +13,60 @@ import traceback
 from llmx import llm, providers
 from lida.datamodel.__init__ import GoalWebRequest, SummaryUrlRequest, TextGenerationConfig, VisualizeEditWebRequest, VisualizeEvalWebRequest, VisualizeExplainWebRequest, VisualizeRecommendRequest, VisualizeRepairWebRequest, VisualizeWebRequest, InfographicsRequest
 from ..components import Manager
+from ..components.cache import ChartCache, SummaryCache
+from ..components.store import DatasetStore
+from ..components.uploads import UploadStore
+from ..components.pool import ExecutorPool
+from ..utils import read_arrow
 
 
 # instantiate model and generator
 textgen = llm()
 logger = logging.getLogger("lida")
 api_docs = os.environ.get("LIDA_API_DOCS", "False") == "True"
-
-
-lida = Manager(text_gen=textgen)
+dataset_memory_mb = int(os.environ.get("LIDA_DATASET_MEMORY_MB", "1024"))
+max_upload_mb = int(os.environ.get("LIDA_MAX_UPLOAD_MB", "500"))
+upload_quota_mb = int(os.environ.get("LIDA_UPLOAD_QUOTA_MB", "10240"))
+# unused uploads are deleted after this many hours, 0 keeps them until the quota is reached
+upload_ttl_hours = float(os.environ.get("LIDA_UPLOAD_TTL_HOURS", "168"))
+upload_compaction_seconds = float(os.environ.get("LIDA_UPLOAD_COMPACTION_SECONDS", "600"))
+upload_chunk_size = 1 << 20
+# charts are executed in parallel worker processes, 0 executes them in the server process
+execution_workers = int(os.environ.get("LIDA_EXECUTION_WORKERS", str(min(os.cpu_count() or 1, 4))))
+execution_timeout = float(os.environ.get("LIDA_EXECUTION_TIMEOUT", "60"))
+chart_cache_mb = int(os.environ.get("LIDA_CHART_CACHE_MB", "512"))
+# comma separated modules imported by execution workers when they start, defaults to the plotting libraries
+execution_preload = os.environ.get("LIDA_EXECUTION_PRELOAD")
+# processes profiling the columns of wide datasets, 1 profiles them in the server process
+profile_workers = int(os.environ.get("LIDA_PROFILE_WORKERS", "1"))
+# uploads are written, ingested and summarized in these threads, keeping the event loop free
+summarize_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("LIDA_SUMMARIZE_WORKERS", "4")))
+# charts are generated and executed in these threads, a slow chart does not block other requests
+visualize_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("LIDA_VISUALIZE_WORKERS", "8")))
+
+
+# uploads are parsed once into the store and memory mapped by every worker. The store is kept
+# out of the static files folder, ingested datasets are not served
+dataset_store_mb = int(os.environ.get("LIDA_DATASET_STORE_MB", "10240"))
+# datasets unused for this many hours are deleted, 0 keeps them until the quota is reached
+dataset_store_ttl_hours = float(os.environ.get("LIDA_DATASET_STORE_TTL_HOURS", "168"))
+dataset_store = DatasetStore(
+    os.environ.get("LIDA_DATASET_STORE_DIR"), max_bytes=dataset_store_mb * 1024 ** 2,
+    ttl=dataset_store_ttl_hours * 3600 if dataset_store_ttl_hours > 0 else None,
+    in_use=lambda dataset_id: dataset_id in lida.datasets or (
+        executor_pool is not None and executor_pool.in_use(dataset_id)))
+executor_pool = None
+if execution_workers > 0:
+    executor_pool = ExecutorPool(
+        n_workers=execution_workers, timeout=execution_timeout, dataset_store=dataset_store,
+        preload=[name.strip() for name in execution_preload.split(",") if name.strip()]
+        if execution_preload is not None else None)
+    # workers import the plotting libraries in the background, before the first charts
+    executor_pool.start(wait_ready=False)
+lida = Manager(text_gen=textgen, summary_cache=SummaryCache(), dataset_store=dataset_store,
+               dataset_memory_budget=dataset_memory_mb * 1024 ** 2, executor_pool=executor_pool,
+               profile_workers=profile_workers,
+               chart_cache=ChartCache(size_limit=chart_cache_mb * 1024 ** 2) if chart_cache_mb > 0 else None)
 app = FastAPI()
 # allow cross origin requests for testing on localhost:800* ports only
 app.add_middleware(
@@ -36,6 +85,11 @@ static_folder_root = os.path.join(root_file_path, "ui")
 files_static_root = os.path.join(root_file_path, "files/")
 data_folder = os.path.join(root_file_path, "files/data")
 os.makedirs(data_folder, exist_ok=True)
+# uploads of datasets still registered in memory are never evicted
+uploads = UploadStore(data_folder, max_bytes=upload_quota_mb * 1024 ** 2,
+                      ttl=upload_ttl_hours * 3600 if upload_ttl_hours > 0 else None,
+                      in_use=lambda fingerprint: fingerprint in lida.datasets)
+uploads.start(interval=upload_compaction_seconds)
 os.makedirs(files_static_root, exist_ok=True)
 os.makedirs(static_folder_root, exist_ok=True)
 
@@ -52,7 +106,8 @@ async def visualize_data(req: VisualizeWebRequest) -> dict:
     """Generate goals given a dataset summary"""
     try:
         # alog.info(req.textgen_config)
-        charts = lida.visualize(
+        charts = await run_in_threads(
+            visualize_pool, lida.visualize,
             summary=req.summary,
             goal=req.goal,
             textgen_config=req.textgen_config if req.textgen_config else TextGenerationConfig(),
@@ -74,7 +129,8 @@ async def edit_visualization(req: VisualizeEditWebRequest) -> dict:
     """Given a visualization code, and a goal, generate a new visualization"""
     try:
         textgen_config = req.textgen_config if req.textgen_config else TextGenerationConfig()
-        charts = lida.edit(
+        charts = await run_in_threads(
+            visualize_pool, lida.edit,
             code=req.code,
             summary=req.summary,
             instructions=req.instructions,
@@ -100,7 +156,8 @@ async def repair_visualization(req: VisualizeRepairWebRequest) -> dict:
 
     try:
 
-        charts = lida.repair(
+        charts = await run_in_threads(
+            visualize_pool, lida.repair,
             code=req.code,
             feedback=req.feedback,
             goal=req.goal,
@@ -169,7 +226,8 @@ async def recommend_visualization(req: VisualizeRecommendRequest) -> dict:
 
     try:
         textgen_config = req.textgen_config if req.textgen_config else TextGenerationConfig()
-        charts = lida.recommend(
+        charts = await run_in_threads(
+            visualize_pool, lida.recommend,
             summary=req.summary,
             code=req.code,
             textgen_config=textgen_config,
@@ -223,6 +281,41 @@ async def generate_goal(req: GoalWebRequest) -> dict:
         }
 
 
+async def run_in_threads(threads: ThreadPoolExecutor, func, *args, **kwargs):
+    """Run a blocking function in a thread pool without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(threads, partial(func, *args, **kwargs))
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """Run a blocking function in the summarize pool without blocking the event loop"""
+    return await run_in_threads(summarize_pool, func, *args, **kwargs)
+
+
+def save_and_summarize(chunks, file_name: str, textgen_config: TextGenerationConfig) -> dict:
+    """Write an uploaded file in chunks, hashing it on the way, then summarize it
+
+    A file whose content was already uploaded is not written again, the stored copy is summarized.
+    """
+    try:
+        file_name, fingerprint = uploads.put(chunks, file_name, max_bytes=max_upload_mb * 1024 ** 2)
+    except ValueError:
+        return {"status": False, "message": f"Uploaded file is larger than {max_upload_mb}MB."}
+    file_location = uploads.path(file_name)
+    summary = lida.summarize(
+        data=file_location,
+        file_name=file_name,
+        summary_method="llm",
+        textgen_config=textgen_config,
+        fingerprint=fingerprint)
+    return {"status": True, "summary": summary, "data_filename": file_name}
+
+
+def download_and_summarize(url: str, file_name: str, textgen_config: TextGenerationConfig) -> dict:
+    """Download a file in chunks, hashing it on the way, then summarize it"""
+    with requests.get(url, allow_redirects=True, timeout=1000, stream=True) as url_response:
+        return save_and_summarize(url_response.iter_content(upload_chunk_size), file_name, textgen_config)
+
+
 @api.post("/summarize")
 async def upload_file(file: UploadFile):
     """ Upload a file and return a summary of the data """
@@ -234,28 +327,77 @@ async def upload_file(file: UploadFile):
     if file.content_type not in allowed_types:
         return {"status": False,
                 "message": f"Uploaded file type ({file.content_type}) not allowed. Allowed types are: csv, excel, json"}
+    if file.size is not None and file.size > max_upload_mb * 1024 ** 2:
+        return {"status": False, "message": f"Uploaded file is larger than {max_upload_mb}MB."}
 
     try:
-
-        # save file to files folder
-        file_location = os.path.join(data_folder, file.filename)
-        # open file without deleting existing contents
-        with open(file_location, "wb+") as file_object:
-            file_object.write(file.file.read())
-
-        # summarize
+        # the spooled upload is copied to the files folder a chunk at a time
+        chunks = iter(lambda: file.file.read(upload_chunk_size), b"")
         textgen_config = TextGenerationConfig(n=1, temperature=0)
-        summary = lida.summarize(
-            data=file_location,
-            file_name=file.filename,
-            summary_method="llm",
-            textgen_config=textgen_config)
-        return {"status": True, "summary": summary, "data_filename": file.filename}
+        return await run_in_pool(
+            save_and_summarize, chunks, os.path.basename(file.filename), textgen_config)
     except Exception as exception_error:
         logger.error(f"Error processing file: {str(exception_error)}")
         return {"status": False, "message": f"Error processing file."}
 
 
+def summarize_arrow(body: bytes, file_name: str, textgen_config: TextGenerationConfig) -> dict:
+    """Summarize an Arrow IPC stream, read without parsing and sampled like uploaded files
+
+    The sample is kept in the dataset store under the fingerprint of the stream, like uploaded files.
+    """
+    fingerprint = hashlib.blake2b(body, digest_size=16).hexdigest()
+    # the same content draws the same sample, so that its summary is cached
+    data = read_arrow(body, seed=int(fingerprint[:8], 16), sampler=lida.sampler)
+    summary = lida.summarize(
+        data=data,
+        file_name=file_name,
+        summary_method="llm",
+        textgen_config=textgen_config,
+        fingerprint=fingerprint)
+    return {"status": True, "summary": summary, "data_filename": file_name}
+
+
+async def iter_upload(file: UploadFile):
+    """Read an uploaded file a chunk at a time"""
+    while True:
+        chunk = await file.read(upload_chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+@api.post("/summarize/arrow")
+async def upload_arrow(request: Request, file_name: str = "data.arrow"):
+    """ Summarize an Arrow IPC stream sent as a file upload or as the raw request body """
+    max_bytes = max_upload_mb * 1024 ** 2
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await request.form()
+            file = form.get("file")
+            if not hasattr(file, "read"):
+                return {"status": False, "message": "No file uploaded."}
+            if file.size is not None and file.size > max_bytes:
+                return {"status": False, "message": f"Uploaded file is larger than {max_upload_mb}MB."}
+            file_name = os.path.basename(file.filename or file_name)
+            chunks = iter_upload(file)
+        else:
+            chunks = request.stream()
+        body = bytearray()
+        # the size of the body is not always known ahead, it is checked while it is read
+        async for chunk in chunks:
+            body += chunk
+            if len(body) > max_bytes:
+                return {"status": False, "message": f"Uploaded file is larger than {max_upload_mb}MB."}
+        if not body:
+            return {"status": False, "message": "Uploaded file is empty."}
+        textgen_config = TextGenerationConfig(n=1, temperature=0)
+        return await run_in_pool(summarize_arrow, body, os.path.basename(file_name), textgen_config)
+    except Exception as exception_error:
+        logger.error(f"Error processing Arrow stream: {str(exception_error)}")
+        return {"status": False, "message": f"Error processing Arrow stream."}
+
+
 # upload via url
 @api.post("/summarize/url")
 async def upload_file_via_url(req: SummaryUrlRequest) -> dict:
@@ -263,20 +405,11 @@ async def upload_file_via_url(req: SummaryUrlRequest) -> dict:
     url = req.url
     textgen_config = req.textgen_config if req.textgen_config else TextGenerationConfig(
         n=1, temperature=0)
-    file_name = url.split("/")[-1]
-    file_location = os.path.join(data_folder, file_name)
+    file_name = os.path.basename(url.split("/")[-1])
 
-    # download file
-    url_response = requests.get(url, allow_redirects=True, timeout=1000)
-    open(file_location, "wb").write(url_response.content)
     try:
 
-        summary = lida.summarize(
-            data=file_location,
-            file_name=file_name,
-            summary_method="llm",
-            textgen_config=textgen_config)
-        return {"status": True, "summary": summary, "data_filename": file_name}
+        return await run_in_pool(download_and_summarize, url, file_name, textgen_config)
     except Exception as exception_error:
         # traceback.print_exc()
         logger.error(f"Error processing file: {str(exception_error)}")
@@ -301,6 +434,28 @@ async def generate_infographics(req: InfographicsRequest) -> dict:
         return {"status": False,
                 "message": f"Error generating infographics. {str(exception_error)}"}
 
+@api.get("/datasets/stats")
+def dataset_stats() -> dict:
+    """Usage of the datasets kept in memory for chart execution"""
+    return {"status": True, "data": lida.datasets.stats(),
+            "message": "Successfully retrieved dataset statistics"}
+
+@api.get("/execution/stats")
+def execution_stats() -> dict:
+    """Usage of the chart and compiled code caches and of the execution workers"""
+    executor = lida.executor
+    data = {"code_cache": executor.code_cache.stats(),
+            "chart_cache": executor.chart_cache.stats() if executor.chart_cache is not None else None,
+            "pool": executor.pool.stats() if executor.pool is not None else None}
+    return {"status": True, "data": data, "message": "Successfully retrieved execution statistics"}
+
+
+@api.get("/uploads/stats")
+def upload_stats() -> dict:
+    """Disk usage of the uploaded files"""
+    return {"status": True, "data": uploads.stats(),
+            "message": "Successfully retrieved upload statistics"}
+
 # list supported models
 
 
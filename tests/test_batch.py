@@ -0,0 +1,68 @@
+import json
+import os
+
+import polars as pl
+from typer.testing import CliRunner
+
+from lida.cli import app
+from lida.components.batch import BatchSummarizer, find_datasets
+
+
+def make_catalog(root):
+    pl.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}).write_csv(root / "first.csv")
+    (root / "nested").mkdir()
+    pl.DataFrame({"c": [1.5, 2.5]}).write_parquet(root / "nested" / "second.parquet")
+    (root / "broken.json").write_text("{not json")
+    (root / "notes.txt").write_text("not a dataset")
+    for year, values in [(2020, [1, 2]), (2021, [3])]:
+        partition = root / "sales" / f"year={year}"
+        partition.mkdir(parents=True)
+        pl.DataFrame({"amount": values}).write_parquet(partition / "part-0.parquet")
+    (root / "sales" / "_SUCCESS").write_text("")
+
+
+def test_find_datasets(tmp_path):
+    make_catalog(tmp_path)
+    names = [os.path.relpath(path, tmp_path) for path in find_datasets(str(tmp_path))]
+    assert names == ["broken.json", "first.csv", "nested/second.parquet", "sales"]
+    assert find_datasets(str(tmp_path / "*.csv")) == [str(tmp_path / "first.csv")]
+    assert find_datasets(str(tmp_path / "sales")) == [str(tmp_path / "sales")]
+    # partitions matched by a pattern or listed are grouped like partitions found in a directory
+    assert find_datasets(str(tmp_path / "sales" / "*" / "*.parquet")) == [str(tmp_path / "sales")]
+    assert find_datasets([str(tmp_path / "sales" / "year=2021" / "part-0.parquet")]) == [str(tmp_path / "sales")]
+
+
+def test_find_datasets_without_partition_markers(tmp_path):
+    # parquet files that happen to share a directory are separate tables
+    (tmp_path / "tables").mkdir()
+    pl.DataFrame({"a": [1]}).write_parquet(tmp_path / "tables" / "users.parquet")
+    pl.DataFrame({"b": [2]}).write_parquet(tmp_path / "tables" / "orders.parquet")
+    expected = [str(tmp_path / "tables" / name) for name in ["orders.parquet", "users.parquet"]]
+    assert find_datasets(str(tmp_path)) == expected
+    assert find_datasets(str(tmp_path / "**" / "*.parquet")) == expected
+
+
+def test_batch_summarize(tmp_path):
+    make_catalog(tmp_path)
+    report = BatchSummarizer(n_workers=2).summarize(str(tmp_path))
+    results = {result["name"]: result for result in report["results"]}
+
+    assert report["n_datasets"] == 4 and report["n_failed"] == 1
+    assert not results["broken.json"]["status"]
+    assert results["first.csv"]["summary"]["field_names"] == ["a", "b"]
+    # the partitions are summarized as one table, with the partition key as a column
+    sales = results["sales"]["summary"]
+    assert sales["field_names"] == ["amount", "year"]
+    assert results["sales"]["files"] == 2
+    assert report["n_files"] == 4 and report["files_per_second"] > 0
+
+
+def test_cli_summarize(tmp_path):
+    make_catalog(tmp_path)
+    output = tmp_path / "summaries.jsonl"
+    result = CliRunner().invoke(app, ["summarize", str(tmp_path / "**" / "*.parquet"), "--output", str(output)])
+
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["second.parquet", "sales"]
+    assert "files/s" in result.output
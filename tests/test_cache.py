@@ -0,0 +1,103 @@
+import polars as pl
+
+from lida.components.cache import ChartCache, SummaryCache
+from lida.components.executor import ChartExecutor
+from lida.datamodel import Summary
+from lida.components.manager import Manager
+from llmx import TextGenerationConfig
+
+
+class StubTextGenerator:
+    provider = "openai"
+
+
+def test_summary_cache(tmp_path):
+    data = pl.DataFrame({"a": list(range(1000)), "b": ["x", "y"] * 500})
+    path = str(tmp_path / "data.csv")
+    data.write_csv(path)
+    cache = SummaryCache(cache_dir=str(tmp_path / "cache"), hot_size=1)
+    lida = Manager(text_gen=StubTextGenerator(), summary_cache=cache)
+    textgen_config = TextGenerationConfig(n=1, temperature=0)
+
+    summary = lida.summarize(path, textgen_config=textgen_config)
+    assert cache.stats()["misses"] == 1
+
+    # served from the cache, without summarizing the file again
+    cached_summary = lida.summarize(path, textgen_config=textgen_config)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert cached_summary == summary
+
+    # another manager sharing the cache only reads the file when the data of the summary is used
+    other = Manager(text_gen=StubTextGenerator(), summary_cache=cache)
+    other_summary = other.summarize(path, textgen_config=textgen_config)
+    assert other_summary == summary and summary["dataset_id"] not in other.datasets
+    assert other.datasets.get(summary["dataset_id"]).equals(lida.datasets.get(summary["dataset_id"]))
+
+    # a different content or parameter is a different summary
+    lida.summarize(data, textgen_config=textgen_config)
+    lida.summarize(path, textgen_config=textgen_config, n_samples=2)
+    assert cache.stats()["misses"] == 3
+
+    # evicted from the hot tier, still on disk
+    assert lida.summarize(path, textgen_config=textgen_config) == summary
+    assert cache.stats()["hits"] == 3
+
+
+def test_summary_cache_typed(tmp_path):
+    (tmp_path / "data").mkdir()
+    path = str(tmp_path / "data" / "a.csv")
+    pl.DataFrame({"d": [f"2021-03-{i % 28 + 1:02d}" for i in range(100)]}).write_csv(path)
+    cache = SummaryCache(cache_dir=str(tmp_path / "cache"))
+    lida = Manager(text_gen=StubTextGenerator(), summary_cache=cache)
+
+    # batch summaries describe the untyped files, the data of a summary is typed
+    batch = lida.summarize_batch(str(tmp_path / "data"))
+    assert "polars_dtype" not in batch["results"][0]["summary"]["fields"][0]["properties"]
+    summary = lida.summarize(path)
+    assert cache.stats()["hits"] == 0
+    assert summary["fields"][0]["properties"]["polars_dtype"] == "Datetime"
+    assert lida.datasets.get(summary["dataset_id"]).schema == pl.Schema({"d": pl.Datetime("us")})
+
+
+def test_chart_cache(tmp_path, monkeypatch):
+    cache = ChartCache(cache_dir=str(tmp_path / "charts"))
+    executor = ChartExecutor(chart_cache=cache)
+    executed = []
+
+    def execute(code_specs, *args, **kwargs):
+        executed.extend(code_specs)
+        return ChartExecutor._execute(executor, code_specs, *args, **kwargs)
+    monkeypatch.setattr(executor, "_execute", execute)
+
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=["x", "y"])
+    data = pl.DataFrame({"x": [1, 2, 3], "y": [3, 1, 2]})
+    code = """
+import matplotlib.pyplot as plt
+def plot(data: pl.DataFrame):
+    plt.plot(data["x"], data["y"])
+    return plt, data.to_pandas(), {"n": len(data)}
+chart = plot(data)"""
+    failing = code.replace("len(data)", "len(undefined)")
+    charts = executor.execute([code, failing], data, summary, library="matplotlib", return_error=True)
+    assert [chart.status for chart in charts] == [True, False] and len(executed) == 2
+
+    # same code and data: the chart is not executed again, failed charts are
+    charts = executor.execute([code + "\n", failing], data, summary, library="matplotlib", return_error=True)
+    assert [chart.status for chart in charts] == [True, False] and executed[2:] == [failing]
+    assert charts[0].cols == {"n": 3} and charts[0].df.shape == (3, 2) and charts[0].raster
+    assert len(executor.execute([code, failing], data, summary, library="matplotlib")) == 1
+
+    # other data or library
+    executor.execute([code], data.head(2), summary, library="matplotlib")
+    executor.execute([code], data, summary, library="seaborn")
+    assert len(executed) == 6
+    assert cache.stats()["hits"] == 2 and cache.stats()["entries"] == 3
+
+    # data with a dataset_id is keyed by it, without hashing the frame
+    def fingerprint_dataframe(data):
+        raise AssertionError("the frame is hashed")
+    monkeypatch.setattr("lida.components.executor.fingerprint_dataframe", fingerprint_dataframe)
+    for _ in range(2):
+        charts = executor.execute([code], data, summary, library="matplotlib", dataset_id="d1")
+        assert charts[0].cols == {"n": 3}
+    assert len(executed) == 7 and cache.stats()["hits"] == 3
@@ -0,0 +1,64 @@
+from lida.components.compactor import SummaryCompactor
+from lida.components.serializer import serialize_summary
+from lida.datamodel import Summary
+
+
+def count_tokens(text):
+    return len(text) // 4
+
+
+def make_summary(n_fields):
+    fields = [{"column": f"col_{i}", "properties": {
+        "dtype": "number", "std": 1.5, "min": 0, "max": 10, "samples": [1, 2, 3],
+        "num_unique_values": 10, "semantic_type": "", "description": ""}} for i in range(n_fields)]
+    fields.append({"column": "comment", "properties": {
+        "dtype": "string", "samples": ["x" * 500], "num_unique_values": 100,
+        "semantic_type": "free text", "description": "customer comment"}})
+    return {"name": "data", "file_name": "data.csv", "dataset_description": "",
+            "field_names": [x["column"] for x in fields], "fields": fields,
+            "state": {"n_rows": 100, "columns": {}}}
+
+
+def test_compact_small_summary():
+    compactor = SummaryCompactor(max_tokens=10_000, count_tokens=count_tokens)
+    summary = compactor.compact(make_summary(3))
+
+    assert "state" not in summary
+    assert len(summary["fields"]) == 4
+    assert "semantic_type" not in summary["fields"][0]["properties"]
+    assert summary["fields"][-1]["properties"]["samples"] == ["x" * 50 + "..."]
+
+
+def test_compact_keeps_relevant_fields():
+    compactor = SummaryCompactor(max_tokens=1500, count_tokens=count_tokens)
+    original = make_summary(200)
+    summary = compactor.compact(original, query="What is the trend of col_150 by customer comment?")
+
+    columns = [x["column"] for x in summary["fields"]]
+    assert count_tokens(serialize_summary(summary)) <= 1500
+    assert "col_150" in columns and "comment" in columns
+    assert len(columns) < 201
+    # all column names stay listed, fields keep the column order
+    assert summary["field_names"] == original["field_names"]
+    assert columns == sorted(columns, key=original["field_names"].index)
+
+
+def test_compact_summary_dataclass():
+    summary = Summary(**make_summary(2))
+    compacted = SummaryCompactor(count_tokens=count_tokens).compact(summary)
+    assert "state" not in compacted and len(compacted["fields"]) == 3
+
+
+def test_count_tokens_without_tokenizer(monkeypatch):
+    from lida.components import compactor
+
+    def fail(model):
+        raise ConnectionError("no network")
+    monkeypatch.setattr(compactor.tiktoken, "encoding_for_model", fail)
+    monkeypatch.setattr(compactor, "_encoding_loaded", False)
+    monkeypatch.setattr(compactor, "_encoding", None)
+
+    # the encoding is loaded once, then counts are estimated from the length of the text
+    assert compactor.count_message_tokens("x" * 40) == 10 + compactor.MESSAGE_OVERHEAD_TOKENS
+    monkeypatch.setattr(compactor.tiktoken, "encoding_for_model", None)
+    assert compactor.count_message_tokens("x" * 41) == 11 + compactor.MESSAGE_OVERHEAD_TOKENS
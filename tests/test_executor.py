@@ -0,0 +1,130 @@
+import math
+import os
+
+import polars as pl
+
+from lida.components.executor import ChartExecutor, code_hash, get_globals_dict, preload_modules, referenced_columns
+from lida.datamodel import Summary
+
+FIELDS = ["price", "region", "year", "url", "description"]
+
+
+def test_referenced_columns():
+    code = """
+import polars as pl
+def plot(data: pl.DataFrame):
+    df = data.filter(pl.col("price").is_not_null()).group_by("region").agg(pl.col("price").mean())
+    df = df.sort("price").head(20).to_pandas()
+    plt.bar(df.region, df["price"])
+    plt.title("Average price by region")
+    return plt, df, {"price": True}
+chart = plot(data)"""
+    assert referenced_columns(code, FIELDS) == ["price", "region"]
+
+
+def test_referenced_columns_inconclusive():
+    for expression in ["data.columns", "data.select(pl.all())", "data.select(pl.col(pl.Float64))",
+                       "data[:, 0]", 'data.select(pl.col(f"{name}_total"))', "data.to_pandas().corr()",
+                       'data.select(pl.col("^pri.*$"))', "data.to_pandas().hist()", 'data.drop("url")',
+                       'data.select(pl.col("*"))', 'data.to_pandas().loc[:, "price":"year"]',
+                       'data.to_pandas().isnull().sum().plot(kind="bar")', "df.mean()",
+                       'data.to_pandas().groupby("region").mean()']:
+        code = f'import polars as pl\ndef plot(data):\n    df = data.filter(pl.col("price") > 0)\n    return {expression}'
+        assert referenced_columns(code, FIELDS) is None, expression
+    code = "import polars.selectors as cs\ndef plot(data):\n    return data.select(cs.numeric(), 'price')"
+    assert referenced_columns(code, FIELDS) is None
+    assert referenced_columns("def plot(data):\n    return data.head()", FIELDS) is None
+
+
+def test_referenced_columns_reductions():
+    # reductions of selected columns or of expressions only read these columns
+    for expression in ['data["price"].mean()', 'data.group_by("region").agg(pl.col("price").sum())',
+                       'data.to_pandas().groupby("region")["price"].max()', 'data.select("price").sum()',
+                       'np.array(data["price"]).std()', 'data.to_pandas().loc[:, "price"].median()']:
+        code = f"import polars as pl\ndef plot(data):\n    return {expression}"
+        assert referenced_columns(code, FIELDS) is not None, expression
+
+
+def test_referenced_columns_whole_frame():
+    fields = ["name", "price", "year", "hp", "weight"]
+    # wide-form charts and frame-wide reads use every column of the filtered frame
+    for statement in ["sns.boxplot(data=df)", 'df.plot(kind="box", title="year")',
+                      'sns.violinplot(data=df[df.year > 2000], orient="h")', 'df.set_index("name").plot.bar()',
+                      'sns.heatmap(df.set_index("name").head(10))', "values = df.values",
+                      'mask = df["hp"] > 100\n    sns.boxplot(data=df[mask])', 'df.groupby("name").agg("mean")',
+                      "other = df\n    other.plot()", "show(df)\ndef show(frame):\n    frame.plot()"]:
+        code = (f'import polars as pl\ndef plot(data):\n    df = data.filter(pl.col("year") > 2000).to_pandas()\n'
+                f'    {statement}\n    return plt, df')
+        assert referenced_columns(code, fields) is None, statement
+    assert referenced_columns('def plot(data):\n    return data.filter(pl.col("year") > 2000).to_pandas().values',
+                              fields) is None
+
+    # columns named in long-form charts, selections and aggregations
+    for statement, columns in [('sns.barplot(data=df, x="name", y="price")', ["name", "price"]),
+                               ('px.scatter(df, x="hp", y="weight")', ["hp", "weight"]),
+                               ('alt.Chart(df).mark_bar().encode(x="name:N", y="mean(price):Q")', ["name", "price"]),
+                               ('df.groupby("name")["price"].mean().plot(kind="bar")', ["name", "price"]),
+                               ('df.groupby("name").agg({"hp": "max"})', ["name", "hp"]),
+                               ("plt.scatter(df.hp, df.weight)\n    n = len(df)", ["hp", "weight"])]:
+        code = (f'import polars as pl\ndef plot(data):\n    df = data.filter(pl.col("year") > 2000).to_pandas()\n'
+                f'    {statement}\n    return plt, df\nchart = plot(data)')
+        assert referenced_columns(code, fields) == [name for name in fields if name in columns + ["year"]], statement
+
+
+def test_execute_projected_data():
+    data = pl.DataFrame({name: [1, 2, 3] for name in FIELDS})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=FIELDS)
+    code = """
+import matplotlib.pyplot as plt
+import polars as pl
+def plot(data: pl.DataFrame):
+    df = data.to_pandas()
+    plt.plot(df["year"], df["price"])
+    return plt, df, {"width": df.shape[1]}
+chart = plot(data)"""
+    chart = ChartExecutor().execute([code], data, summary, library="matplotlib")[0]
+    assert chart.status and chart.cols == {"width": 2}
+
+    chart = ChartExecutor(project_columns=False).execute([code], data, summary, library="matplotlib")[0]
+    assert chart.cols == {"width": 5}
+
+
+def test_globals_from_preloaded_modules(tmp_path, monkeypatch):
+    # a module failing to import with another error than ImportError is skipped too
+    (tmp_path / "broken_native_module.py").write_text("raise OSError('libgdal.so: cannot open shared object file')")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    assert preload_modules(["numpy", "not_an_installed_module", "broken_native_module"]) == ["numpy"]
+    globals_dict = get_globals_dict("from math import pi as PI\nimport os.path\nchart = np.pi", data=None)
+    # charts get the same names whether modules were preloaded or not
+    assert "np" not in globals_dict and globals_dict["pl"] is pl
+    assert globals_dict["PI"] == math.pi and globals_dict["path"] is os.path
+
+
+def test_code_cache():
+    data = pl.DataFrame({name: [1, 2, 3] for name in FIELDS})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=FIELDS)
+    code = """
+import matplotlib.pyplot as plt
+def plot(data: pl.DataFrame):
+    plt.plot(data["year"], data["price"])
+    return plt, None, {"width": data.width}
+chart = plot(data)"""
+    executor = ChartExecutor()
+    assert executor.execute([code], data, summary, library="matplotlib")[0].cols == {"width": 2}
+    # the same code, up to blank lines and trailing spaces, is not preprocessed or compiled again
+    compiled = executor.code_cache.get(code)
+    charts = executor.execute([code + "  \n\n", code.replace("\n", "   \n")], data, summary, library="matplotlib")
+    assert [chart.cols for chart in charts] == [{"width": 2}, {"width": 2}]
+    assert executor.code_cache.get(code) is compiled
+    assert executor.code_cache.stats()["misses"] == 1 and executor.code_cache.stats()["hits"] == 4
+
+    # trailing spaces inside a multi-line string are part of the code
+    spaced = code.replace('{"width": data.width}', '{"title": """a  \nb"""}')
+    charts = executor.execute([spaced, spaced.replace("a  \n", "a\n")], data, summary, library="matplotlib")
+    assert [chart.cols for chart in charts] == [{"title": "a  \nb"}, {"title": "a\nb"}]
+    assert code_hash(spaced + "  ") == code_hash(spaced) != code_hash(spaced.replace("a  \n", "a\n"))
+
+    # code that does not compile fails every time it is executed
+    broken = code.replace("return plt", "return (plt")
+    charts = executor.execute([broken, broken], data, summary, library="matplotlib", return_error=True)
+    assert [chart.status for chart in charts] == [False, False]
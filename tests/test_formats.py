@@ -0,0 +1,80 @@
+import bz2
+import gzip
+
+import polars as pl
+import pyarrow as pa
+import pytest
+
+from lida import formats
+from lida.formats import detect_format
+from lida.utils import read_dataframe, scan_dataframe
+
+
+@pytest.fixture
+def data():
+    return pl.DataFrame({
+        "row id": range(5_000),
+        # quoted values with separators and newlines, split across blocks
+        "text": ['a "quoted", multi\nline value' if i % 7 == 0 else f"value {i}" for i in range(5_000)],
+        "value": [i / 3 for i in range(5_000)],
+    })
+
+
+def test_detect_format_from_content(tmp_path, data):
+    csv = data.write_csv().encode("utf-8")
+    files = {
+        "data.csv": csv,
+        "data.bin": gzip.compress(csv),
+        "data.csv.bz2": bz2.compress(csv),
+        "data.json": data.write_json().encode("utf-8"),
+        "data.txt": data.write_ndjson().encode("utf-8"),
+        "data.tsv": data.write_csv(separator="\t").encode("utf-8"),
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_bytes(content)
+    data.write_ipc(tmp_path / "data.arrow")
+    data.write_parquet(tmp_path / "data.csv.parquet")
+
+    assert detect_format(str(tmp_path / "data.csv")) == ("csv", None)
+    assert detect_format(str(tmp_path / "data.bin")) == ("csv", "gzip")
+    assert detect_format(str(tmp_path / "data.csv.bz2")) == ("csv", "bz2")
+    assert detect_format(str(tmp_path / "data.json")) == ("json", None)
+    assert detect_format(str(tmp_path / "data.txt")) == ("ndjson", None)
+    assert detect_format(str(tmp_path / "data.tsv")) == ("tsv", None)
+    assert detect_format(str(tmp_path / "data.arrow")) == ("ipc", None)
+    assert detect_format(str(tmp_path / "data.csv.parquet")) == ("parquet", None)
+
+    expected = data.rename({"row id": "row_id"})
+    for name in list(files) + ["data.arrow", "data.csv.parquet"]:
+        assert scan_dataframe(str(tmp_path / name)).collect().equals(expected), name
+
+
+def test_compressed_text_streamed_in_blocks(tmp_path, data, monkeypatch):
+    monkeypatch.setattr(formats, "BLOCK_SIZE", 4096)
+    path = str(tmp_path / "data.jsonl.zst")
+    with pa.output_stream(path, compression="zstd") as stream:
+        data.write_ndjson(stream)
+    (tmp_path / "data.csv.gz").write_bytes(gzip.compress(data.write_csv().encode("utf-8")))
+
+    expected = data.rename({"row id": "row_id"})
+    for path in [path, str(tmp_path / "data.csv.gz")]:
+        lf = scan_dataframe(path)
+        assert lf.collect().equals(expected)
+        assert lf.filter(pl.col("row_id") >= 4_990).select("value").collect()["value"].to_list() == \
+            expected["value"][4_990:].to_list()
+        sample = read_dataframe(path, seed=2)
+        assert len(sample) == 4_500 and sample["row_id"].is_sorted()
+
+
+def test_transcode_other_encodings(tmp_path):
+    df = pl.DataFrame({"city": ["Zürich", "São Paulo", "Besançon"], "n": [1, 2, 3]})
+    path = tmp_path / "latin1.csv"
+    path.write_bytes(df.write_csv().encode("latin-1"))
+    gzip_path = tmp_path / "latin1.csv.gz"
+    gzip_path.write_bytes(gzip.compress(df.write_csv().encode("latin-1")))
+
+    # decoded as they were written rather than with replacement characters
+    assert read_dataframe(str(path), encoding="latin-1").equals(df)
+    assert read_dataframe(str(gzip_path), encoding="latin-1").equals(df)
+    with pytest.raises(Exception):
+        read_dataframe(str(path))
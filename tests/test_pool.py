@@ -0,0 +1,94 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+import pytest
+
+from lida.components.executor import ChartExecutor
+from lida.components.pool import ExecutorPool
+from lida.components.store import DatasetStore
+from lida.datamodel import Summary
+
+CODE = """
+import matplotlib.pyplot as plt
+import polars as pl
+def plot(data: pl.DataFrame):
+    df = data.to_pandas()
+    plt.plot(df["x"], df["y"] * {scale})
+    return plt, df, {{"scale": {scale}, "pid": os.getpid()}}
+import os
+chart = plot(data)"""
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ExecutorPool(n_workers=2, timeout=20, max_jobs_per_worker=2, shared_dir=str(tmp_path / "shared"),
+                        preload=["matplotlib.pyplot"])
+    yield pool
+    pool.close()
+
+
+def test_pool_executes_in_order(pool):
+    data = pl.DataFrame({"x": range(100), "y": range(100)})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=["x", "y"])
+    code_specs = [CODE.format(scale=scale) for scale in range(5)]
+
+    charts = ChartExecutor(pool=pool).execute(code_specs, data, summary, library="matplotlib")
+    assert [chart.cols["scale"] for chart in charts] == list(range(5))
+    assert all(chart.status and chart.raster for chart in charts)
+    # charts run in workers, replaced once they ran two charts each
+    pids = {chart.cols["pid"] for chart in charts}
+    assert os.getpid() not in pids
+    charts = pool.execute(code_specs[:2], data, summary, library="matplotlib")
+    assert not pids & {chart.cols["pid"] for chart in charts}
+    # the frame is shared once
+    assert pool.stats()["shared_datasets"] == 1
+
+
+def test_pool_isolates_failing_charts(pool):
+    data = pl.DataFrame({"x": range(10), "y": range(10)})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=["x", "y"])
+    pool.timeout = 5
+    code_specs = [CODE.format(scale=1), CODE.format(scale=1).replace("plt.plot", "while True: pass\n    plt.plot"),
+                  CODE.format(scale="undefined_name")]
+
+    charts = pool.execute(code_specs, data, summary, library="matplotlib", return_error=True)
+    assert [chart.status for chart in charts] == [True, False, False]
+    assert "did not finish" in charts[1].error["message"]
+    assert "undefined_name" in charts[2].error["message"]
+    assert pool.stats()["restarts"] == 1
+    # the pool keeps working once stuck workers are replaced
+    assert pool.execute(code_specs[:1], data, summary, library="matplotlib")[0].status
+
+
+def test_pool_restart_spares_other_calls(pool):
+    data = pl.DataFrame({"x": range(10), "y": range(10)})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=["x", "y"])
+    pool.timeout = 3
+    stuck = CODE.format(scale=1).replace("plt.plot", "while True: pass\n    plt.plot")
+    slow = CODE.format(scale=1).replace("plt.plot", "__import__('time').sleep(1.5)\n    plt.plot")
+
+    with ThreadPoolExecutor(2) as threads:
+        stuck_call = threads.submit(pool.execute, [stuck], data, summary, library="matplotlib", return_error=True)
+        time.sleep(0.2)
+        other_call = threads.submit(pool.execute, [slow] * 4, data, summary, library="matplotlib",
+                                    return_error=True)
+        # the charts of the other call running or queued when the workers were replaced run again
+        assert [chart.status for chart in other_call.result()] == [True] * 4
+        assert not stuck_call.result()[0].status
+    assert pool.stats()["restarts"] == 1 and pool.stats()["retries"] > 0
+
+
+def test_pool_maps_stored_datasets(pool, tmp_path):
+    data = pl.DataFrame({"x": range(10), "y": range(10)})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=["x", "y"])
+    pool.dataset_store = DatasetStore(str(tmp_path / "store"))
+    pool.dataset_store.put(data, "stored")
+
+    # workers map the frame from the dataset store, nothing is copied to shared memory
+    assert pool.execute([CODE.format(scale=1)], data, summary, library="matplotlib", dataset_id="stored")[0].status
+    assert pool.stats()["shared_datasets"] == 0 and not pool.in_use("stored")
+    # other frames are shared under their dataset id
+    pool.execute([CODE.format(scale=1)], data, summary, library="matplotlib", dataset_id="other")
+    assert os.path.exists(pool.store.path("other"))
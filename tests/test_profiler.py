@@ -0,0 +1,126 @@
+from datetime import datetime
+
+import polars as pl
+
+from lida.components.profiler import ColumnProfiler, ParallelColumnProfiler, infer_date_formats, prepare_dataframe
+from lida.utils import sample_lazyframe, scan_dataframe
+
+
+def get_fields(df, **kwargs):
+    return {x["column"]: x["properties"] for x in ColumnProfiler(**kwargs).profile(df)}
+
+
+def test_profile_dtypes():
+    df = pl.DataFrame({
+        "price": [1.5, 2.5, None, 1.0],
+        "count": [1, 2, 3, 4],
+        "kind": ["a", "a", "a", "a"],
+        "name": ["w", "x", "y", "z"],
+        "day": ["1 January 2020", "2 March 2021", None, "5 May 2020"],
+        "flag": [True, False, True, True],
+        "ts": [datetime(2020, 1, 1), datetime(2021, 1, 1), None, datetime(2019, 1, 1)],
+    })
+    fields = get_fields(df, seed=0)
+
+    assert [x for x in fields] == df.columns
+    assert fields["price"]["dtype"] == "number"
+    assert fields["price"]["min"] == 1.0 and fields["price"]["max"] == 2.5
+    assert isinstance(fields["count"]["max"], int)
+    assert fields["kind"]["dtype"] == "category"
+    assert fields["name"]["dtype"] == "string"
+    assert fields["day"]["dtype"] == "date"
+    assert fields["flag"]["dtype"] == "boolean"
+    assert fields["ts"]["dtype"] == "date"
+    assert fields["ts"]["min"] == datetime(2019, 1, 1)
+    assert fields["name"]["num_unique_values"] == 4
+
+
+def test_profile_date_formats():
+    df = pl.DataFrame({
+        "iso": ["2020-01-01", "2021-06-30", None],
+        "us": ["01/13/2020", "12/01/2019", "02/02/2020"],
+        "eu": ["13/01/2020", "01/12/2019", None],
+        "created_at": [1609459200, 1577836800, 1612137600],
+        "phone": ["5551234567", "5551234568", "5551234569"],
+        "mixed": ["2020-01-01", "not a date 1", "2020-01-03"],
+    })
+    assert infer_date_formats(df) == {"iso": "%Y-%m-%d", "us": "%m/%d/%Y", "eu": "%d/%m/%Y",
+                                      "created_at": "epoch_s"}
+
+    fields = get_fields(df, seed=0)
+    assert fields["iso"]["dtype"] == "date"
+    assert fields["iso"]["max"] == datetime(2021, 6, 30)
+    assert fields["us"]["min"] == datetime(2019, 12, 1)
+    assert fields["eu"]["max"] == datetime(2020, 1, 13)
+    assert fields["created_at"]["dtype"] == "date"
+    assert fields["created_at"]["min"] == datetime(2020, 1, 1)
+    assert fields["phone"]["dtype"] != "date"
+    assert fields["mixed"]["dtype"] != "date"
+
+
+def test_profile_date_confirmed_on_full_column():
+    # the sampled values parse, but a later value does not
+    df = pl.DataFrame({"day": ["2020-01-01"] * 20_000 + ["soon"]})
+    assert infer_date_formats(df) == {"day": "%Y-%m-%d"}
+    assert get_fields(df)["day"]["dtype"] == "category"
+
+
+def test_profile_samples():
+    df = pl.DataFrame({"x": [1, 1, 2, None], "y": ["a", "b", "c", "d"]})
+    fields = get_fields(df, n_samples=3, seed=1)
+
+    assert sorted(fields["x"]["samples"]) == [1, 2]
+    assert len(fields["y"]["samples"]) == 3
+    assert set(fields["y"]["samples"]) <= {"a", "b", "c", "d"}
+
+
+def test_profile_lazy_matches_eager():
+    df = pl.DataFrame({"a": list(range(100)), "b": [str(i % 7) for i in range(100)]})
+    assert get_fields(df, seed=2) == get_fields(df.lazy(), seed=2)
+
+
+def test_profile_streaming(tmp_path):
+    df = pl.DataFrame({"a": list(range(10_000)), "b": [f"k{i % 7}" for i in range(10_000)]})
+    path = str(tmp_path / "data.csv")
+    df.write_csv(path)
+
+    lf = scan_dataframe(path)
+    sample = sample_lazyframe(lf, n=100, seed=0)
+    fields = {x["column"]: x["properties"]
+              for x in ColumnProfiler(streaming=True).profile(lf, sample=sample)}
+
+    assert len(sample) == 100
+    assert fields["a"]["min"] == 0 and fields["a"]["max"] == 9_999
+    assert fields["b"]["dtype"] == "category"
+    assert fields["b"]["num_unique_values"] == 7
+    assert set(fields["b"]["samples"]) <= set(sample["b"].to_list())
+
+
+def test_parallel_profile_matches_serial():
+    df = pl.DataFrame({f"c{i}": [j * i for j in range(50)] if i % 2 else [f"s{j % (i + 1)}" for j in range(50)]
+                       for i in range(30)})
+    parallel = ParallelColumnProfiler(seed=0, n_workers=2, min_columns=10).profile(df)
+    assert parallel == ColumnProfiler(seed=0).profile(df)
+
+
+def test_prepare_dataframe():
+    df = pl.DataFrame({
+        "day": [f"2021-03-{i % 28 + 1:02d}" for i in range(100)],
+        "kind": ["a", "b", "c", "d"] * 25,
+        "name": [f"name {i}" for i in range(100)],
+        "created_at": [1_600_000_000 + i for i in range(100)],
+        "mixed": ["2021-03-01"] * 99 + ["unknown"],
+    })
+    prepared = prepare_dataframe(df)
+    assert prepared.schema == pl.Schema({
+        "day": pl.Datetime("us"), "kind": pl.Categorical(), "name": pl.String,
+        "created_at": pl.Datetime("us"), "mixed": pl.Categorical()})
+    assert prepared["day"].min() == datetime(2021, 3, 1)
+    # nothing to type
+    assert prepare_dataframe(df.select("kind").cast(pl.Categorical)).equals(df.select("kind").cast(pl.Categorical))
+    assert prepare_dataframe(pl.DataFrame({"x": [1.5, 2.5]})).equals(pl.DataFrame({"x": [1.5, 2.5]}))
+
+    fields = get_fields(prepared)
+    assert fields["day"]["dtype"] == "date" and fields["day"]["polars_dtype"] == "Datetime"
+    assert fields["kind"]["dtype"] == "category" and fields["kind"]["polars_dtype"] == "Categorical"
+    assert "polars_dtype" not in fields["name"]
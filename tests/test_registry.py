@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+import pytest
+
+from lida.components.manager import Manager
+from lida.components.registry import DatasetRegistry
+from lida.components.store import DatasetStore
+
+
+def frame(n_rows: int) -> pl.DataFrame:
+    return pl.DataFrame({"x": pl.arange(0, n_rows, eager=True, dtype=pl.Int64)})
+
+
+def test_lru_eviction_by_size():
+    # each frame takes 8000 bytes, the budget holds two of them
+    registry = DatasetRegistry(max_bytes=20_000)
+    registry.put("a", frame(1000))
+    registry.put("b", frame(1000))
+    assert registry.get("a") is not None
+    registry.put("c", frame(1000))
+
+    assert "b" not in registry and "a" in registry and "c" in registry
+    assert registry.get("b") is None
+    registry.put("big", frame(10_000))
+    assert "big" not in registry
+    assert registry.stats() == {"hits": 1, "misses": 1, "evictions": 1, "entries": 2,
+                                "bytes": 16_000, "max_bytes": 20_000}
+
+
+def test_reload_from_store(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    dataset_id = store.put(frame(1000))
+    registry = DatasetRegistry(max_bytes=10_000, loader=store.get)
+
+    assert registry.get(dataset_id).equals(frame(1000))
+    registry.put("other", frame(1000))
+    assert dataset_id not in registry
+    assert registry.get(dataset_id).equals(frame(1000))
+    assert registry.stats()["misses"] == 2 and registry.stats()["evictions"] == 2
+
+
+def test_concurrent_sessions():
+    registry = DatasetRegistry(max_bytes=8000 * 10)
+
+    def session(i):
+        registry.put(str(i), frame(1000) + i)
+        df = registry.get(str(i))
+        return df is None or df["x"][0] == i
+
+    with ThreadPoolExecutor(8) as pool:
+        assert all(pool.map(session, range(100)))
+    stats = registry.stats()
+    assert stats["entries"] == 10 and stats["bytes"] == 80_000
+    assert stats["evictions"] == 90
+
+
+def test_manager_evicted_dataset():
+    class StubTextGenerator:
+        provider = "openai"
+
+    lida = Manager(text_gen=StubTextGenerator(), dataset_memory_budget=10_000)
+    summary = lida.summarize(frame(1000))
+    other = lida.summarize(frame(1000) + 1)
+    assert summary["dataset_id"] not in lida.datasets
+
+    # charts of an evicted dataset are not executed on the data of another summary
+    code = """
+import altair as alt
+def plot(data):
+    return alt.Chart(data.to_pandas()).mark_point().encode(x="x")
+chart = plot(data)"""
+    with pytest.raises(ValueError, match="no longer available"):
+        lida.execute([code], None, summary, library="altair")
+    assert len(lida.execute([code], None, other, library="altair")) == 1
+
+
+def test_manager_concurrent_summaries():
+    class StubTextGenerator:
+        provider = "openai"
+
+    lida = Manager(text_gen=StubTextGenerator())
+    frames = [frame(100) + i for i in range(16)]
+    with ThreadPoolExecutor(8) as pool:
+        summaries = list(pool.map(lida.summarize, frames))
+    # each summary executes on its own data, whatever was summarized last
+    for data, summary in zip(frames, summaries):
+        assert lida.datasets.get(summary["dataset_id"]).equals(data)
+    assert lida.data is None
@@ -0,0 +1,82 @@
+import threading
+
+import matplotlib.pyplot as plt
+import polars as pl
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_svg import FigureCanvasSVG
+
+from lida.components.executor import ChartExecutor
+from lida.components.rendering import figure_scope
+from lida.datamodel import Summary
+
+CODE = """
+import matplotlib.pyplot as plt
+import seaborn as sns
+def plot(data: pl.DataFrame):
+    df = data.to_pandas()
+    sns.barplot(data=df, x="x", y="y", errorbar=None)
+    plt.title("chart {index}")
+    plt.xticks(rotation={index})
+    return plt, None, {{}}
+chart = plot(data)"""
+
+
+def test_figure_scope_is_private_to_thread():
+    outside = plt.figure()
+    try:
+        drawn = {}
+
+        def draw(index):
+            with figure_scope() as scope:
+                plt.plot([index, index + 1])
+                drawn[index] = (scope.figure(), plt.get_fignums())
+
+        threads = [threading.Thread(target=draw, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # each thread drew on its own figure, and saw none of the others
+        assert len({id(figure) for figure, _ in drawn.values()}) == 4
+        assert all(fignums == [1] for _, fignums in drawn.values())
+        assert plt.gcf() is outside and outside.axes == []
+    finally:
+        plt.close(outside)
+    assert plt.get_fignums() == []
+
+
+def test_figure_scope_uses_agg():
+    backend = plt.get_backend()
+    plt.switch_backend("svg")
+    try:
+        canvases = []
+
+        def draw():
+            with figure_scope() as scope:
+                plt.plot([1, 2])
+                canvases.append(scope.figure().canvas)
+
+        thread = threading.Thread(target=draw)
+        thread.start()
+        thread.join()
+        # figures of a scope are Agg figures, whatever the backend of pyplot
+        assert type(canvases[0]) is FigureCanvasAgg
+        outside = plt.figure()
+        assert type(outside.canvas) is FigureCanvasSVG
+        plt.close(outside)
+    finally:
+        plt.switch_backend(backend)
+
+
+def test_execute_charts_in_threads():
+    data = pl.DataFrame({"x": ["a", "b", "c"] * 10, "y": range(30)})
+    summary = Summary(name="data", file_name="data.csv", dataset_description="", field_names=["x", "y"])
+    code_specs = [CODE.format(index=index * 10) for index in range(8)] + ["import nothing_to_import"]
+
+    sequential = ChartExecutor().execute(code_specs, data, summary, library="seaborn", return_error=True)
+    threaded = ChartExecutor(n_threads=4).execute(code_specs, data, summary, library="seaborn", return_error=True)
+    assert [chart.status for chart in threaded] == [True] * 8 + [False]
+    # the same images, in the same order, as when charts are rendered one after the other
+    assert [chart.raster for chart in threaded] == [chart.raster for chart in sequential]
+    assert len({chart.raster for chart in threaded[:8]}) == 8
+    assert plt.get_fignums() == []
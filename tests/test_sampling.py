@@ -0,0 +1,50 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from lida.sampling import (StratifiedSampler, TailSampler, TimeBucketSampler, UniformSampler, allocate,
+                           get_sampler)
+
+
+def make_data(n_rows: int = 50_000) -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    return pl.DataFrame({
+        "kind": rng.choice(["a", "b", "rare"], p=[0.7, 0.2995, 0.0005], size=n_rows),
+        "value": rng.lognormal(size=n_rows),
+        # most rows are in the last tenth of the time range
+        "time": np.sort(np.concatenate([rng.uniform(0, 90, n_rows // 20), rng.uniform(90, 100, n_rows - n_rows // 20)])),
+    })
+
+
+def test_allocate():
+    assert allocate(np.array([5, 100, 100]), 50).tolist() == [5, 23, 22]
+    assert allocate(np.array([5, 10]), 50).tolist() == [5, 10]
+    assert allocate(np.array([30, 30, 30]), 10).sum() == 10
+
+
+@pytest.mark.parametrize("sampler", [
+    UniformSampler(n=1000, seed=1), StratifiedSampler("kind", n=1000, seed=1),
+    TimeBucketSampler("time", n=1000, seed=1), TailSampler(n=1000, seed=1)])
+def test_samples_independent_of_batches(sampler):
+    df = make_data()
+    sample = sampler.sample(df)
+    assert len(sample) == 1000 and sample.columns == df.columns
+    assert sample["time"].is_sorted()
+    sampler.batch_size = 3_000
+    assert sample.equals(sampler.sample(df.lazy()))
+
+
+def test_strategies_keep_rare_rows():
+    df = make_data()
+    n_rare = df.filter(pl.col("kind") == "rare").height
+    assert get_sampler("stratified", column="kind", n=1000, seed=1).sample(df)["kind"].value_counts().filter(
+        pl.col("kind") == "rare")["count"][0] == n_rare
+
+    sample = get_sampler("time", column="time", n=1000, seed=1).sample(df)
+    assert sample.filter(pl.col("time") < 90).height > 800
+
+    sample = get_sampler("tail", n=1000, seed=1).sample(df)
+    assert sample["value"].max() == df["value"].max() and sample["time"].min() == df["time"].min()
+
+    with pytest.raises(ValueError):
+        get_sampler("unknown")
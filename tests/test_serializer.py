@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from lida.components.serializer import serialize_summary, summary_fingerprint
+from lida.datamodel import Summary
+
+
+def make_summary():
+    return {
+        "name": "cars", "file_name": "cars.csv", "dataset_description": "",
+        "field_names": ["price", "day", "extra"],
+        "fields": [
+            {"column": "price", "properties": {"dtype": "number", "samples": [1.5, 2.0], "std": 0.25,
+                                               "min": 1.0, "max": 2.0, "num_unique_values": 2,
+                                               "semantic_type": "", "description": ""}},
+            {"column": "day", "properties": {"dtype": "date", "min": datetime(2020, 1, 1),
+                                             "max": datetime(2020, 1, 2, 10, 30), "samples": ["2020-01-01"],
+                                             "num_unique_values": 2, "semantic_type": "date",
+                                             "description": "day of sale"}},
+        ],
+        "state": {"n_rows": 2},
+    }
+
+
+def test_serialize_summary():
+    text = serialize_summary(make_summary())
+    assert text.splitlines()[4:] == [
+        "- price: num min=1 max=2 std=0.25 unique=2 samples=[1.5, 2]",
+        '- day: date min=2020-01-01 max=2020-01-02T10:30:00 unique=2 samples=["2020-01-01"] '
+        'semantic=date desc="day of sale"',
+        "other columns: extra",
+    ]
+    assert "state" not in text and "n_rows" not in text
+
+
+def test_serialize_summary_is_canonical():
+    summary = make_summary()
+    reordered = {key: summary[key] for key in reversed(list(summary))}
+    reordered["fields"] = [{"column": field["column"], "properties": dict(reversed(field["properties"].items()))}
+                           for field in summary["fields"]]
+    assert summary_fingerprint(reordered) == summary_fingerprint(summary)
+    assert serialize_summary(reordered) == serialize_summary(summary)
+    assert serialize_summary(Summary(**summary)) == serialize_summary(summary)
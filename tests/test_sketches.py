@@ -0,0 +1,160 @@
+import json
+
+import numpy as np
+import polars as pl
+
+from lida.components.manager import Manager
+from lida.components.sketches import HyperLogLog, MisraGries, SketchProfiler, TDigest
+from lida.components.summarizer import Summarizer
+
+
+def test_hyperloglog_estimate():
+    values = pl.Series([f"value_{i}" for i in range(50_000)])
+    hll = HyperLogLog()
+    hll.update(values.hash(seed=0).to_numpy())
+    assert abs(hll.estimate() - 50_000) / 50_000 < 4 * hll.relative_error
+
+    other = HyperLogLog()
+    other.update(values.hash(seed=0).to_numpy())
+    assert hll.merge(other).estimate() == other.estimate()
+
+
+def test_tdigest_quantiles():
+    values = np.random.default_rng(0).normal(size=100_000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 10):
+        digest.update(chunk)
+
+    assert len(digest.means) <= digest.compression + 1
+    for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+        rank = np.mean(values <= digest.quantile(q))
+        assert abs(rank - q) <= digest.rank_error
+
+
+def test_misra_gries_top_values():
+    values = pl.Series("x", ["a"] * 500 + ["b"] * 300 + [f"v{i}" for i in range(200)])
+    summary = MisraGries(k=5)
+    summary.update_series(values)
+
+    top = summary.top(2)
+    assert [value for value, _ in top] == ["a", "b"]
+    assert all(0 <= exact - count <= summary.error for (_, count), exact in zip(top, [500, 300]))
+
+
+def test_sketch_profile():
+    n = 20_000
+    df = pl.DataFrame({
+        "x": np.arange(n, dtype=float),
+        "kind": ["a", "b", "c", "d"] * (n // 4),
+    })
+    fields = {x["column"]: x["properties"] for x in SketchProfiler(batch_size=3_000).profile(df)}
+
+    assert fields["x"]["dtype"] == "number"
+    assert fields["x"]["min"] == 0 and fields["x"]["max"] == n - 1
+    assert abs(fields["x"]["std"] - df["x"].std()) < 1e-6
+    assert abs(fields["x"]["quantiles"]["0.5"] - n / 2) / n <= fields["x"]["error_bounds"]["quantiles"]
+    assert fields["kind"]["dtype"] == "category"
+    assert fields["kind"]["num_unique_values"] == 4
+    assert {x["value"] for x in fields["kind"]["top_values"]} == {"a", "b", "c", "d"}
+
+
+def test_update_summary():
+    rng = np.random.default_rng(0)
+    df = pl.DataFrame({
+        "price": rng.normal(100, 10, 30_000),
+        "kind": rng.choice(["a", "b", "c"], 30_000),
+    })
+    old_rows, new_rows = df[:20_000], df[20_000:].with_columns(extra=pl.lit(1))
+    summarizer = Summarizer()
+
+    summary = summarizer.summarize(old_rows, text_gen=None, incremental=True)
+    summary["fields"][0]["properties"]["description"] = "price of an item"
+    summary = json.loads(json.dumps(summary, default=str))
+    updated = summarizer.update_summary(summary, new_rows)
+    scratch = summarizer.summarize(pl.concat([old_rows, new_rows], how="diagonal"), text_gen=None, incremental=True)
+
+    assert updated["field_names"] == ["price", "kind", "extra"]
+    assert updated["state"]["n_rows"] == 30_000
+    fields = {x["column"]: x["properties"] for x in updated["fields"]}
+    expected = {x["column"]: x["properties"] for x in scratch["fields"]}
+    assert fields["price"]["description"] == "price of an item"
+    for key in ["min", "max", "num_unique_values"]:
+        assert fields["price"][key] == expected["price"][key]
+    assert abs(fields["price"]["std"] - expected["price"]["std"]) < 1e-9 * expected["price"]["std"]
+    for q, value in fields["price"]["quantiles"].items():
+        rank = np.mean(df["price"].to_numpy() <= value)
+        assert abs(rank - float(q)) <= fields["price"]["error_bounds"]["quantiles"]
+    assert fields["kind"]["num_unique_values"] == 3
+    assert fields["extra"]["num_unique_values"] == 2
+
+
+def test_manager_update_summary():
+    class StubTextGenerator:
+        provider = "openai"
+
+    def rows(start, n):
+        return pl.DataFrame({
+            "city": [["paris", "lyon", "nice"][i % 3] for i in range(start, start + n)],
+            "day": [f"03/{i % 28 + 1:02d}/2021" for i in range(start, start + n)],
+        })
+
+    lida = Manager(text_gen=StubTextGenerator())
+    # the summarized rows are typed, the new rows are typed the same way before being folded in
+    summary = lida.summarize(rows(0, 100), incremental=True)
+    assert lida.datasets.get(summary["dataset_id"]).schema == pl.Schema(
+        {"city": pl.Categorical(), "day": pl.Datetime("us")})
+    summary = json.loads(json.dumps(summary, default=str))
+    updated = lida.update_summary(summary, rows(100, 50))
+
+    fields = {x["column"]: x["properties"] for x in updated["fields"]}
+    assert updated["state"]["n_rows"] == 150
+    assert fields["city"]["dtype"] == "category" and fields["city"]["num_unique_values"] == 3
+    assert fields["day"]["dtype"] == "date" and fields["day"]["num_unique_values"] == 28
+    assert str(fields["day"]["max"]).startswith("2021-03-28")
+    assert lida.datasets.get(updated["dataset_id"]).schema == pl.Schema(
+        {"city": pl.Categorical(), "day": pl.Datetime("us")})
+
+
+def test_manager_approximate_file(tmp_path):
+    class StubTextGenerator:
+        provider = "openai"
+
+    path = str(tmp_path / "data.csv")
+    n = 20_000
+    pl.DataFrame({"id": range(n), "city": ["paris", "lyon"] * (n // 2)}).write_csv(path)
+    lida = Manager(text_gen=StubTextGenerator())
+    summary = lida.summarize(path, approximate=True)
+
+    # the statistics describe every row of the file, only a sample is kept in memory
+    fields = {x["column"]: x["properties"] for x in summary["fields"]}
+    error = fields["id"]["error_bounds"]["num_unique_values"]
+    assert abs(fields["id"]["num_unique_values"] - n) <= 3 * error * n
+    assert fields["id"]["max"] == n - 1
+    assert fields["city"]["polars_dtype"] == "Categorical"
+    assert {x["count"] for x in fields["city"]["top_values"]} == {n // 2}
+    data = lida.datasets.get(summary["dataset_id"])
+    assert len(data) < n and set(fields["id"]["samples"]) <= set(data["id"])
+
+
+def test_manager_update_summary_file(tmp_path):
+    class StubTextGenerator:
+        provider = "openai"
+
+    n = 20_000
+    paths = [str(tmp_path / f"part-{i}.csv") for i in range(2)]
+    for i, path in enumerate(paths):
+        pl.DataFrame({"id": range(i * n, (i + 1) * n)}).write_csv(path)
+    lida = Manager(text_gen=StubTextGenerator())
+
+    # the state is built from every row of the file, not from the sample kept in memory
+    summary = lida.summarize(paths[0], incremental=True)
+    assert summary["state"]["n_rows"] == n
+    updated = lida.update_summary(summary, paths[1])
+    assert updated["state"]["n_rows"] == 2 * n
+    # as if both files were summarized together
+    pl.concat([pl.read_csv(path) for path in paths]).write_csv(tmp_path / "all.csv")
+    scratch = lida.summarize(str(tmp_path / "all.csv"), incremental=True)
+    field, expected = updated["fields"][0]["properties"], scratch["fields"][0]["properties"]
+    for key in ["min", "max", "num_unique_values"]:
+        assert field[key] == expected[key]
+    assert field["max"] == 2 * n - 1
@@ -0,0 +1,78 @@
+import os
+
+import polars as pl
+
+from lida.components.store import DatasetStore
+from lida.utils import MAX_SAMPLE_ROWS
+
+
+def test_put_file_once(tmp_path):
+    path = str(tmp_path / "data.csv")
+    pl.DataFrame({"a b": range(10_000), "c": ["x", "y"] * 5_000}).write_csv(path)
+
+    store = DatasetStore(str(tmp_path / "store"))
+    dataset_id = store.put_file(path)
+    stored = store.path(dataset_id)
+    inode = os.stat(stored).st_ino
+
+    # another process sharing the store finds the same frame without parsing the file
+    other = DatasetStore(str(tmp_path / "store"))
+    assert other.put_file(path) == dataset_id
+    assert os.stat(stored).st_ino == inode
+
+    df = other.get(dataset_id)
+    assert df.columns == ["a_b", "c"] and len(df) == MAX_SAMPLE_ROWS
+    assert df.equals(store.get(dataset_id))
+    assert store.get("missing") is None and None not in store
+
+
+def test_put_dataframe(tmp_path):
+    store = DatasetStore(str(tmp_path))
+    df = pl.DataFrame({"x": [1, 2, 3]})
+    dataset_id = store.put(df)
+    assert dataset_id == store.put(df.clone())
+    assert store.get(dataset_id).equals(df)
+    assert [name for name in os.listdir(tmp_path)] == [f"{dataset_id}.arrow"]
+
+
+def test_compaction(tmp_path):
+    frames = [pl.DataFrame({"x": range(i * 1000, (i + 1) * 1000)}) for i in range(3)]
+    size = len(frames[0]) * 8
+    live = set()
+    store = DatasetStore(str(tmp_path), max_bytes=int(size * 2.5), in_use=live.__contains__)
+    first = store.put(frames[0])
+    live.add(first)
+    second = store.put(frames[1])
+    os.utime(store.path(second), (0, 0))
+    os.utime(store.path(first), (0, 0))
+
+    # the least recently used dataset that is not in use is deleted to fit in the quota
+    third = store.put(frames[2])
+    assert first in store and second not in store and third in store
+    assert store.stats()["evictions"] == 1
+
+    # datasets unused for ttl seconds are deleted, used ones are kept
+    store.ttl = 60
+    live.clear()
+    store.get(third)
+    store.compact()
+    assert first not in store and third in store
+
+
+def test_manager_persists_dataframes(tmp_path):
+    from lida.components.manager import Manager
+
+    class StubTextGenerator:
+        provider = "openai"
+
+    store = DatasetStore(str(tmp_path))
+    lida = Manager(text_gen=StubTextGenerator(), dataset_store=store, dataset_memory_budget=10_000)
+    df = pl.DataFrame({"x": range(1000)})
+    fingerprint = "0123456789abcdef" * 2
+    summary = lida.summarize(df, fingerprint=fingerprint)
+    assert summary["dataset_id"] == fingerprint and fingerprint in store
+
+    # evicted from memory, read back from the store
+    lida.summarize(df + 1)
+    assert fingerprint not in lida.datasets
+    assert lida.datasets.get(fingerprint).equals(df)
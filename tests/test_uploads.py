@@ -0,0 +1,69 @@
+import os
+import time
+
+import pytest
+
+from lida.components.uploads import UploadStore
+from lida.utils import fingerprint_file
+
+
+def age(store, file_name, seconds):
+    mtime = time.time() - seconds
+    os.utime(store.path(file_name), (mtime, mtime))
+
+
+def test_upload_dedupe(tmp_path):
+    store = UploadStore(str(tmp_path))
+    name, fingerprint = store.put([b"a,b\n", b"1,2\n"], "data.csv")
+    assert name == "data.csv" and fingerprint == fingerprint_file(store.path(name))
+
+    # same content under another name is not written again
+    assert store.put([b"a,b\n1,2\n"], "copy.csv") == ("data.csv", fingerprint)
+    # other content under the same name does not overwrite the stored file
+    other, _ = store.put([b"a,b\n3,4\n"], "data.csv")
+    assert other != "data.csv" and other.endswith(".csv")
+    assert sorted(os.listdir(tmp_path)) == sorted(["data.csv", other])
+
+    stats = store.stats()
+    assert stats["uploads"] == 3 and stats["dedupe_hits"] == 1 and stats["files"] == 2
+
+    with pytest.raises(ValueError):
+        store.put([b"x" * 100], "big.csv", max_bytes=10)
+    assert sorted(os.listdir(tmp_path)) == sorted(["data.csv", other])
+
+
+def test_upload_quota_keeps_live_files(tmp_path):
+    live = set()
+    store = UploadStore(str(tmp_path), max_bytes=250, in_use=live.__contains__)
+    _, first = store.put([b"1" * 100], "first.csv")
+    store.put([b"2" * 100], "second.csv")
+    live.add(first)
+    store.put([b"3" * 100], "third.csv")
+
+    # the least recently used file that is not live is evicted
+    assert sorted(os.listdir(tmp_path)) == ["first.csv", "third.csv"]
+    assert store.stats()["evictions"] == 1 and store.stats()["bytes"] == 200
+
+
+def test_upload_compaction(tmp_path):
+    live = set()
+    store = UploadStore(str(tmp_path), ttl=3600, in_use=live.__contains__)
+    store.put([b"old"], "old.csv")
+    _, fingerprint = store.put([b"live"], "live.csv")
+    live.add(fingerprint)
+    age(store, "old.csv", 7200)
+    age(store, "live.csv", 7200)
+    # files written by another process and partial files of interrupted uploads
+    (tmp_path / "other.csv").write_bytes(b"other")
+    (tmp_path / ".crashed.part").write_bytes(b"partial")
+    age(store, ".crashed.part", 7200)
+
+    store.compact()
+    assert sorted(os.listdir(tmp_path)) == ["live.csv", "other.csv"]
+    assert store.stats()["expirations"] == 1
+
+    # a restarted store adopts the files of the directory
+    restarted = UploadStore(str(tmp_path))
+    restarted.compact()
+    assert restarted.stats()["files"] == 2
+    assert restarted.put([b"other"], "again.csv")[0] == "other.csv"
@@ -0,0 +1,55 @@
+import io
+import os
+
+import polars as pl
+import pytest
+
+from lida.utils import MAX_SAMPLE_ROWS, fingerprint_file, read_arrow, read_dataframe, sample_lazyframe, write_stream
+
+
+def test_read_dataframe_samples_while_reading(tmp_path):
+    path = str(tmp_path / "data.csv")
+    pl.DataFrame({"row id": range(20_000), "value": [i % 13 for i in range(20_000)]}).write_csv(path)
+
+    df = read_dataframe(path, seed=3)
+    assert df.columns == ["row_id", "value"]
+    assert len(df) == MAX_SAMPLE_ROWS
+    assert df["row_id"].is_sorted() and df["row_id"].n_unique() == MAX_SAMPLE_ROWS
+    # the same seed draws the same rows
+    assert df.equals(read_dataframe(path, seed=3))
+    assert not df.equals(read_dataframe(path, seed=4))
+
+
+def test_sample_lazyframe_independent_of_batches():
+    lf = pl.LazyFrame({"x": range(10_000)})
+    sample = sample_lazyframe(lf, n=500, seed=1, batch_size=300)
+
+    assert len(sample) == 500
+    assert sample.equals(sample_lazyframe(lf, n=500, seed=1, batch_size=7_000))
+    assert len(sample_lazyframe(lf, n=20_000, seed=1)) == 10_000
+    assert sample_lazyframe(lf.head(0), n=10).columns == ["x"]
+
+
+def test_write_stream(tmp_path):
+    path = str(tmp_path / "upload.csv")
+    chunks = [b"a,b\n", b"1,2\n" * 1000, b"3,4\n"]
+    assert write_stream(iter(chunks), path) == fingerprint_file(path)
+    assert os.path.getsize(path) == sum(len(chunk) for chunk in chunks)
+
+    with pytest.raises(ValueError):
+        write_stream(iter(chunks), str(tmp_path / "large.csv"), max_bytes=1000)
+    assert sorted(os.listdir(tmp_path)) == ["upload.csv"]
+
+
+def test_read_arrow_matches_read_dataframe(tmp_path):
+    df = pl.DataFrame({"row id": range(20_000), "value": [i / 7 for i in range(20_000)]})
+    path = str(tmp_path / "data.csv")
+    df.write_csv(path)
+    stream, file = io.BytesIO(), io.BytesIO()
+    df.write_ipc_stream(stream)
+    df.write_ipc(file)
+
+    # the same rows are sampled from the same data, whatever its format
+    expected = read_dataframe(path, seed=5)
+    assert read_arrow(stream.getvalue(), seed=5).equals(expected)
+    assert read_arrow(file.getbuffer(), seed=5).equals(expected)